@@ -0,0 +1 @@
+"""Offline performance benchmarks run against a local Hugging Face/GitHub stand-in"""
@@ -0,0 +1,174 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import unquote, urlparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures.json")
+
+# (pattern, fixture name, endpoint template); HF and GitHub paths do not overlap,
+# so one server can stand in for both HF_ENDPOINT and GITHUB_API_URL
+ROUTES = [
+    (re.compile(r'^/api/models/(?P<org>[^/]+)/(?P<name>[^/]+)/tree/(?P<rev>[^/]+)$'), "model_tree", "/api/models/{id}/tree/{rev}"),
+    (re.compile(r'^/api/models/(?P<org>[^/]+)/(?P<name>[^/]+)/revision/(?P<rev>[^/]+)$'), "model_info",
+     "/api/models/{id}/revision/{rev}"),
+    (re.compile(r'^/api/models/(?P<org>[^/]+)/(?P<name>[^/]+)$'), "model_info", "/api/models/{id}"),
+    (re.compile(r'^/api/datasets/(?:(?P<org>[^/]+)/)?(?P<name>[^/]+)/revision/(?P<rev>[^/]+)$'), "dataset_info",
+     "/api/datasets/{id}/revision/{rev}"),
+    (re.compile(r'^/api/datasets/(?:(?P<org>[^/]+)/)?(?P<name>[^/]+)$'), "dataset_info", "/api/datasets/{id}"),
+    (re.compile(r'^/repos/(?P<org>[^/]+)/(?P<name>[^/]+)/contributors$'), "contributors", "/repos/{repo}/contributors"),
+    (re.compile(r'^/repos/(?P<org>[^/]+)/(?P<name>[^/]+)$'), "repo_info", "/repos/{repo}"),
+    (re.compile(r'^/search/code$'), "code_search", "/search/code"),
+    (re.compile(r'^/(?P<org>[^/]+)/(?P<name>[^/]+)/raw/(?P<rev>[^/]+)/README\.md$'), "readme", "/{id}/raw/{rev}/README.md"),
+]
+
+
+class MockHubServer:
+    """
+    Local stand-in for the Hugging Face and GitHub APIs.
+
+    Serves recorded responses from ``fixtures.json`` for any model, dataset or
+    repository id, with configurable latency, jitter, error rate and a global
+    rate limit (requests per second, answered with 429 when exceeded). Request
+    counts are kept per endpoint template.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: Optional[float] = None, seed: int = 0,
+                 fixtures_path: str = FIXTURES_PATH, port: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.port = port
+
+        with open(fixtures_path, 'r') as f:
+            self.fixtures: Dict[str, Any] = json.load(f)
+
+        self.request_counts: Dict[str, int] = {}
+        self.status_counts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._tokens = rate_limit or 0.0
+        self._last_refill = time.monotonic()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockHubServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, content_type, body = server.respond(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if status == 429:
+                    self.send_header("Retry-After", "1")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-hub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.request_counts.clear()
+            self.status_counts.clear()
+
+    def total_requests(self) -> int:
+        with self._lock:
+            return sum(self.request_counts.values())
+
+    def respond(self, raw_path: str) -> Tuple[int, str, bytes]:
+        """Status, content type and body for a request path"""
+        path = urlparse(raw_path).path
+        for pattern, fixture, endpoint in ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            fixture, endpoint, match = None, "unmatched", None
+
+        with self._lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+            fail = self._random.random() < self.error_rate
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            limited = not self._take_token()
+
+        if delay:
+            time.sleep(delay)
+
+        if limited:
+            status, content_type, body = 429, "application/json", b'{"message": "API rate limit exceeded"}'
+        elif fixture is None:
+            status, content_type, body = 404, "application/json", b'{"error": "Not Found"}'
+        elif fail:
+            status, content_type, body = 500, "application/json", b'{"error": "Internal Server Error"}'
+        else:
+            status, content_type, body = 200, *self._render(fixture, match.groupdict())
+
+        with self._lock:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        return status, content_type, body
+
+    def _render(self, fixture: str, groups: Dict[str, Optional[str]]) -> Tuple[str, bytes]:
+        org, name = groups.get("org") or "", groups.get("name") or ""
+        model_id = f"{org}/{name}" if org else name
+        # Every branch or tag resolves to a stable fake commit SHA; SHAs resolve to themselves
+        revision = unquote(groups.get("rev") or "main")
+        sha = revision if re.fullmatch(r"[0-9a-f]{40}", revision) else hashlib.sha1(
+            f"{model_id}@{revision}".encode("utf-8")).hexdigest()
+        replacements = {"{id}": model_id, "{org}": org, "{repo}": model_id, "{sha}": sha}
+
+        data = self.fixtures[fixture]
+        if isinstance(data, str):
+            text, content_type = data, "text/plain; charset=utf-8"
+        else:
+            text, content_type = json.dumps(data), "application/json"
+        for placeholder, value in replacements.items():
+            text = text.replace(placeholder, value)
+        return content_type, text.encode("utf-8")
+
+    def _take_token(self) -> bool:
+        """Token bucket holding at most one second of requests (caller holds the lock)"""
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._last_refill) * self.rate_limit)
+        self._last_refill = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def __enter__(self) -> "MockHubServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
@@ -0,0 +1,175 @@
+"""
+Offline benchmark: drive ModelEvaluator.evaluate_from_file against the local
+mock hub and report throughput, per-model latency percentiles, peak RSS and
+request counts.
+
+    python -m benchmarks.run_benchmark --lines 10,1000 --latency-ms 20 --jitter-ms 10
+    python -m benchmarks.run_benchmark --lines 1000 --output bench.json
+    python -m benchmarks.run_benchmark --lines 1000 --baseline bench.json
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_server import MockHubServer  # noqa: E402
+from instrumentation import INSTRUMENTATION  # noqa: E402
+from model_evaluator import ModelEvaluator  # noqa: E402
+from evaluation_result import EvaluationResult  # noqa: E402
+
+
+def write_url_file(path: str, lines: int) -> None:
+    """Synthetic URL file: one code, dataset and model URL per line, all distinct"""
+    with open(path, 'w') as f:
+        for i in range(lines):
+            f.write(
+                f"https://github.com/bench-org/repo-{i},"
+                f"https://huggingface.co/datasets/bench-org/dataset-{i},"
+                f"https://huggingface.co/bench-org/model-{i}\n"
+            )
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_benchmark(lines: int, server: MockHubServer, max_workers: int = 4) -> Dict[str, Any]:
+    """Evaluate a synthetic URL file of the given size against a running mock server"""
+    server.reset_counts()
+    INSTRUMENTATION.reset()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        url_file = os.path.join(temp_dir, "urls.txt")
+        write_url_file(url_file, lines)
+
+        evaluator = ModelEvaluator(max_workers=max_workers)
+        latencies: List[float] = []
+        last = [time.perf_counter()]
+
+        def record(result: EvaluationResult) -> None:
+            # Lines are evaluated one after another, one model per line
+            now = time.perf_counter()
+            latencies.append((now - last[0]) * 1000)
+            last[0] = now
+
+        start = time.perf_counter()
+        last[0] = start
+        evaluator.evaluate_from_file(url_file, sink=record)
+        wall = time.perf_counter() - start
+
+    models = len(latencies)
+    requests_total = server.total_requests()
+    return {
+        "lines": lines,
+        "models": models,
+        "wall_seconds": round(wall, 3),
+        "models_per_second": round(models / wall, 2) if wall > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies), 2) if latencies else 0.0
+        },
+        "requests": requests_total,
+        "requests_per_model": round(requests_total / models, 3) if models else 0.0,
+        "requests_by_endpoint": dict(sorted(server.request_counts.items())),
+        "responses_by_status": {str(status): count for status, count in sorted(server.status_counts.items())},
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions in requests per model and wall time relative to a previous report"""
+    previous = {run["lines"]: run for run in baseline.get("runs", [])}
+    regressions = []
+    for run in report["runs"]:
+        base = previous.get(run["lines"])
+        if not base:
+            continue
+        if run["requests_per_model"] > base["requests_per_model"] * (1 + tolerance):
+            regressions.append(
+                f"{run['lines']} lines: requests per model {base['requests_per_model']} -> {run['requests_per_model']}"
+            )
+        if run["wall_seconds"] > base["wall_seconds"] * (1 + tolerance):
+            regressions.append(f"{run['lines']} lines: wall time {base['wall_seconds']}s -> {run['wall_seconds']}s")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the evaluator against a local HF/GitHub stand-in")
+    parser.add_argument("--lines", default="10,100,1000", help="Comma-separated URL file sizes to run")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform latency jitter (+/-)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--rate-limit", type=float, help="Requests per second before answering 429")
+    parser.add_argument("--max-workers", type=int, default=4, help="ModelEvaluator max_workers")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for jitter and error injection")
+    parser.add_argument("--output", help="Write the report as JSON")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative regression vs the baseline")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    sizes = [int(size) for size in args.lines.split(',') if size.strip()]
+
+    with MockHubServer(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit, args.seed) as server:
+        os.environ["HF_ENDPOINT"] = server.url
+        os.environ["GITHUB_API_URL"] = server.url
+        runs = []
+        for size in sizes:
+            run = run_benchmark(size, server, args.max_workers)
+            runs.append(run)
+            print(
+                f"{size:>7} lines  {run['wall_seconds']:>8.2f}s  {run['models_per_second']:>8.1f} models/s  "
+                f"p50 {run['latency_ms']['p50']:.1f}ms  p95 {run['latency_ms']['p95']:.1f}ms  "
+                f"p99 {run['latency_ms']['p99']:.1f}ms  {run['requests_per_model']} req/model  "
+                f"peak RSS {run['peak_rss_mb']} MB"
+            )
+
+    report = {
+        "config": {
+            "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "error_rate": args.error_rate,
+            "rate_limit": args.rate_limit, "max_workers": args.max_workers, "seed": args.seed
+        },
+        "runs": runs
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+from typing import Any, Dict, Optional
+import os
+import threading
+import time
+
+from instrumentation import INSTRUMENTATION
+
+
+class LatencyEstimate:
+    """Latency of one endpoint template on a host"""
+
+    def __init__(self, latency: float):
+        self.latency = latency   # EWMA of recent request latency
+        self.baseline = latency  # latency without queueing (slowly drifting minimum)
+
+
+class HostLimit:
+    """AIMD state of one host: current limit, requests in flight and latency estimates per endpoint"""
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.in_flight = 0
+        self.endpoints: Dict[str, LatencyEstimate] = {}
+        self.last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Per-host limit on concurrent requests that adapts to how the host responds.
+
+    The limit grows additively (by about one per limit's worth of successful
+    responses) while latency stays near its baseline, and is cut
+    multiplicatively on errors, 429/5xx responses and latency spikes, i.e. the
+    smoothed latency of an endpoint exceeding ``latency_tolerance`` times that
+    endpoint's baseline. Latency is tracked per endpoint template because a
+    host's endpoints differ in cost (a file tree takes longer than model
+    info), so a mix of them is not mistaken for queueing. At most one cut is
+    made per round trip, so a burst of failures from requests that were
+    already in flight halves the limit once instead of collapsing it.
+    The thread pools only set the ceiling; the limiter finds the level a host
+    sustains from wherever the client runs.
+    """
+
+    def __init__(self, initial_limit: float = 4, min_limit: float = 1, max_limit: float = 64,
+                 latency_tolerance: float = 2.0, backoff: float = 0.5, smoothing: float = 0.2):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Concurrency limits must satisfy 1 <= min <= initial <= max")
+        if not 0 < backoff < 1:
+            raise ValueError("Backoff factor must be between 0 and 1")
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self._hosts: Dict[str, HostLimit] = {}
+        self._condition = threading.Condition()
+
+    def acquire(self, host: str) -> float:
+        """Block until host has a free slot; returns the seconds spent waiting"""
+        start = time.perf_counter()
+        with self._condition:
+            state = self._host(host)
+            while state.in_flight >= int(state.limit):
+                self._condition.wait()
+            state.in_flight += 1
+            INSTRUMENTATION.record_concurrency(host, state.limit, state.in_flight)
+        return time.perf_counter() - start
+
+    def release(self, host: str, latency: float, status: Optional[int], endpoint: str = "") -> None:
+        """
+        Free a slot and adjust the host's limit from the outcome of the request
+
+        Args:
+            host: Host the request went to
+            latency: Duration of the request in seconds
+            status: HTTP status code, or None if the request raised
+            endpoint: Endpoint template whose latency baseline the request is compared with
+        """
+        with self._condition:
+            state = self._host(host)
+            saturated = state.in_flight >= int(state.limit)
+            state.in_flight = max(0, state.in_flight - 1)
+
+            failed = status is None or status == 429 or status >= 500
+            estimate = None if failed else self._observe_latency(state, endpoint, latency)
+
+            if failed or estimate.latency > self.latency_tolerance * estimate.baseline:
+                now = time.monotonic()
+                if now - state.last_decrease >= (estimate.latency if estimate else latency):
+                    state.limit = max(self.min_limit, state.limit * self.backoff)
+                    state.last_decrease = now
+                    state.decreases += 1
+            elif saturated:
+                # Only grow a limit that is actually being used
+                state.limit = min(self.max_limit, state.limit + 1 / state.limit)
+                state.increases += 1
+
+            INSTRUMENTATION.record_concurrency(host, state.limit, state.in_flight)
+            self._condition.notify_all()
+
+    def limit(self, host: str) -> int:
+        """Current number of concurrent requests allowed for host"""
+        with self._condition:
+            return int(self._host(host).limit)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Limit, in-flight count and latency estimates per host"""
+        with self._condition:
+            return {
+                host: {
+                    "limit": int(state.limit),
+                    "in_flight": state.in_flight,
+                    "increases": state.increases,
+                    "decreases": state.decreases,
+                    "endpoints": {
+                        endpoint: {
+                            "latency_seconds": round(estimate.latency, 6),
+                            "baseline_seconds": round(estimate.baseline, 6)
+                        }
+                        for endpoint, estimate in sorted(state.endpoints.items())
+                    }
+                }
+                for host, state in sorted(self._hosts.items())
+            }
+
+    def _host(self, host: str) -> HostLimit:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostLimit(self.initial_limit)
+        return state
+
+    def _observe_latency(self, state: HostLimit, endpoint: str, latency: float) -> LatencyEstimate:
+        estimate = state.endpoints.get(endpoint)
+        if estimate is None:
+            estimate = state.endpoints[endpoint] = LatencyEstimate(latency)
+            return estimate
+        estimate.latency += self.smoothing * (latency - estimate.latency)
+        if latency < estimate.baseline:
+            estimate.baseline = latency
+        else:
+            # Let the baseline follow an endpoint that has become slower for good
+            estimate.baseline += 0.01 * (latency - estimate.baseline)
+        return estimate
+
+
+_limiter: Optional[AdaptiveConcurrencyLimiter] = None
+_limiter_config: Optional[tuple] = None
+_limiter_lock = threading.Lock()
+
+
+def get_concurrency_limiter() -> Optional[AdaptiveConcurrencyLimiter]:
+    """
+    Process-wide adaptive limiter, or None unless HTTP_ADAPTIVE_CONCURRENCY=1.
+
+    HTTP_CONCURRENCY_INITIAL, HTTP_CONCURRENCY_MIN and HTTP_CONCURRENCY_MAX set
+    the starting limit and its bounds per host; HTTP_CONCURRENCY_LATENCY_TOLERANCE
+    is the latency/baseline ratio treated as a spike.
+    """
+    if os.environ.get('HTTP_ADAPTIVE_CONCURRENCY', '0').lower() not in ('1', 'true', 'yes', 'on'):
+        return None
+
+    global _limiter, _limiter_config
+    config = (
+        float(os.environ.get('HTTP_CONCURRENCY_INITIAL', '4')),
+        float(os.environ.get('HTTP_CONCURRENCY_MIN', '1')),
+        float(os.environ.get('HTTP_CONCURRENCY_MAX', '64')),
+        float(os.environ.get('HTTP_CONCURRENCY_LATENCY_TOLERANCE', '2.0'))
+    )
+    with _limiter_lock:
+        if _limiter is None or _limiter_config != config:
+            _limiter = AdaptiveConcurrencyLimiter(*config)
+            _limiter_config = config
+        return _limiter
@@ -1,50 +1,366 @@
 # evaluate.py
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import time
+from collections import Counter, deque
+import numpy as np
 import pandas as pd
 import torch
-import json
+import torch.multiprocessing as mp
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 from tqdm import tqdm
 
-def evaluate():
-    # Load test data
-    df = pd.read_csv("test.csv")  # expects 'text' and 'label' columns
-    texts = df["text"].tolist()
-    labels = df["label"].tolist()
+# eager fp32 PyTorch, dynamic int8 quantization, or an ONNX Runtime CPU export
+BACKENDS = ["eager", "int8", "onnx"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Evaluate the sequence classifier in the current directory")
+    parser.add_argument("--data", default="test.csv",
+                        help="Test set with 'text' and 'label' columns (.csv, .parquet or .arrow)")
+    parser.add_argument("--output", default="results.json", help="Where to write the metrics")
+    parser.add_argument("--batch-size", type=int, default=32, help="Number of texts per forward pass")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Number of rows read into memory at once")
+    parser.add_argument("--workers", type=int, default=1, help="Number of inference processes to shard chunks across")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="torch intra-op threads per worker (defaults to cores / workers)")
+    parser.add_argument("--backend", choices=BACKENDS, default="eager", help="Inference backend to evaluate with")
+    parser.add_argument("--compare-backend", choices=BACKENDS, default=None,
+                        help="Also run this backend and report the accuracy delta against it")
+    parser.add_argument("--onnx-path", default="model.onnx", help="Where the onnx backend exports the model")
+    parser.add_argument("--token-cache", default=os.environ.get("TOKEN_CACHE_DIR"),
+                        help="Directory of pre-tokenized test sets shared between evaluations")
+    return parser.parse_args()
+
+class ConfusionCounts:
+    """Running (label, prediction) counts from which all metrics are derived"""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def update(self, labels, preds):
+        self.counts.update(zip(labels, preds))
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+
+    def metrics(self):
+        # Same definitions as sklearn with average="weighted" and zero_division=0
+        total = sum(self.counts.values())
+        support = Counter()
+        predicted = Counter()
+        correct = Counter()
+        for (label, pred), count in self.counts.items():
+            support[label] += count
+            predicted[pred] += count
+            if label == pred:
+                correct[label] += count
+
+        if not total:
+            return {"accuracy": 0.0, "precision": 0.0, "recall": 0.0, "f1_score": 0.0}
+
+        precision = recall = f1 = 0.0
+        for label, label_support in support.items():
+            tp = correct[label]
+            fp = predicted[label] - tp
+            fn = label_support - tp
+            weight = label_support / total
+            precision += weight * (tp / (tp + fp) if tp + fp else 0.0)
+            recall += weight * (tp / label_support)
+            f1 += weight * (2 * tp / (2 * tp + fp + fn))
+
+        return {
+            "accuracy": sum(correct.values()) / total,
+            "precision": precision,
+            "recall": recall,
+            "f1_score": f1
+        }
+
+def iter_chunks(path, chunk_size):
+    # Yields (texts, labels) without ever holding the whole test set in memory
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=["text", "label"]):
+            data = batch.to_pydict()
+            yield data["text"], data["label"]
+    elif path.endswith((".arrow", ".feather")):
+        import pyarrow as pa
+        with pa.memory_map(path, "r") as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                for offset in range(0, batch.num_rows, chunk_size):
+                    data = batch.slice(offset, chunk_size).select(["text", "label"]).to_pydict()
+                    yield data["text"], data["label"]
+    else:
+        for chunk in pd.read_csv(path, usecols=["text", "label"], chunksize=chunk_size):
+            yield chunk["text"].tolist(), chunk["label"].tolist()
+
+def label_ids(labels, label2id):
+    # Class-name labels are mapped through the model's label2id so they compare with predicted ids
+    ids = []
+    for label in labels:
+        if isinstance(label, str):
+            if label in label2id:
+                label = label2id[label]
+            elif label.strip().lstrip("-").isdigit():
+                label = int(label)
+            else:
+                raise ValueError(f"Label '{label}' is not in the model's label2id {sorted(label2id)}")
+        ids.append(int(label))
+    return ids
+
+def token_cache_key(tokenizer, data_path, label2id):
+    # Same tokenizer configuration + same label mapping + same test file bytes => same cache
+    digest = hashlib.sha256()
+    digest.update(tokenizer.backend_tokenizer.to_str().encode("utf-8"))
+    digest.update(str(tokenizer.model_max_length).encode("utf-8"))
+    digest.update(json.dumps(label2id, sort_keys=True).encode("utf-8"))
+    with open(data_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def build_token_cache(args, tokenizer, cache_path, label2id):
+    # Batch-tokenizes the test set once into flat int32 arrays plus row offsets
+    tmp_path = f"{cache_path}.tmp-{os.getpid()}"
+    os.makedirs(tmp_path)
+    files = {}
+    rows = 0
+    end = 0
+
+    try:
+        with open(os.path.join(tmp_path, "offsets.bin"), "wb") as offsets_file, \
+                open(os.path.join(tmp_path, "labels.bin"), "wb") as labels_file:
+            np.zeros(1, dtype=np.int64).tofile(offsets_file)
+            for texts, labels in tqdm(iter_chunks(args.data, args.chunk_size), desc="Tokenizing", unit="chunks"):
+                encodings = tokenizer(texts, truncation=True)
+                for key in encodings.keys():
+                    if key not in files:
+                        files[key] = open(os.path.join(tmp_path, f"{key}.bin"), "wb")
+                    flat = itertools.chain.from_iterable(encodings[key])
+                    np.fromiter(flat, dtype=np.int32).tofile(files[key])
+
+                lengths = np.fromiter((len(ids) for ids in encodings["input_ids"]), dtype=np.int64)
+                (end + np.cumsum(lengths)).tofile(offsets_file)
+                np.asarray(label_ids(labels, label2id), dtype=np.int64).tofile(labels_file)
+                end += int(lengths.sum())
+                rows += len(texts)
+
+        for f in files.values():
+            f.close()
+        with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+            json.dump({"rows": rows, "keys": list(files)}, f)
+
+        try:
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # A concurrent evaluation published the same cache first; use theirs
+            if not os.path.exists(os.path.join(cache_path, "meta.json")):
+                raise
+    finally:
+        for f in files.values():
+            f.close()
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+def iter_cached_chunks(cache_path, chunk_size):
+    # Yields (encodings, labels) sliced from the memory-mapped token cache
+    with open(os.path.join(cache_path, "meta.json")) as f:
+        meta = json.load(f)
+    rows = meta["rows"]
+    if not rows:
+        return
+
+    offsets = np.memmap(os.path.join(cache_path, "offsets.bin"), dtype=np.int64, mode="r")
+    labels = np.memmap(os.path.join(cache_path, "labels.bin"), dtype=np.int64, mode="r")
+    arrays = {key: np.memmap(os.path.join(cache_path, f"{key}.bin"), dtype=np.int32, mode="r")
+              for key in meta["keys"]}
+
+    for start in range(0, rows, chunk_size):
+        stop = min(start + chunk_size, rows)
+        bounds = offsets[start:stop + 1] - offsets[start]
+        encodings = {}
+        for key, array in arrays.items():
+            flat = array[offsets[start]:offsets[stop]]
+            encodings[key] = [flat[bounds[i]:bounds[i + 1]].tolist() for i in range(stop - start)]
+        yield encodings, labels[start:stop].tolist()
 
+def test_set(args, tokenizer, label2id):
+    # Returns a function producing the chunk iterator, served from the token cache when enabled
+    def raw_chunks():
+        for texts, labels in iter_chunks(args.data, args.chunk_size):
+            yield texts, label_ids(labels, label2id)
+
+    if not args.token_cache:
+        return raw_chunks
+    if not getattr(tokenizer, "is_fast", False):
+        print("Token cache needs a fast tokenizer; tokenizing on the fly")
+        return raw_chunks
+
+    os.makedirs(args.token_cache, exist_ok=True)
+    cache_path = os.path.join(args.token_cache, token_cache_key(tokenizer, args.data, label2id))
+    if not os.path.exists(os.path.join(cache_path, "meta.json")):
+        build_token_cache(args, tokenizer, cache_path, label2id)
+    return lambda: iter_cached_chunks(cache_path, args.chunk_size)
+
+def predict(encodings, tokenizer, forward, batch_size):
+    # Sort the unpadded encodings by length so each batch is
+    # only padded to its own longest sequence
+    keys = list(encodings.keys())
+    order = np.argsort([len(ids) for ids in encodings["input_ids"]], kind="stable")
+
+    preds = np.empty(len(order), dtype=np.int64)
+
+    for start in range(0, len(order), batch_size):
+        indices = order[start:start + batch_size]
+        features = [{key: encodings[key][i] for key in keys} for i in indices]
+        inputs = tokenizer.pad(features, padding=True, return_tensors="np")
+        preds[indices] = forward(dict(inputs)).argmax(axis=1)
+
+    return preds
+
+class LogitsOnly(torch.nn.Module):
+    # Positional-input, logits-only wrapper so the model can be traced for ONNX export
+    def __init__(self, model, input_names):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *tensors):
+        return self.model(**dict(zip(self.input_names, tensors))).logits
+
+def prepare_backend(backend, model, tokenizer, onnx_path):
+    # Done once in the parent; returns what each worker needs to build its forward function
+    if backend == "int8":
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "onnx":
+        sample = tokenizer(["An example input."], return_tensors="pt")
+        input_names = list(sample.keys())
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["logits"] = {0: "batch"}
+        torch.onnx.export(
+            LogitsOnly(model, input_names), tuple(sample[name] for name in input_names), onnx_path,
+            input_names=input_names, output_names=["logits"], dynamic_axes=dynamic_axes, opset_version=17
+        )
+        return onnx_path
+    return model
+
+def make_forward(backend, prepared, threads):
+    # Maps a dict of padded numpy inputs to a numpy array of logits
+    if backend == "onnx":
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        session = ort.InferenceSession(prepared, options, providers=["CPUExecutionProvider"])
+        input_names = {node.name for node in session.get_inputs()}
+
+        def forward(inputs):
+            return session.run(["logits"], {k: v for k, v in inputs.items() if k in input_names})[0]
+        return forward
+
+    def forward(inputs):
+        with torch.inference_mode():
+            return prepared(**{k: torch.from_numpy(v) for k, v in inputs.items()}).logits.numpy()
+    return forward
+
+# State of the current inference process, set up once by init_worker
+_worker = {}
+
+def init_worker(backend, tokenizer, prepared, batch_size, threads):
+    # Split the cores between workers so they don't oversubscribe them
+    torch.set_num_threads(threads)
+    forward = make_forward(backend, prepared, threads)
+    _worker.update(tokenizer=tokenizer, forward=forward, batch_size=batch_size)
+
+def evaluate_chunk(chunk):
+    inputs, labels = chunk
+    tokenizer = _worker["tokenizer"]
+    # Raw texts are tokenized here; chunks from the token cache arrive already encoded
+    encodings = tokenizer(inputs, truncation=True) if isinstance(inputs, list) else inputs
+    preds = predict(encodings, tokenizer, _worker["forward"], _worker["batch_size"])
+    counts = ConfusionCounts()
+    counts.update(labels, preds.tolist())
+    return counts, len(labels)
+
+def run_backend(args, backend, tokenizer, model, chunks, workers, threads):
+    # Evaluates the whole test set with one backend, returning (counts, seconds)
+    prepared = prepare_backend(backend, model, tokenizer, args.onnx_path)
+    started = time.perf_counter()
+
+    # Stream the test set chunk by chunk, keeping only confusion counts
+    counts = ConfusionCounts()
+    with tqdm(desc=f"Evaluating ({backend})", unit="rows") as progress:
+        if workers == 1:
+            init_worker(backend, tokenizer, prepared, args.batch_size, threads)
+            for chunk in chunks():
+                chunk_counts, rows = evaluate_chunk(chunk)
+                counts.merge(chunk_counts)
+                progress.update(rows)
+        else:
+            # Weights live in shared memory, so workers map them instead of copying
+            if isinstance(prepared, torch.nn.Module):
+                prepared.share_memory()
+            os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+            method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+            context = mp.get_context(method)
+
+            with context.Pool(workers, initializer=init_worker,
+                              initargs=(backend, tokenizer, prepared, args.batch_size, threads)) as pool:
+                # Keep a bounded number of chunks in flight so reading stays streaming
+                pending = deque()
+                for chunk in chunks():
+                    pending.append(pool.apply_async(evaluate_chunk, (chunk,)))
+                    if len(pending) >= 2 * workers:
+                        chunk_counts, rows = pending.popleft().get()
+                        counts.merge(chunk_counts)
+                        progress.update(rows)
+                while pending:
+                    chunk_counts, rows = pending.popleft().get()
+                    counts.merge(chunk_counts)
+                    progress.update(rows)
+
+    return counts, time.perf_counter() - started
+
+def backend_report(backend, counts, seconds):
+    rows = sum(counts.counts.values())
+    report = {name: round(value, 4) for name, value in counts.metrics().items()}
+    report["backend"] = backend
+    report["throughput_rows_per_sec"] = round(rows / seconds, 2) if seconds > 0 else 0.0
+    return report
+
+def evaluate(args):
     # Load tokenizer and model from current directory
     tokenizer = AutoTokenizer.from_pretrained(".")
     model = AutoModelForSequenceClassification.from_pretrained(".")
     model.eval()
 
-    preds = []
+    workers = max(1, args.workers)
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+
+    chunks = test_set(args, tokenizer, dict(model.config.label2id or {}))
 
-    with torch.no_grad():
-        for text in tqdm(texts, desc="Evaluating"):
-            inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-            outputs = model(**inputs)
-            logits = outputs.logits
-            pred = torch.argmax(logits, dim=1).item()
-            preds.append(pred)
+    results = backend_report(
+        args.backend, *run_backend(args, args.backend, tokenizer, model, chunks, workers, threads)
+    )
 
-    # Compute metrics
-    accuracy = accuracy_score(labels, preds)
-    precision = precision_score(labels, preds, average="weighted", zero_division=0)
-    recall = recall_score(labels, preds, average="weighted", zero_division=0)
-    f1 = f1_score(labels, preds, average="weighted", zero_division=0)
+    # Tell whether the cheaper backend is safe to use by comparing it with a reference run
+    if args.compare_backend:
+        reference = backend_report(
+            args.compare_backend,
+            *run_backend(args, args.compare_backend, tokenizer, model, chunks, workers, threads)
+        )
+        results["reference"] = reference
+        results["accuracy_delta"] = round(results["accuracy"] - reference["accuracy"], 4)
 
     # Save to results.json
-    results = {
-        "accuracy": round(accuracy, 4),
-        "precision": round(precision, 4),
-        "recall": round(recall, 4),
-        "f1_score": round(f1, 4)
-    }
-
-    with open("results.json", "w") as f:
+    with open(args.output, "w") as f:
         json.dump(results, f)
 
-    print("Evaluation complete. Results saved to results.json")
+    print(f"Evaluation complete. Results saved to {args.output}")
 
 if __name__ == "__main__":
-    evaluate()
+    evaluate(parse_args())
@@ -0,0 +1,99 @@
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+# Records read back share one metric name tuple per field layout
+_metric_name_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+class EvaluationResult:
+    """
+    One model's evaluation, kept compact until it is written out.
+
+    Scores and latencies are tuples in the order of ``metric_names``, a tuple
+    shared by every result of an evaluator, so a result costs a few slots
+    instead of a 20-key dict. Read access mirrors the NDJSON record
+    (``result["license"]``, ``result["license_latency"]``, ``"size_score" in
+    result``); ``to_dict()`` builds that record at the output boundary.
+    """
+
+    __slots__ = ("name", "net_score", "net_score_latency", "metric_names", "scores", "latencies")
+
+    category = "MODEL"
+
+    def __init__(self, name: str, net_score: float, net_score_latency: int,
+                 metric_names: Tuple[str, ...], scores: Tuple[Any, ...], latencies: Tuple[int, ...]):
+        self.name = name
+        self.net_score = net_score
+        self.net_score_latency = net_score_latency
+        self.metric_names = metric_names
+        self.scores = scores
+        self.latencies = latencies
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "name":
+            return self.name
+        if key == "category":
+            return self.category
+        if key == "net_score":
+            return self.net_score
+        if key == "net_score_latency":
+            return self.net_score_latency
+        if key in self.metric_names:
+            return self.scores[self.metric_names.index(key)]
+        if key.endswith("_latency") and key[:-len("_latency")] in self.metric_names:
+            return self.latencies[self.metric_names.index(key[:-len("_latency")])]
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> Iterator[str]:
+        yield from ("name", "category", "net_score", "net_score_latency")
+        for metric_name in self.metric_names:
+            yield metric_name
+            yield f"{metric_name}_latency"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The result as an output record, in NDJSON field order"""
+        record = {
+            "name": self.name,
+            "category": self.category,
+            "net_score": self.net_score,
+            "net_score_latency": self.net_score_latency
+        }
+        for metric_name, score, latency in zip(self.metric_names, self.scores, self.latencies):
+            record[metric_name] = dict(score) if isinstance(score, dict) else score
+            record[f"{metric_name}_latency"] = latency
+        return record
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "EvaluationResult":
+        """Rebuild a result from its output record (e.g. read back from a shard or the work queue)"""
+        metric_names = tuple(
+            key for key in record
+            if key not in ("name", "category", "net_score", "net_score_latency") and not key.endswith("_latency")
+        )
+        metric_names = _metric_name_tuples.setdefault(metric_names, metric_names)
+        return cls(
+            record["name"], record["net_score"], record["net_score_latency"], metric_names,
+            tuple(record[name] for name in metric_names),
+            tuple(record.get(f"{name}_latency", 0) for name in metric_names)
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, EvaluationResult):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"EvaluationResult(name={self.name!r}, net_score={self.net_score!r})"
@@ -0,0 +1,57 @@
+from typing import Dict, Iterable, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+
+from url_classifier import URLType
+from handlers import BaseResourceHandler
+from metrics.base_metric import BaseMetric
+
+
+class FetchPlanner:
+    """Fetches every artifact required by a set of metrics exactly once, in parallel"""
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self.logger = logging.getLogger(__name__)
+
+    def plan(self, metrics: Iterable[BaseMetric],
+             resources: Dict[URLType, List[BaseResourceHandler]]) -> List[Tuple[BaseResourceHandler, str]]:
+        """
+        Collect the distinct (handler, artifact) pairs needed by the given metrics
+
+        Args:
+            metrics: Metrics that are about to be calculated
+            resources: Dictionary mapping URLType to list of resource handlers
+
+        Returns:
+            List of (handler, artifact name) pairs, each appearing once
+        """
+        planned = {}
+        for metric in metrics:
+            for url_type, artifact_names in metric.required_artifacts().items():
+                for handler in resources.get(url_type, []):
+                    for name in artifact_names:
+                        planned.setdefault((id(handler), name), (handler, name))
+        return list(planned.values())
+
+    def execute(self, plan: List[Tuple[BaseResourceHandler, str]]) -> None:
+        """Fetch all planned artifacts in parallel; handlers cache the results"""
+        if not plan:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_artifact = {
+                executor.submit(handler.fetch_artifact, name): (handler, name)
+                for handler, name in plan
+            }
+            for future in as_completed(future_to_artifact):
+                handler, name = future_to_artifact[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    self.logger.error(f"Error fetching {name} for {handler.url}: {e}")
+
+    def prefetch(self, metrics: Iterable[BaseMetric],
+                 resources: Dict[URLType, List[BaseResourceHandler]]) -> None:
+        """Plan and execute the fetch phase for the given metrics"""
+        self.execute(self.plan(metrics, resources))
@@ -1,19 +1,55 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, FrozenSet, Iterable, List, Optional, Callable, Tuple
 import tempfile
 import subprocess
 import os
 import logging
+import re
 import shutil
+import threading
+import time
+from urllib.parse import quote, unquote, urlparse
+
+import requests
+
+import json_backend
+from concurrency_limiter import AdaptiveConcurrencyLimiter, get_concurrency_limiter
+from http_cache import get_http_cache
+from http_cassette import CassetteMissError, get_cassette
+from instrumentation import INSTRUMENTATION
+from rate_limiter import get_rate_limiter
+from .license_matcher import find_license, license_score, normalize_license
+
+
+# Responses worth retrying when HTTP_MAX_RETRIES allows it
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# URL path segments introducing a revision, e.g. /tree/<rev> or /blob/<rev>/README.md
+REVISION_MARKERS = ("tree", "blob", "resolve")
+
+COMMIT_SHA_PATTERN = re.compile(r"[0-9a-f]{40}")
+
+_requested_fields_lock = threading.Lock()
 
 
 class BaseResourceHandler(ABC):
     """Base class for handling different types of resources"""
 
+    # Maps artifact names that metrics can declare to the methods fetching them
+    ARTIFACTS: Dict[str, str] = {}
+
+    # Leading URL path segments naming the repository, e.g. org/name
+    REPO_SEGMENTS = 2
+
+    # Payload fields metrics asked to keep beyond each handler's *_FIELDS, per artifact
+    _requested_fields: Dict[str, FrozenSet[str]] = {}
+
     def __init__(self, url: str):
         self.url = url
         self.logger = logging.getLogger(self.__class__.__name__)
         self._cached_data: Dict[str, Any] = {}
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+        self._fetch_locks_guard = threading.Lock()
 
     @abstractmethod
     def get_license_score(self) -> float:
@@ -38,12 +74,252 @@ class BaseResourceHandler(ABC):
         """Set cached data"""
         self._cached_data[key] = value
 
+    @staticmethod
+    def _huggingface_url(path: str) -> str:
+        """Hugging Face URL for path (HF_ENDPOINT overrides the host, e.g. for a local stand-in)"""
+        return os.environ.get('HF_ENDPOINT', 'https://huggingface.co').rstrip('/') + path
+
+    @staticmethod
+    def _github_api_url(path: str) -> str:
+        """GitHub API URL for path (GITHUB_API_URL overrides the host)"""
+        return os.environ.get('GITHUB_API_URL', 'https://api.github.com').rstrip('/') + path
+
+    @staticmethod
+    def _response_json(response: requests.Response) -> Any:
+        """Decode a JSON response body with the configured JSON backend"""
+        content = getattr(response, 'content', None)
+        if isinstance(content, (bytes, bytearray)):
+            return json_backend.loads(content)
+        return response.json()
+
+    @classmethod
+    def request_fields(cls, artifact: str, fields: Iterable[str]) -> None:
+        """
+        Keep extra payload fields of an artifact for every handler of this class
+
+        Called with the fields metrics declare in BaseMetric.required_fields, so
+        plugin metrics can read fields the built-in metrics do not need.
+
+        Args:
+            artifact: Artifact name from ARTIFACTS, e.g. "repo_info"
+            fields: Top-level JSON keys (of each item, for list artifacts) to keep
+        """
+        if artifact not in cls.ARTIFACTS:
+            raise KeyError(f"{cls.__name__} does not provide artifact '{artifact}'")
+        with _requested_fields_lock:
+            requested = dict(cls.__dict__.get('_requested_fields', {}))
+            requested[artifact] = requested.get(artifact, frozenset()) | frozenset(fields)
+            cls._requested_fields = requested
+
+    def _artifact_fields(self, artifact: str, fields: Tuple[str, ...]) -> Tuple[str, ...]:
+        """A handler's own kept fields plus any that metrics requested for the artifact"""
+        requested = self._requested_fields.get(artifact)
+        if not requested:
+            return fields
+        return fields + tuple(sorted(requested.difference(fields)))
+
+    @staticmethod
+    def _keep_fields(data: Any, fields: Tuple[str, ...]) -> Any:
+        """Only the listed keys of a JSON object, so raw API payloads are not held (other values pass through)"""
+        if not isinstance(data, dict):
+            return data
+        return {key: data[key] for key in fields if key in data}
+
+    @staticmethod
+    def _split_revision(path_parts: List[str], repo_segments: int = 2) -> Tuple[List[str], Optional[str]]:
+        """
+        Split URL path segments into the repository part and the /tree/<rev> (or /blob/, /resolve/) revision
+
+        Args:
+            path_parts: Segments of the URL path
+            repo_segments: Segments naming the repository (e.g. org/name), which are never revision markers
+
+        Returns:
+            The segments before the marker and the revision, or all segments and None
+        """
+        for index in range(repo_segments, len(path_parts) - 1):
+            if path_parts[index] in REVISION_MARKERS:
+                revision = path_parts[index + 1:]
+                if revision[0] == 'refs':
+                    # refs/pr/<n>, refs/convert/<name>: the only revisions spanning several segments
+                    revision = revision[:3]
+                else:
+                    revision = revision[:1]
+                return path_parts[:index], unquote('/'.join(revision))
+        return path_parts, None
+
+    def _extract_revision(self) -> Optional[str]:
+        """Revision named by the URL (a branch, tag or commit SHA), or None for the default branch"""
+        return self._split_revision(urlparse(self.url).path.strip('/').split('/'), self.REPO_SEGMENTS)[1]
+
+    @staticmethod
+    def is_commit_sha(revision: Optional[str]) -> bool:
+        """True for a full commit SHA, whose content can never change"""
+        return bool(revision) and COMMIT_SHA_PATTERN.fullmatch(revision) is not None
+
+    def get_huggingface_api_data(self) -> Dict[str, Any]:
+        """Hugging Face API data of the resource (resources not hosted there have none)"""
+        return {}
+
+    def get_revision_sha(self) -> Optional[str]:
+        """Commit SHA the URL's revision (main by default) resolves to, or None if it could not be resolved"""
+        api_data = self.get_huggingface_api_data()
+        sha = api_data.get('sha') if isinstance(api_data, dict) else None
+        return sha if isinstance(sha, str) and self.is_commit_sha(sha) else None
+
+    def _get_huggingface_repo_info(self, api_prefix: str, repo_id: str) -> requests.Response:
+        """
+        GET a Hugging Face repository's API info, at the URL's revision if it names one
+
+        Args:
+            api_prefix: API path prefix of the repository type, "models" or "datasets"
+            repo_id: Repository ID, e.g. org/name
+
+        Returns:
+            The response (pinned to a commit SHA revision, it is cached without expiry)
+        """
+        if self.revision:
+            api_url = self._huggingface_url(f"/api/{api_prefix}/{repo_id}/revision/{quote(self.revision, safe='')}")
+            return self._http_get(api_url, f"/api/{api_prefix}/{{id}}/revision/{{rev}}",
+                                  immutable=self.is_commit_sha(self.revision))
+        return self._http_get(self._huggingface_url(f"/api/{api_prefix}/{repo_id}"), f"/api/{api_prefix}/{{id}}")
+
+    def _cached(self, key: str, fetch: Callable[[], Any]) -> Any:
+        """Return cached data for key, fetching it on first use (failed fetches are cached too)"""
+        hit = key in self._cached_data
+        INSTRUMENTATION.record_cache(key, hit)
+        if not hit:
+            # Artifacts are prefetched in parallel and may depend on each other
+            # (e.g. the revision SHA), so each key is fetched by one thread only
+            with self._fetch_locks_guard:
+                lock = self._fetch_locks.setdefault(key, threading.Lock())
+            with lock:
+                if key not in self._cached_data:
+                    self._cached_data[key] = fetch()
+        return self._cached_data[key]
+
+    def _http_get(self, url: str, endpoint: str, headers: Optional[Dict[str, str]] = None,
+                  timeout: float = 10, immutable: bool = False) -> requests.Response:
+        """
+        GET a URL, recording latency, status, retries and bytes under an endpoint template
+
+        Args:
+            url: Full request URL
+            endpoint: Endpoint template used as the instrumentation label, e.g. "/api/models/{id}"
+            headers: Optional request headers
+            timeout: Per-attempt timeout in seconds
+            immutable: The URL is pinned to a commit SHA, so a cached response never expires
+
+        Returns:
+            The final response (after up to HTTP_MAX_RETRIES retries on errors and 429/5xx)
+        """
+        start = time.perf_counter()
+
+        # Serve from / record to the HTTP_CASSETTE archive when enabled
+        cassette = get_cassette()
+        if cassette is not None and cassette.replays:
+            response = cassette.replay(url)
+            INSTRUMENTATION.record_cache("http_cassette", response is not None)
+            if response is not None:
+                INSTRUMENTATION.record_request(
+                    endpoint, response.status_code, time.perf_counter() - start, len(response.content)
+                )
+                return response
+            if cassette.strict:
+                INSTRUMENTATION.record_request(endpoint, None, time.perf_counter() - start)
+                raise CassetteMissError(f"No recorded response for {url}")
+
+        # Responses shared with other processes through HTTP_CACHE_DIR
+        http_cache = get_http_cache()
+        if http_cache is not None:
+            response = http_cache.get(url, immutable=immutable)
+            INSTRUMENTATION.record_cache("http_cache", response is not None)
+            if response is not None:
+                INSTRUMENTATION.record_request(
+                    endpoint, response.status_code, time.perf_counter() - start, len(response.content)
+                )
+                # A cassette being recorded must also hold responses served from the cache
+                if cassette is not None and cassette.mode != "replay":
+                    cassette.record(url, response)
+                return response
+
+        # HTTP_RATE_LIMIT is a per-host budget shared by all processes; the adaptive
+        # limiter bounds this process's concurrent requests per host
+        rate_limiter = get_rate_limiter()
+        concurrency_limiter = get_concurrency_limiter()
+        host = urlparse(url).netloc
+
+        max_retries = int(os.environ.get('HTTP_MAX_RETRIES', '0'))
+        backoff = float(os.environ.get('HTTP_RETRY_BACKOFF', '0.5'))
+        attempt = 0
+        while True:
+            if rate_limiter is not None:
+                rate_limiter.acquire(host)
+            try:
+                response = self._limited_get(url, endpoint, headers, timeout, host, concurrency_limiter)
+            except requests.RequestException:
+                if attempt < max_retries:
+                    attempt += 1
+                    time.sleep(backoff * 2 ** (attempt - 1))
+                    continue
+                INSTRUMENTATION.record_request(endpoint, None, time.perf_counter() - start, retries=attempt)
+                raise
+
+            status = response.status_code if isinstance(response.status_code, int) else None
+            if status in RETRY_STATUS_CODES and attempt < max_retries:
+                attempt += 1
+                time.sleep(backoff * 2 ** (attempt - 1))
+                continue
+
+            INSTRUMENTATION.record_request(
+                endpoint, status, time.perf_counter() - start, self._response_bytes(response), attempt
+            )
+            if cassette is not None and cassette.mode != "replay":
+                cassette.record(url, response)
+            if http_cache is not None:
+                http_cache.put(url, response)
+            return response
+
+    @staticmethod
+    def _limited_get(url: str, endpoint: str, headers: Optional[Dict[str, str]], timeout: float, host: str,
+                     concurrency_limiter: Optional[AdaptiveConcurrencyLimiter]) -> requests.Response:
+        """One GET attempt inside a slot of the host's adaptive concurrency limit"""
+        if concurrency_limiter is None:
+            return requests.get(url, headers=headers, timeout=timeout)
+
+        concurrency_limiter.acquire(host)
+        start = time.perf_counter()
+        status = None
+        try:
+            response = requests.get(url, headers=headers, timeout=timeout)
+            # Stand-in responses without a status code carry no overload signal
+            status = response.status_code if isinstance(response.status_code, int) else 200
+            return response
+        finally:
+            concurrency_limiter.release(host, time.perf_counter() - start, status, endpoint)
+
+    @staticmethod
+    def _response_bytes(response: Any) -> int:
+        """Size of the response body (0 if unknown)"""
+        content = getattr(response, 'content', None)
+        if isinstance(content, (bytes, bytearray)):
+            return len(content)
+        text = getattr(response, 'text', None)
+        return len(text) if isinstance(text, str) else 0
+
+    def fetch_artifact(self, name: str) -> Any:
+        """Fetch a named artifact, or return it from the cache if already fetched"""
+        method_name = self.ARTIFACTS.get(name)
+        if method_name is None:
+            raise KeyError(f"{self.__class__.__name__} does not provide artifact '{name}'")
+        return getattr(self, method_name)()
+
     def _clone_repository(self, clone_url: str) -> Optional[str]:
         """Clone repository to temporary directory and return path"""
         temp_dir = None
         try:
             temp_dir = tempfile.mkdtemp(prefix='repo_clone_')
-            clone_cmd = ['git', 'clone', clone_url, temp_dir]
+            clone_cmd = ['git', 'clone', '--', clone_url, temp_dir]
 
             self.logger.info(f"Cloning repository: {clone_url}")
             result = subprocess.run(clone_cmd, capture_output=True, text=True, timeout=300)
@@ -69,53 +345,8 @@ class BaseResourceHandler(ABC):
 
     def _parse_license_identifier(self, license_id: str) -> float:
         """Parse license information from SPDX identifier or license name"""
-        if not license_id:
-            return 0.0
-
-        license_lower = license_id.lower().strip()
-
-        # Accepted SPDX license identifiers and common names
-        accepted_licenses = {
-            # MIT
-            'mit', 'mit license',
-            # Apache
-            'apache', 'apache-2.0', 'apache 2.0', 'apache license',
-            # BSD variants
-            'bsd', 'bsd-2-clause', 'bsd-3-clause', 'bsd license',
-            # GPL variants
-            'gpl-2.0', 'gpl-2.0-only', 'gpl-2.0-or-later', 'gplv2',
-            'gpl-3.0', 'gpl-3.0-only', 'gpl-3.0-or-later', 'gplv3',
-            # LGPL variants
-            'lgpl-2.1', 'lgpl-2.1-only', 'lgpl-2.1-or-later', 'lgplv2.1',
-            'lgpl-3.0', 'lgpl-3.0-only', 'lgpl-3.0-or-later', 'lgplv3',
-            # Creative Commons
-            'cc0', 'cc0-1.0', 'creative commons zero',
-            # Other permissive licenses
-            'unlicense', 'public domain'
-        }
-
-        return 1.0 if license_lower in accepted_licenses else 0.0
+        return license_score(normalize_license(license_id))
 
     def _parse_license_from_text(self, text: str) -> float:
         """Parse license information from text content (fallback method)"""
-        if not text:
-            return 0.0
-
-        text_lower = text.lower()
-
-        # Accepted licenses: MIT, Apache, BSD, GPLv2, LGPLv2.1, LGPLv3, CC0
-        accepted_licenses = [
-            'mit license', 'mit',
-            'apache license', 'apache', 'apache-2.0', 'apache 2.0',
-            'bsd license', 'bsd',
-            'gpl-2.0', 'gplv2', 'gpl v2', 'gnu general public license version 2',
-            'lgpl-2.1', 'lgplv2.1', 'lgpl v2.1',
-            'lgpl-3.0', 'lgplv3', 'lgpl v3',
-            'cc0', 'cc0-1.0', 'creative commons zero'
-        ]
-
-        # Check if any accepted license is mentioned
-        if any(pattern in text_lower for pattern in accepted_licenses):
-            return 1.0
-        else:
-            return 0.0
+        return license_score(find_license(text))
@@ -1,5 +1,4 @@
-from typing import Dict, Any
-import requests
+from typing import Dict, Any, List, Optional
 import os
 from urllib.parse import urlparse
 
@@ -9,6 +8,18 @@ from .base_resource_handler import BaseResourceHandler
 class CodeHandler(BaseResourceHandler):
     """Handler for GitHub code repository resources"""
 
+    ARTIFACTS = {
+        "repo_info": "get_github_api_data",
+        "contributors": "get_contributors",
+        "code_search": "get_code_search_results"
+    }
+
+    # Fields of the API payloads kept after a fetch; metrics ask for more through required_fields()
+    GITHUB_API_FIELDS = ("description", "has_readme", "has_wiki", "has_issues", "homepage",
+                         "stargazers_count", "updated_at")
+    CODE_SEARCH_FIELDS = ("total_count",)
+    CONTRIBUTOR_FIELDS = ("login", "contributions")
+
     def __init__(self, url: str):
         super().__init__(url)
         self.repo_path = self._extract_repo_path()
@@ -21,26 +32,25 @@ class CodeHandler(BaseResourceHandler):
             return f"{path_parts[0]}/{path_parts[1]}"
         return ""
 
+    def _github_headers(self) -> Dict[str, str]:
+        """Request headers, authenticated with GITHUB_TOKEN if available"""
+        headers = {}
+        github_token = os.environ.get('GITHUB_TOKEN')
+        if github_token:
+            headers['Authorization'] = f'token {github_token}'
+        return headers
+
     def get_github_api_data(self) -> Dict[str, Any]:
         """Get data from GitHub API"""
-        cached = self._cache_get('github_api_data')
-        if cached:
-            return cached
+        return self._cached('github_api_data', self._fetch_github_api_data)
 
+    def _fetch_github_api_data(self) -> Dict[str, Any]:
         try:
-            api_url = f"https://api.github.com/repos/{self.repo_path}"
-            headers = {}
-
-            # Add GitHub token if available
-            github_token = os.environ.get('GITHUB_TOKEN')
-            if github_token:
-                headers['Authorization'] = f'token {github_token}'
-
-            response = requests.get(api_url, headers=headers, timeout=10)
+            api_url = self._github_api_url(f"/repos/{self.repo_path}")
+            response = self._http_get(api_url, "/repos/{repo}", headers=self._github_headers())
             if response.status_code == 200:
-                data = response.json()
-                self._cache_set('github_api_data', data)
-                return data
+                return self._keep_fields(self._response_json(response),
+                                        self._artifact_fields('repo_info', self.GITHUB_API_FIELDS))
             elif response.status_code == 401:
                 self.logger.error("GitHub API authentication failed - invalid token")
                 # Continue without authentication for rate-limited access
@@ -52,27 +62,26 @@ class CodeHandler(BaseResourceHandler):
 
     def has_evaluation_code(self) -> bool:
         """Check if repository has evaluation code"""
-        try:
-            # Search for evaluation-related files
-            search_url = f"https://api.github.com/search/code?q=repo:{self.repo_path}+evaluation+test+benchmark"
-            headers = {}
+        results = self.get_code_search_results()
+        return bool(results) and results.get('total_count', 0) > 0
 
-            # Add GitHub token if available
-            github_token = os.environ.get('GITHUB_TOKEN')
-            if github_token:
-                headers['Authorization'] = f'token {github_token}'
+    def get_code_search_results(self) -> Optional[Dict[str, Any]]:
+        """Search the repository for evaluation-related files"""
+        return self._cached('code_search', self._fetch_code_search_results)
 
-            response = requests.get(search_url, headers=headers, timeout=10)
+    def _fetch_code_search_results(self) -> Optional[Dict[str, Any]]:
+        try:
+            search_url = self._github_api_url(f"/search/code?q=repo:{self.repo_path}+evaluation+test+benchmark")
+            response = self._http_get(search_url, "/search/code", headers=self._github_headers())
             if response.status_code == 200:
-                results = response.json()
-                return results.get('total_count', 0) > 0
+                return self._keep_fields(self._response_json(response),
+                                        self._artifact_fields('code_search', self.CODE_SEARCH_FIELDS))
             elif response.status_code == 401:
                 self.logger.error("GitHub API authentication failed - invalid token")
-                return False
         except Exception as e:
             self.logger.error(f"Error checking evaluation code: {e}")
 
-        return False
+        return None
 
     def get_code_quality_score(self) -> float:
         """Evaluate code quality"""
@@ -126,13 +135,24 @@ class CodeHandler(BaseResourceHandler):
 
     def get_contributor_count(self) -> int:
         """Get number of contributors"""
+        contributors = self.get_contributors()
+        return len(contributors) if contributors is not None else 1
+
+    def get_contributors(self) -> Optional[List[Dict[str, Any]]]:
+        """Get the repository's contributor list, or None if it could not be fetched"""
+        return self._cached('contributors', self._fetch_contributors)
+
+    def _fetch_contributors(self) -> Optional[List[Dict[str, Any]]]:
         try:
-            contributors_url = f"https://api.github.com/repos/{self.repo_path}/contributors"
-            response = requests.get(contributors_url, timeout=10)
+            contributors_url = self._github_api_url(f"/repos/{self.repo_path}/contributors")
+            response = self._http_get(contributors_url, "/repos/{repo}/contributors", headers=self._github_headers())
             if response.status_code == 200:
-                contributors = response.json()
-                return len(contributors)
+                contributors = self._response_json(response)
+                if isinstance(contributors, list):
+                    fields = self._artifact_fields('contributors', self.CONTRIBUTOR_FIELDS)
+                    return [self._keep_fields(contributor, fields) for contributor in contributors]
+                return contributors
         except Exception as e:
             self.logger.error(f"Error getting contributor count: {e}")
 
-        return 1
+        return None
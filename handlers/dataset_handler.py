@@ -1,5 +1,4 @@
-from typing import Dict, Any
-import requests
+from typing import Dict, Any, Optional
 from urllib.parse import urlparse
 
 from .base_resource_handler import BaseResourceHandler
@@ -8,36 +7,55 @@ from .base_resource_handler import BaseResourceHandler
 class DatasetHandler(BaseResourceHandler):
     """Handler for Hugging Face dataset resources"""
 
+    ARTIFACTS = {"hf_dataset_info": "get_huggingface_api_data"}
+
+    # datasets/org/name
+    REPO_SEGMENTS = 3
+
+    # Fields of the API payload kept after a fetch; metrics ask for more through required_fields()
+    HF_API_FIELDS = ("sha", "downloads", "tags", "description", "cardData", "siblings")
+
     def __init__(self, url: str):
         super().__init__(url)
         self.dataset_id = self._extract_dataset_id()
+        self.revision = self._extract_revision()
 
     def _extract_dataset_id(self) -> str:
         """Extract dataset ID from Hugging Face URL"""
         parsed = urlparse(self.url)
-        path_parts = parsed.path.strip('/').split('/')
+        path_parts, _ = self._split_revision(parsed.path.strip('/').split('/'), self.REPO_SEGMENTS)
         if len(path_parts) >= 2 and path_parts[0] == 'datasets':
             return f"{path_parts[1]}/{path_parts[2]}" if len(path_parts) > 2 else path_parts[1]
         return ""
 
     def get_huggingface_api_data(self) -> Dict[str, Any]:
         """Get data from Hugging Face API"""
-        cached = self._cache_get('hf_api_data')
-        if cached:
-            return cached
+        return self._cached('hf_api_data', self._fetch_huggingface_api_data)
 
+    def _fetch_huggingface_api_data(self) -> Dict[str, Any]:
         try:
-            api_url = f"https://huggingface.co/api/datasets/{self.dataset_id}"
-            response = requests.get(api_url, timeout=10)
+            response = self._get_huggingface_repo_info("datasets", self.dataset_id)
             if response.status_code == 200:
-                data = response.json()
-                self._cache_set('hf_api_data', data)
-                return data
+                return self._compact_api_data(self._response_json(response))
         except Exception as e:
             self.logger.error(f"Error fetching dataset API data: {e}")
 
         return {}
 
+    def _compact_api_data(self, api_data: Any) -> Any:
+        """
+        Keep HF_API_FIELDS; the card and file list are only checked for presence and
+        count, unless a metric requested them in full
+        """
+        api_data = self._keep_fields(api_data, self._artifact_fields('hf_dataset_info', self.HF_API_FIELDS))
+        requested = self._requested_fields.get('hf_dataset_info', frozenset())
+        if isinstance(api_data, dict):
+            if 'cardData' in api_data and 'cardData' not in requested:
+                api_data['cardData'] = bool(api_data['cardData'])
+            if isinstance(api_data.get('siblings'), list) and 'siblings' not in requested:
+                api_data['siblings'] = len(api_data['siblings'])
+        return api_data
+
     def has_evaluation_dataset(self) -> bool:
         """Check if dataset is suitable for evaluation"""
         api_data = self.get_huggingface_api_data()
@@ -69,7 +87,8 @@ class DatasetHandler(BaseResourceHandler):
             score += 0.2
 
         # Check for multiple configs (versatility)
-        if len(api_data.get('siblings', [])) > 1:
+        siblings = api_data.get('siblings', 0)
+        if (siblings if isinstance(siblings, int) else len(siblings)) > 1:
             score += 0.2
 
         return min(score, 1.0)
@@ -81,7 +100,7 @@ class DatasetHandler(BaseResourceHandler):
     def get_documentation_score(self) -> float:
         """Evaluate documentation quality"""
         api_data = self.get_huggingface_api_data()
-        card_data = api_data.get('cardData', {})
+        card_data = api_data.get('cardData')
 
         score = 0.0
         if card_data:
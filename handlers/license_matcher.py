@@ -0,0 +1,98 @@
+from typing import Dict, FrozenSet, Optional
+import re
+
+
+# License names and identifiers as they appear in model cards and READMEs,
+# mapped to their SPDX identifier (SPDX IDs themselves are added below)
+SPDX_ALIASES: Dict[str, str] = {
+    # MIT
+    'mit': 'MIT', 'mit license': 'MIT', 'the mit license': 'MIT',
+    # Apache
+    'apache': 'Apache-2.0', 'apache license': 'Apache-2.0', 'apache 2.0': 'Apache-2.0',
+    'apache2': 'Apache-2.0', 'apache license 2.0': 'Apache-2.0',
+    'apache license version 2.0': 'Apache-2.0', 'apache license, version 2.0': 'Apache-2.0',
+    # BSD variants
+    'bsd': 'BSD-3-Clause', 'bsd license': 'BSD-3-Clause',
+    'bsd 2-clause': 'BSD-2-Clause', 'bsd 3-clause': 'BSD-3-Clause',
+    # GPL variants
+    'gpl-2.0': 'GPL-2.0-only', 'gplv2': 'GPL-2.0-only', 'gpl v2': 'GPL-2.0-only',
+    'gnu general public license version 2': 'GPL-2.0-only', 'gpl-2.0+': 'GPL-2.0-or-later',
+    'gpl-3.0': 'GPL-3.0-only', 'gplv3': 'GPL-3.0-only', 'gpl v3': 'GPL-3.0-only',
+    'gnu general public license version 3': 'GPL-3.0-only', 'gpl-3.0+': 'GPL-3.0-or-later',
+    # LGPL variants
+    'lgpl-2.1': 'LGPL-2.1-only', 'lgplv2.1': 'LGPL-2.1-only', 'lgpl v2.1': 'LGPL-2.1-only',
+    'lgpl-2.1+': 'LGPL-2.1-or-later',
+    'lgpl-3.0': 'LGPL-3.0-only', 'lgplv3': 'LGPL-3.0-only', 'lgpl v3': 'LGPL-3.0-only',
+    'lgpl-3.0+': 'LGPL-3.0-or-later',
+    # Creative Commons
+    'cc0': 'CC0-1.0', 'creative commons zero': 'CC0-1.0',
+    # Other permissive licenses
+    'unlicense': 'Unlicense', 'the unlicense': 'Unlicense',
+    'public domain': 'LicenseRef-Public-Domain',
+    # Recognized but not accepted
+    'agpl-3.0': 'AGPL-3.0-only', 'agplv3': 'AGPL-3.0-only',
+    'mpl-2.0': 'MPL-2.0', 'epl-2.0': 'EPL-2.0', 'bsl-1.0': 'BSL-1.0',
+    'afl-3.0': 'AFL-3.0', 'artistic-2.0': 'Artistic-2.0',
+    'cc-by-4.0': 'CC-BY-4.0', 'cc-by-sa-4.0': 'CC-BY-SA-4.0', 'cc-by-nc-4.0': 'CC-BY-NC-4.0',
+    'cc-by-nc-sa-4.0': 'CC-BY-NC-SA-4.0', 'cc-by-nc-nd-4.0': 'CC-BY-NC-ND-4.0',
+    'openrail': 'OpenRAIL', 'creativeml-openrail-m': 'CreativeML-OpenRAIL-M',
+    'bigscience-openrail-m': 'BigScience-OpenRAIL-M',
+}
+
+_SPDX_IDS = sorted(set(SPDX_ALIASES.values()))
+for _spdx_id in _SPDX_IDS:
+    SPDX_ALIASES.setdefault(_spdx_id.lower(), _spdx_id)
+
+# Licenses compatible with our use: MIT, Apache, BSD, GPL, LGPL, CC0 and public domain
+ACCEPTED_LICENSES: FrozenSet[str] = frozenset({
+    'MIT', 'Apache-2.0', 'BSD-2-Clause', 'BSD-3-Clause',
+    'GPL-2.0-only', 'GPL-2.0-or-later', 'GPL-3.0-only', 'GPL-3.0-or-later',
+    'LGPL-2.1-only', 'LGPL-2.1-or-later', 'LGPL-3.0-only', 'LGPL-3.0-or-later',
+    'CC0-1.0', 'Unlicense', 'LicenseRef-Public-Domain',
+})
+
+# One alternation over every alias, longest first so "apache-2.0" wins over "apache".
+# Aliases must stand alone: "mit" does not match inside "submit", "limit" or "mit.edu",
+# though a -licensed/-license suffix is allowed ("MIT-licensed", "Apache-2.0-licensed").
+_LICENSE_PATTERN = re.compile(
+    r'(?<![\w.-])(?:'
+    + '|'.join(re.escape(alias).replace(r'\ ', r'\s+') for alias in sorted(SPDX_ALIASES, key=len, reverse=True))
+    + r')(?!\w|-(?!licen[cs]ed?\b)|\.\w)',
+    re.IGNORECASE
+)
+
+
+def _alias_key(name: str) -> str:
+    return ' '.join(name.lower().split())
+
+
+def normalize_license(identifier: Optional[str]) -> Optional[str]:
+    """Map a license identifier or name to its SPDX ID (None if unrecognized)"""
+    if not identifier:
+        return None
+    return SPDX_ALIASES.get(_alias_key(identifier.strip().strip('"\'')))
+
+
+def find_license(text: Optional[str]) -> Optional[str]:
+    """
+    SPDX ID of the license mentioned in free text, in a single scan (None if none)
+
+    The first accepted license wins, so a README that mentions another license
+    first (e.g. "weights: openrail, code: MIT") is matched by its accepted
+    one; otherwise the first license mentioned is returned.
+    """
+    if not text:
+        return None
+    first = None
+    for match in _LICENSE_PATTERN.finditer(text):
+        spdx_id = SPDX_ALIASES[_alias_key(match.group(0))]
+        if spdx_id in ACCEPTED_LICENSES:
+            return spdx_id
+        if first is None:
+            first = spdx_id
+    return first
+
+
+def license_score(spdx_id: Optional[str]) -> float:
+    """1.0 for accepted licenses, 0.0 otherwise"""
+    return 1.0 if spdx_id in ACCEPTED_LICENSES else 0.0
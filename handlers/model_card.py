@@ -0,0 +1,174 @@
+from typing import Any, Dict, List, Optional
+import logging
+import re
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional; a minimal frontmatter reader is used instead
+    yaml = None
+
+
+logger = logging.getLogger(__name__)
+
+# Keywords looked up by the documentation and benchmark scores, found in one scan
+CARD_KEYWORDS = ('usage', 'example', 'training', 'benchmark', 'evaluation', 'performance', 'score', 'metric')
+_KEYWORD_PATTERN = re.compile('|'.join(CARD_KEYWORDS), re.IGNORECASE)
+
+_HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+_TABLE_SEPARATOR_PATTERN = re.compile(r'^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)+\|?\s*$')
+
+
+class ModelCard:
+    """A README/model card parsed in one pass: frontmatter, sections, code blocks, tables and keywords"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+        self.has_frontmatter = text.startswith('---')
+        self.metadata: Dict[str, Any] = {}
+        # Sections as {"level", "title", "start", "end"} with 0-based line numbers
+        self.sections: List[Dict[str, Any]] = []
+        self.code_blocks = 0
+        self.tables = 0
+        self.keywords: set = set()
+
+    @property
+    def license(self) -> Optional[str]:
+        """License declared in the frontmatter, if any"""
+        value = self.metadata.get('license')
+        if isinstance(value, list):
+            value = value[0] if value else None
+        return str(value) if value is not None else None
+
+    @property
+    def datasets(self) -> List[str]:
+        """Datasets declared in the frontmatter"""
+        value = self.metadata.get('datasets') or []
+        return [str(item) for item in value] if isinstance(value, list) else [str(value)]
+
+    @property
+    def eval_results(self) -> List[Dict[str, Any]]:
+        """Evaluation results from the frontmatter ``model-index``, one entry per reported metric"""
+        results = []
+        model_index = self.metadata.get('model-index')
+        if not isinstance(model_index, list):
+            return results
+
+        for model in model_index:
+            if not isinstance(model, dict):
+                continue
+            for result in model.get('results') or []:
+                if not isinstance(result, dict):
+                    continue
+                task = result.get('task') or {}
+                dataset = result.get('dataset') or {}
+                for metric in result.get('metrics') or []:
+                    if isinstance(metric, dict) and 'value' in metric:
+                        results.append({
+                            "task": task.get('type') if isinstance(task, dict) else None,
+                            "dataset": (dataset.get('name') or dataset.get('type')) if isinstance(dataset, dict) else None,
+                            "metric": metric.get('type') or metric.get('name'),
+                            "value": metric.get('value')
+                        })
+        return results
+
+    def has_keyword(self, keyword: str) -> bool:
+        """Whether a keyword from CARD_KEYWORDS occurs anywhere in the card"""
+        return keyword in self.keywords
+
+    def section(self, title: str) -> Optional[str]:
+        """Body of the first section whose heading contains title (case-insensitive)"""
+        title = title.lower()
+        for section in self.sections:
+            if title in section["title"].lower():
+                lines = self.text.split('\n')
+                return '\n'.join(lines[section["start"] + 1:section["end"]])
+        return None
+
+
+def parse_model_card(text: Optional[str]) -> ModelCard:
+    """
+    Parse a README/model card in a single pass over its lines
+
+    Args:
+        text: Raw README.md content
+
+    Returns:
+        ModelCard with frontmatter metadata, section index, code-block and table counts
+    """
+    card = ModelCard(text or "")
+    lines = card.text.split('\n')
+
+    frontmatter_end = 0
+    if card.has_frontmatter:
+        # An unterminated frontmatter block runs to the end of the file
+        frontmatter_end = len(lines)
+        for i in range(1, len(lines)):
+            if lines[i].strip() == '---':
+                frontmatter_end = i
+                break
+        card.metadata = _parse_frontmatter('\n'.join(lines[1:frontmatter_end]))
+
+    in_code = False
+    previous = ""
+    for i, line in enumerate(lines):
+        for match in _KEYWORD_PATTERN.finditer(line):
+            card.keywords.add(match.group(0).lower())
+
+        if i <= frontmatter_end and card.has_frontmatter:
+            continue
+
+        if _FENCE_PATTERN.match(line):
+            if not in_code:
+                card.code_blocks += 1
+            in_code = not in_code
+        elif not in_code:
+            heading = _HEADING_PATTERN.match(line)
+            if heading:
+                if card.sections:
+                    card.sections[-1]["end"] = i
+                card.sections.append({"level": len(heading.group(1)), "title": heading.group(2), "start": i, "end": len(lines)})
+            elif '|' in previous and _TABLE_SEPARATOR_PATTERN.match(line):
+                card.tables += 1
+        previous = line
+
+    return card
+
+
+def _parse_frontmatter(content: str) -> Dict[str, Any]:
+    """Parse YAML frontmatter, with PyYAML when available"""
+    if yaml is not None:
+        try:
+            data = yaml.safe_load(content)
+            return data if isinstance(data, dict) else {}
+        except yaml.YAMLError as e:
+            logger.warning(f"Invalid YAML frontmatter, using simple parser: {e}")
+    return _parse_simple_yaml(content)
+
+
+def _parse_simple_yaml(content: str) -> Dict[str, Any]:
+    """Read top-level scalars and lists from frontmatter (nested mappings are skipped)"""
+    data: Dict[str, Any] = {}
+    current_key = None
+    for line in content.split('\n'):
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+
+        if not line[0].isspace() and not line.startswith('-') and ':' in line:
+            key, _, value = line.partition(':')
+            current_key = key.strip()
+            value = value.strip()
+            if value.startswith('[') and value.endswith(']'):
+                data[current_key] = [item.strip().strip('"\'') for item in value[1:-1].split(',') if item.strip()]
+            else:
+                data[current_key] = value.strip('"\'') if value else None
+        elif current_key and line.strip().startswith('- ') and line.startswith((' ', '-')):
+            item = line.strip()[2:].strip()
+            if ': ' in item or item.endswith(':'):
+                continue
+            items = data.get(current_key)
+            if not isinstance(items, list):
+                items = data[current_key] = []
+            items.append(item.strip('"\''))
+    return data
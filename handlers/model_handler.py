@@ -1,57 +1,105 @@
-from typing import Dict, Any, List
-import requests
-import tempfile
+from typing import Dict, Any, List, Optional
 import os
-from urllib.parse import urlparse
+from urllib.parse import quote, urlparse
 
 from .base_resource_handler import BaseResourceHandler
+from .model_card import ModelCard, parse_model_card
 
 
 class ModelHandler(BaseResourceHandler):
     """Handler for Hugging Face model resources"""
 
+    ARTIFACTS = {
+        "hf_model_info": "get_huggingface_api_data",
+        "model_files": "get_model_files",
+        "readme": "get_readme"
+    }
+
+    # Fields of the API payloads kept after a fetch; metrics ask for more through required_fields()
+    HF_API_FIELDS = ("sha", "downloads", "likes")
+    FILE_FIELDS = ("path", "size")
+
     def __init__(self, url: str):
         super().__init__(url)
         self.model_id = self._extract_model_id()
+        self.revision = self._extract_revision()
 
     def _extract_model_id(self) -> str:
         """Extract model ID from Hugging Face URL"""
         parsed = urlparse(self.url)
-        path_parts = parsed.path.strip('/').split('/')
+        path_parts, _ = self._split_revision(parsed.path.strip('/').split('/'), self.REPO_SEGMENTS)
         if len(path_parts) >= 2:
             return f"{path_parts[0]}/{path_parts[1]}"
         return ""
 
     def get_huggingface_api_data(self) -> Dict[str, Any]:
-        """Get data from Hugging Face API"""
-        cached = self._cache_get('hf_api_data')
-        if cached:
-            return cached
+        """Get data from Hugging Face API (at the URL's revision, if it names one)"""
+        return self._cached('hf_api_data', self._fetch_huggingface_api_data)
 
+    def _fetch_huggingface_api_data(self) -> Dict[str, Any]:
         try:
-            api_url = f"https://huggingface.co/api/models/{self.model_id}"
-            response = requests.get(api_url, timeout=10)
+            response = self._get_huggingface_repo_info("models", self.model_id)
             if response.status_code == 200:
-                data = response.json()
-                self._cache_set('hf_api_data', data)
-                return data
+                return self._keep_fields(self._response_json(response),
+                                        self._artifact_fields('hf_model_info', self.HF_API_FIELDS))
         except Exception as e:
             self.logger.error(f"Error fetching HF API data: {e}")
 
         return {}
 
+    def _pinned_revision(self) -> str:
+        """Revision files are fetched at: the resolved SHA, else the URL's revision or main"""
+        return self.get_revision_sha() or self.revision or "main"
+
     def get_model_files(self) -> List[Dict[str, Any]]:
         """Get model files from repository"""
+        return self._cached('model_files', self._fetch_model_files)
+
+    def _fetch_model_files(self) -> List[Dict[str, Any]]:
         try:
-            files_url = f"https://huggingface.co/api/models/{self.model_id}/tree/main"
-            response = requests.get(files_url, timeout=10)
+            revision = self._pinned_revision()
+            files_url = self._huggingface_url(f"/api/models/{self.model_id}/tree/{quote(revision, safe='')}")
+            response = self._http_get(files_url, "/api/models/{id}/tree/{rev}", immutable=self.is_commit_sha(revision))
             if response.status_code == 200:
-                return response.json()
+                files = self._response_json(response)
+                if isinstance(files, list):
+                    fields = self._artifact_fields('model_files', self.FILE_FIELDS)
+                    return [self._keep_fields(file_info, fields) for file_info in files]
+                return files
         except Exception as e:
             self.logger.error(f"Error fetching model files: {e}")
 
         return []
 
+    def get_readme(self) -> str:
+        """Get the raw README.md (model card), or an empty string if unavailable"""
+        return self._cached('readme', self._fetch_readme)
+
+    def _fetch_readme(self) -> str:
+        revision = self._pinned_revision()
+        readme_url = self._huggingface_url(f"/{self.model_id}/raw/{quote(revision, safe='')}/README.md")
+        try:
+            # Get HF_API_TOKEN from environment if available
+            hf_token = os.environ.get('HF_API_TOKEN')
+            headers = {}
+            if hf_token:
+                headers['Authorization'] = f'Bearer {hf_token}'
+
+            response = self._http_get(readme_url, "/{id}/raw/{rev}/README.md", headers=headers,
+                                      immutable=self.is_commit_sha(revision))
+            if response.status_code == 200:
+                return response.text
+
+            self.logger.warning(f"Could not fetch README.md from {readme_url}: HTTP {response.status_code}")
+        except Exception as e:
+            self.logger.error(f"Error downloading README.md: {e}")
+
+        return ""
+
+    def get_model_card(self) -> ModelCard:
+        """Get the README.md parsed into a ModelCard"""
+        return self._cached('model_card', lambda: parse_model_card(self.get_readme()))
+
     def get_size_mb(self) -> float:
         """Calculate total model size in MB"""
         cached = self._cache_get('size_mb')
@@ -72,13 +120,12 @@ class ModelHandler(BaseResourceHandler):
     def has_performance_benchmarks(self) -> bool:
         """Check if model has performance benchmarks"""
         try:
-            # Check README for benchmark information
-            readme_url = f"https://huggingface.co/{self.model_id}/raw/main/README.md"
-            response = requests.get(readme_url, timeout=10)
-            if response.status_code == 200:
-                readme_content = response.text.lower()
-                benchmark_keywords = ['benchmark', 'evaluation', 'performance', 'score', 'metric']
-                return any(keyword in readme_content for keyword in benchmark_keywords)
+            card = self.get_model_card()
+            # Structured model-index results first, then benchmark mentions in the README
+            if card.eval_results:
+                return True
+            benchmark_keywords = ['benchmark', 'evaluation', 'performance', 'score', 'metric']
+            return any(card.has_keyword(keyword) for keyword in benchmark_keywords)
         except Exception as e:
             self.logger.error(f"Error checking benchmarks: {e}")
 
@@ -90,100 +137,46 @@ class ModelHandler(BaseResourceHandler):
         if cached is not None:
             return cached
 
-        score = self._get_license_from_local_readme()
+        score = self._get_license_from_readme()
         self._cache_set('license_score', score)
         return score
 
-    def _get_license_from_local_readme(self) -> float:
-        """Download README.md locally, check metadata, then delete file"""
-        temp_file = None
+    def _get_license_from_readme(self) -> float:
+        """Check README.md metadata for a license, falling back to its text"""
         try:
-            # Use HuggingFace's raw file HTTP API
-            readme_url = f"https://huggingface.co/{self.model_id}/raw/main/README.md"
+            card = self.get_model_card()
+            if not card.text:
+                return 0.0
 
-            # Get HF_API_TOKEN from environment if available
-            hf_token = os.environ.get('HF_API_TOKEN')
-            headers = {}
-            if hf_token:
-                headers['Authorization'] = f'Bearer {hf_token}'
+            # Check for YAML frontmatter first
+            if card.license is not None:
+                return self._parse_license_identifier(card.license)
 
-            response = requests.get(readme_url, headers=headers, timeout=10)
+            # Only fallback to text parsing if no YAML frontmatter exists at all
+            if not card.has_frontmatter and not card.text.strip().startswith('---'):
+                return self._parse_license_from_text(card.text)
 
-            if response.status_code == 200:
-                # Create temporary file
-                temp_file = tempfile.NamedTemporaryFile(mode='w+', suffix='.md', delete=False)
-                temp_file.write(response.text)
-                temp_file.close()
-
-                # Parse metadata from the downloaded file
-                with open(temp_file.name, 'r', encoding='utf-8') as f:
-                    readme_content = f.read()
-
-                # Check for YAML frontmatter first
-                license_score, found_in_metadata = self._parse_license_from_metadata(readme_content)
-
-                # Only fallback to text parsing if no YAML frontmatter exists at all
-                if not found_in_metadata and not readme_content.strip().startswith('---'):
-                    license_score = self._parse_license_from_text(readme_content)
-                # If YAML frontmatter exists but no license field, default to 0.0
-                elif not found_in_metadata:
-                    license_score = 0.0
-
-                return license_score
-            else:
-                self.logger.warning(f"Could not fetch README.md from {readme_url}: HTTP {response.status_code}")
-                return 0.0
+            # If YAML frontmatter exists but no license field, default to 0.0
+            return 0.0
 
         except Exception as e:
-            self.logger.error(f"Error downloading README.md: {e}")
+            self.logger.error(f"Error reading license from README.md: {e}")
             return 0.0
-        finally:
-            # Clean up temporary file
-            if temp_file and os.path.exists(temp_file.name):
-                try:
-                    os.unlink(temp_file.name)
-                except Exception as e:
-                    self.logger.warning(f"Failed to delete temp README file: {e}")
-
-    def _parse_license_from_metadata(self, content: str) -> tuple[float, bool]:
-        """Parse license from YAML frontmatter metadata, returns (score, found)"""
-        try:
-            # Check if content starts with YAML frontmatter
-            if content.startswith('---'):
-                parts = content.split('---', 2)
-                if len(parts) >= 2:
-                    yaml_content = parts[1].strip()
-
-                    # Simple parsing for license field (avoiding yaml dependency)
-                    for line in yaml_content.split('\n'):
-                        line = line.strip()
-                        if line.lower().startswith('license:'):
-                            license_value = line.split(':', 1)[1].strip().strip('"\'')
-                            score = self._parse_license_identifier(license_value)
-                            return score, True  # Found license in metadata
-
-            return 0.0, False  # No license found in metadata
-        except Exception as e:
-            self.logger.error(f"Error parsing metadata: {e}")
-            return 0.0, False
 
     def get_documentation_score(self) -> float:
         """Evaluate documentation quality"""
         try:
-            readme_url = f"https://huggingface.co/{self.model_id}/raw/main/README.md"
-            response = requests.get(readme_url, timeout=10)
-            if response.status_code == 200:
-                readme_content = response.text
-
+            card = self.get_model_card()
+            if card.text:
                 # Simple scoring based on README length and sections
                 score = 0.0
-                if len(readme_content) > 500:
+                if card.length > 500:
                     score += 0.3
-                if 'usage' in readme_content.lower():
+                if card.has_keyword('usage'):
                     score += 0.3
-                if 'example' in readme_content.lower():
+                if card.has_keyword('example'):
                     score += 0.2
-                if 'training' in readme_content.lower():
+                if card.has_keyword('training'):
                     score += 0.2
 
                 return min(score, 1.0)
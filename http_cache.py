@@ -0,0 +1,82 @@
+from typing import Dict, Optional
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+
+from http_cassette import build_response
+from sqlite_util import LocalConnections
+
+
+class HTTPCache:
+    """
+    On-disk cache of successful handler responses, keyed by URL.
+
+    Entries live in one SQLite database (WAL mode) under ``cache_dir``, so
+    every process pointed at the same directory - e.g. the workers of a
+    sharded run - shares them. Entries older than ``ttl_seconds`` are ignored,
+    except for content-addressed (commit SHA) URLs, which cannot go stale.
+    """
+
+    DB_NAME = "http_cache.db"
+
+    def __init__(self, cache_dir: str, ttl_seconds: float = 86400):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, self.DB_NAME)
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._connections = LocalConnections(self.db_path, timeout=30,
+                                             pragmas=("journal_mode=WAL", "synchronous=NORMAL"))
+
+        self._connections.get().execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, status INTEGER, content_type TEXT, body BLOB, stored_at REAL)"
+        )
+
+    def get(self, url: str, immutable: bool = False) -> Optional[requests.Response]:
+        """Cached response for url, or None on a miss or expired entry (immutable entries never expire)"""
+        oldest = float("-inf") if immutable else time.time() - self.ttl_seconds
+        row = self._connections.get().execute(
+            "SELECT status, content_type, body FROM responses WHERE url = ? AND stored_at >= ?",
+            (url, oldest)
+        ).fetchone()
+        if row is None:
+            return None
+        status, content_type, body = row
+        return build_response(url, status, content_type or "", bytes(body))
+
+    def put(self, url: str, response: requests.Response) -> None:
+        """Store a successful response"""
+        content = getattr(response, "content", None)
+        if response.status_code != 200 or not isinstance(content, (bytes, bytearray)):
+            return
+        content_type = response.headers.get("Content-Type", "")
+        try:
+            self._connections.get().execute(
+                "INSERT OR REPLACE INTO responses (url, status, content_type, body, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (url, response.status_code, content_type if isinstance(content_type, str) else "",
+                 sqlite3.Binary(content), time.time())
+            )
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not cache response for {url}: {e}")
+
+
+_http_caches: Dict[str, HTTPCache] = {}
+_http_caches_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HTTPCache]:
+    """Cache in HTTP_CACHE_DIR (TTL from HTTP_CACHE_TTL seconds), or None when disabled"""
+    cache_dir = os.environ.get('HTTP_CACHE_DIR')
+    if not cache_dir:
+        return None
+
+    with _http_caches_lock:
+        cache = _http_caches.get(cache_dir)
+        if cache is None:
+            ttl = float(os.environ.get('HTTP_CACHE_TTL', '86400'))
+            cache = _http_caches[cache_dir] = HTTPCache(cache_dir, ttl)
+        return cache
@@ -0,0 +1,181 @@
+from typing import Any, Dict, Optional, Tuple
+import atexit
+import gzip
+import logging
+import os
+import shutil
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import json_backend
+from instrumentation import INSTRUMENTATION
+
+
+CASSETTE_MODES = ("record", "replay", "replay-or-live")
+
+
+def build_response(url: str, status: int, content_type: str, body: bytes) -> requests.Response:
+    """A requests.Response carrying a stored status, content type and body"""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.headers = CaseInsensitiveDict({"Content-Type": content_type})
+    response.encoding = "utf-8"
+    response._content = body
+    return response
+
+
+class CassetteMissError(Exception):
+    """Raised in strict replay mode when a request is not in the cassette"""
+
+
+class HTTPCassette:
+    """
+    Gzip-compressed JSON Lines archive of handler HTTP exchanges.
+
+    In ``record`` mode every live response is appended to the archive. In
+    ``replay`` mode responses are served from the archive and a miss raises
+    CassetteMissError; ``replay-or-live`` falls through to the network on a
+    miss instead. Only the URL, status, content type and body are stored, so
+    request headers such as API tokens never reach the archive. When a URL was
+    recorded more than once, the last response wins.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", record_path: Optional[str] = None):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}'. Use one of: {', '.join(CASSETTE_MODES)}")
+        self.path = path
+        self.mode = mode
+        # Recorded responses go to record_path when given (e.g. one file per shard worker)
+        self.record_path = record_path or path
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._writer = None
+
+    @property
+    def replays(self) -> bool:
+        return self.mode != "record"
+
+    @property
+    def strict(self) -> bool:
+        return self.mode == "replay"
+
+    def replay(self, url: str) -> Optional[requests.Response]:
+        """Recorded response for url, or None if it was not recorded"""
+        entry = self._load().get(url)
+        if entry is None:
+            return None
+
+        return build_response(url, entry["status"], entry.get("content_type", ""), entry["body"].encode("utf-8"))
+
+    def record(self, url: str, response: requests.Response) -> None:
+        """Append a live response to the archive"""
+        content = getattr(response, "content", None)
+        if isinstance(content, (bytes, bytearray)):
+            body = content.decode("utf-8", errors="replace")
+        else:
+            body = response.text if isinstance(getattr(response, "text", None), str) else ""
+        content_type = getattr(response, "headers", {}).get("Content-Type", "")
+        entry = {
+            "url": url,
+            "status": response.status_code,
+            "content_type": content_type if isinstance(content_type, str) else "",
+            "body": body
+        }
+        line = json_backend.dumps(entry) + b"\n"
+        with self._lock:
+            if self._writer is None:
+                directory = os.path.dirname(self.record_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # Each recording session appends one gzip member
+                self._writer = gzip.open(self.record_path, "ab")
+            self._writer.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            if self._entries is None:
+                entries = {}
+                if os.path.exists(self.path):
+                    with gzip.open(self.path, "rb") as f:
+                        for line in f:
+                            if line.strip():
+                                entry = json_backend.loads(line)
+                                entries[entry["url"]] = entry
+                else:
+                    self.logger.warning(f"Cassette not found: {self.path}")
+                self._entries = entries
+                self.logger.info(f"Loaded {len(entries)} recorded responses from {self.path}")
+            return self._entries
+
+
+_cassettes: Dict[Tuple[str, str, Optional[str]], HTTPCassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[HTTPCassette]:
+    """
+    Cassette selected by HTTP_CASSETTE_MODE and HTTP_CASSETTE, or None when disabled
+
+    HTTP_CASSETTE_RECORD_PATH, when set, receives the recorded responses
+    instead of HTTP_CASSETTE (shard workers each record to their own file).
+    """
+    mode = os.environ.get('HTTP_CASSETTE_MODE')
+    path = os.environ.get('HTTP_CASSETTE')
+    if not mode or not path:
+        return None
+    record_path = os.environ.get('HTTP_CASSETTE_RECORD_PATH')
+
+    with _cassettes_lock:
+        cassette = _cassettes.get((mode, path, record_path))
+        if cassette is None:
+            cassette = _cassettes[(mode, path, record_path)] = HTTPCassette(path, mode, record_path)
+        return cassette
+
+
+def check_strict_replay() -> None:
+    """
+    Raise CassetteMissError if a strict replay has missed the cassette so far
+
+    Handlers turn a failed request into empty data, so a replay that misses
+    would otherwise finish with zeroed scores. Misses are counted in the
+    instrumentation, which also covers shard workers once merged.
+    """
+    if os.environ.get('HTTP_CASSETTE_MODE') != "replay":
+        return
+    misses = INSTRUMENTATION.cache_counts("http_cassette")["misses"]
+    if misses:
+        raise CassetteMissError(f"{misses} requests were not found in cassette {os.environ.get('HTTP_CASSETTE')}")
+
+
+def append_cassette(path: str, recorded_path: str) -> None:
+    """Append the gzip members recorded in another file (e.g. by a shard worker) to a cassette"""
+    if not os.path.exists(recorded_path) or not os.path.getsize(recorded_path):
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(recorded_path, "rb") as src, open(path, "ab") as dst:
+        shutil.copyfileobj(src, dst)
+
+
+def close_cassettes() -> None:
+    """Flush and close every cassette opened for recording"""
+    with _cassettes_lock:
+        cassettes = list(_cassettes.values())
+        _cassettes.clear()
+    for cassette in cassettes:
+        cassette.close()
+
+
+atexit.register(close_cassettes)
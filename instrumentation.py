@@ -0,0 +1,235 @@
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import threading
+
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Dict[str, int]:
+        """Cumulative counts keyed by upper bound, Prometheus style"""
+        result, total = {}, 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += count
+            result[str(bound)] = total
+        return result
+
+
+class EndpointStats:
+    """Counters and latency histogram for one endpoint template"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.status_codes: Dict[str, int] = {}
+        self.latency = Histogram()
+
+
+class Instrumentation:
+    """
+    Thread-safe counters for the handler HTTP path and caches.
+
+    Requests are grouped by endpoint template (``/api/models/{id}``,
+    ``/repos/{repo}/contributors``, ...) so runs over many models aggregate
+    into a handful of series. A snapshot can be dumped as JSON at the end of a
+    run or rendered in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointStats] = {}
+        self._caches: Dict[str, Dict[str, int]] = {}
+        self._concurrency: Dict[str, Dict[str, int]] = {}
+
+    def record_request(self, endpoint: str, status: Optional[int], latency: float,
+                       response_bytes: int = 0, retries: int = 0) -> None:
+        """Record one logical request (status None means it raised)"""
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, EndpointStats())
+            stats.requests += 1
+            stats.retries += retries
+            stats.bytes += response_bytes
+            stats.latency.observe(latency)
+            status_label = str(status) if status is not None else "error"
+            stats.status_codes[status_label] = stats.status_codes.get(status_label, 0) + 1
+            if status is None or status >= 400:
+                stats.errors += 1
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Record a cache lookup"""
+        with self._lock:
+            counts = self._caches.setdefault(cache, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def record_concurrency(self, host: str, limit: float, in_flight: int) -> None:
+        """Record the current adaptive concurrency limit and in-flight requests of a host"""
+        with self._lock:
+            self._concurrency[host] = {"limit": int(limit), "in_flight": in_flight}
+
+    def cache_counts(self, cache: str) -> Dict[str, int]:
+        """Hits and misses of one cache so far"""
+        with self._lock:
+            return dict(self._caches.get(cache, {"hits": 0, "misses": 0}))
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """Add the counters of a snapshot taken in another process (e.g. a shard worker)"""
+        with self._lock:
+            for endpoint, values in snapshot.get("http", {}).items():
+                stats = self._endpoints.setdefault(endpoint, EndpointStats())
+                stats.requests += values["requests"]
+                stats.errors += values["errors"]
+                stats.retries += values["retries"]
+                stats.bytes += values["bytes"]
+                for status, count in values["status_codes"].items():
+                    stats.status_codes[status] = stats.status_codes.get(status, 0) + count
+                latency = values["latency_seconds"]
+                previous = 0
+                for index, cumulative in enumerate(latency["buckets"].values()):
+                    stats.latency.counts[index] += cumulative - previous
+                    previous = cumulative
+                stats.latency.count += values["requests"]
+                stats.latency.sum += latency["sum"]
+            for cache, values in snapshot.get("caches", {}).items():
+                counts = self._caches.setdefault(cache, {"hits": 0, "misses": 0})
+                counts["hits"] += values["hits"]
+                counts["misses"] += values["misses"]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self._caches.clear()
+            self._concurrency.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters as a JSON-serializable dictionary"""
+        with self._lock:
+            endpoints = {
+                endpoint: {
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "retries": stats.retries,
+                    "bytes": stats.bytes,
+                    "status_codes": dict(stats.status_codes),
+                    "latency_seconds": {
+                        "sum": round(stats.latency.sum, 6),
+                        "mean": round(stats.latency.sum / stats.latency.count, 6) if stats.latency.count else 0.0,
+                        "buckets": stats.latency.cumulative()
+                    }
+                }
+                for endpoint, stats in sorted(self._endpoints.items())
+            }
+            caches = {
+                cache: dict(counts, hit_ratio=_hit_ratio(counts))
+                for cache, counts in sorted(self._caches.items())
+            }
+            concurrency = {host: dict(values) for host, values in sorted(self._concurrency.items())}
+        return {"http": endpoints, "caches": caches, "concurrency": concurrency}
+
+    def dump(self, path: str) -> None:
+        """Write a JSON snapshot to path"""
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Render the counters in the Prometheus text exposition format
+
+        Families without samples are left out, e.g. the HTTP client families in
+        a process whose handlers never made a request.
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name: str, metric_type: str, help_text: str, samples: List[str]) -> None:
+            if not samples:
+                return
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(samples)
+
+        endpoints = snapshot["http"]
+        family("http_client_requests_total", "counter", "HTTP requests made by resource handlers", [
+            f'http_client_requests_total{{endpoint="{_escape(endpoint)}",status="{status}"}} {count}'
+            for endpoint, stats in endpoints.items()
+            for status, count in sorted(stats["status_codes"].items())
+        ])
+
+        family("http_client_retries_total", "counter", "HTTP request retries", [
+            f'http_client_retries_total{{endpoint="{_escape(endpoint)}"}} {stats["retries"]}'
+            for endpoint, stats in endpoints.items()
+        ])
+
+        family("http_client_response_bytes_total", "counter", "Response body bytes received", [
+            f'http_client_response_bytes_total{{endpoint="{_escape(endpoint)}"}} {stats["bytes"]}'
+            for endpoint, stats in endpoints.items()
+        ])
+
+        histogram = []
+        for endpoint, stats in endpoints.items():
+            label = f'endpoint="{_escape(endpoint)}"'
+            for bound, count in stats["latency_seconds"]["buckets"].items():
+                histogram.append(f'http_client_request_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+            histogram.append(f'http_client_request_duration_seconds_sum{{{label}}} {stats["latency_seconds"]["sum"]}')
+            histogram.append(f'http_client_request_duration_seconds_count{{{label}}} {stats["requests"]}')
+        family("http_client_request_duration_seconds", "histogram", "HTTP request latency including retries",
+               histogram)
+
+        caches = snapshot["caches"]
+        family("cache_requests_total", "counter", "Cache lookups by result", [
+            f'cache_requests_total{{cache="{_escape(cache)}",result="{result}"}} {counts[key]}'
+            for cache, counts in caches.items()
+            for result, key in (("hit", "hits"), ("miss", "misses"))
+        ])
+
+        family("cache_hit_ratio", "gauge", "Fraction of cache lookups that were hits", [
+            f'cache_hit_ratio{{cache="{_escape(cache)}"}} {counts["hit_ratio"]}'
+            for cache, counts in caches.items()
+        ])
+
+        concurrency = snapshot["concurrency"]
+        family("http_client_concurrency_limit", "gauge", "Adaptive limit on concurrent requests per host", [
+            f'http_client_concurrency_limit{{host="{_escape(host)}"}} {values["limit"]}'
+            for host, values in concurrency.items()
+        ])
+
+        family("http_client_in_flight_requests", "gauge", "Requests currently in flight per host", [
+            f'http_client_in_flight_requests{{host="{_escape(host)}"}} {values["in_flight"]}'
+            for host, values in concurrency.items()
+        ])
+
+        return "\n".join(lines) + "\n"
+
+
+def _hit_ratio(counts: Dict[str, int]) -> float:
+    total = counts["hits"] + counts["misses"]
+    return round(counts["hits"] / total, 6) if total else 0.0
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Process-wide instrumentation shared by all handlers
+INSTRUMENTATION = Instrumentation()
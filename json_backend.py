@@ -0,0 +1,106 @@
+from typing import Any, Callable, Dict, Tuple, Union
+import json
+import math
+import os
+
+try:
+    import orjson
+except ImportError:  # Optional: fastest backend
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Optional: used when orjson is not installed
+    msgspec = None
+
+
+JSON_BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    # Compact separators and UTF-8 instead of \u escapes, like orjson/msgspec
+    try:
+        text = json.dumps(obj, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+    except ValueError:
+        # NaN/Infinity are not JSON; orjson and msgspec write them as null
+        text = json.dumps(_finite(obj), separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+    return text.encode("utf-8")
+
+
+def _finite(obj: Any) -> Any:
+    """Copy of obj with NaN and infinite floats replaced by None"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _stdlib_loads(data: Union[str, bytes]) -> Any:
+    return json.loads(data)
+
+
+def _orjson_dumps(obj: Any) -> bytes:
+    try:
+        return orjson.dumps(obj)
+    except TypeError:
+        # e.g. integers beyond 64 bits; the stdlib handles anything JSON can hold
+        return _stdlib_dumps(obj)
+
+
+def _msgspec_functions() -> Tuple[Callable[[Any], bytes], Callable[[Union[str, bytes]], Any]]:
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj: Any) -> bytes:
+        try:
+            return encoder.encode(obj)
+        except (TypeError, OverflowError):
+            return _stdlib_dumps(obj)
+
+    def loads(data: Union[str, bytes]) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    return dumps, loads
+
+
+def _select_backend(name: str) -> Tuple[str, Callable[[Any], bytes], Callable[[Union[str, bytes]], Any]]:
+    """Backend functions for a name, or the fastest installed one for "auto" """
+    if name not in JSON_BACKENDS + ("auto",):
+        raise ValueError(f"Unknown JSON backend '{name}'. Use one of: auto, {', '.join(JSON_BACKENDS)}")
+
+    if name in ("auto", "orjson") and orjson is not None:
+        return "orjson", _orjson_dumps, orjson.loads
+    if name in ("auto", "msgspec") and msgspec is not None:
+        return ("msgspec",) + _msgspec_functions()
+    return "json", _stdlib_dumps, _stdlib_loads
+
+
+# JSON_BACKEND picks a backend explicitly; a requested backend that is not installed falls back to the stdlib
+BACKEND, _dumps, _loads = _select_backend(os.environ.get('JSON_BACKEND', 'auto'))
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encode obj as compact UTF-8 JSON
+
+    Every backend decodes back to the same values and writes NaN/Infinity as
+    null, but the bytes can differ in float formatting (orjson writes 1e-7
+    where the standard library writes 1e-07).
+    """
+    return _dumps(obj)
+
+
+def dumps_str(obj: Any) -> str:
+    return _dumps(obj).decode("utf-8")
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Decode JSON from bytes or text; raises ValueError on invalid input"""
+    return _loads(data)
+
@@ -1,10 +1,8 @@
 import json
 from model_evaluator import ModelEvaluator
+from metrics import parse_metric_selection
 
 def lambda_handler(event=None, context=None):
-    evaluator = ModelEvaluator()
-    evaluator.setup_logging()
-
     try:
         #  1. Parse URLs dynamically from event["body"]
         if event and "body" in event:
@@ -24,13 +22,28 @@ def lambda_handler(event=None, context=None):
                 "body": {"error": "Missing or invalid 'urls' in request body. Expected: {'urls': ['url1', 'url2']}."}
             }
 
-        # 3. Run evaluation
+        # 3. Run only the requested metrics (all by default)
+        metrics = body.get("metrics")
+        if isinstance(metrics, str):
+            metrics = parse_metric_selection(metrics)
+        elif not metrics:
+            metrics = None
+        try:
+            evaluator = ModelEvaluator(metrics=metrics)
+        except ValueError as e:
+            return {
+                "statusCode": 400,
+                "body": {"error": str(e)}
+            }
+        evaluator.setup_logging()
+
+        # 4. Run evaluation
         results = evaluator.evaluate_urls(urls)
 
-        #  4. Return pretty JSON
+        #  5. Return pretty JSON
         return {
             "statusCode": 200,
-            "body": results
+            "body": [result.to_dict() for result in results]
         }
 
     except Exception as e:
@@ -1,4 +1,5 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from typing import Optional
 import subprocess
@@ -7,12 +8,28 @@ import shutil
 import uuid
 import json
 
+from repo_cache import RepoCache, RepoCacheError
+from result_cache import ResultCache
+from instrumentation import INSTRUMENTATION
+
 app = FastAPI(
     title="SWE Model Evaluation Backend",
     description="Backend service for Phase 2 – evaluates GitHub model repos.",
     version="1.0.0"
 )
 
+# Shallow clones are cached by (repo URL, commit) and copied into per-job directories
+REPO_CACHE = RepoCache(
+    cache_dir=os.environ.get("REPO_CACHE_DIR", "repo_cache"),
+    max_bytes=int(os.environ.get("REPO_CACHE_MAX_BYTES", str(20 * 1024 ** 3)))
+)
+
+# Metrics are memoized by (repo URL, commit SHA, model_type, evaluator version)
+EVALUATOR_VERSION = os.environ.get("EVALUATOR_VERSION", app.version)
+RESULT_CACHE = ResultCache(
+    max_entries=int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "1024"))
+)
+
 @app.get("/")
 def root():
     return {"message": "FastAPI backend is running on EC2!"}
@@ -21,25 +38,62 @@ def root():
 def health():
     return {"status": "ok"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Cache counters in the Prometheus text format
+
+    Evaluations run evaluate.py in a subprocess, so this process only records
+    result cache lookups; the HTTP client families are only exported by
+    processes running the resource handlers in-process.
+    """
+    return PlainTextResponse(
+        INSTRUMENTATION.to_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
 class EvaluationRequest(BaseModel):
     repo_url: str
     model_type: Optional[str] = None
 
 @app.post("/evaluate")
 def evaluate(req: EvaluationRequest):
+    try:
+        commit = REPO_CACHE.resolve_commit(req.repo_url)
+    except RepoCacheError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to resolve repo: {e}"
+        )
 
+    # Identical requests for the same commit share one evaluation run
+    cache_key = (req.repo_url.strip().rstrip("/"), commit, req.model_type, EVALUATOR_VERSION)
+    metrics, cached = RESULT_CACHE.get_or_compute(
+        cache_key, lambda: run_evaluation(req.repo_url, commit)
+    )
+    INSTRUMENTATION.record_cache("result_cache", cached)
+
+    return {
+        "status": "success",
+        "repo": req.repo_url,
+        "commit": commit,
+        "model_type": req.model_type,
+        "cached": cached,
+        "metrics": metrics
+    }
+
+def run_evaluation(repo_url: str, commit: str) -> dict:
+    """Check out repo_url at commit into a private directory and run its evaluate.py"""
     repo_id = str(uuid.uuid4())
-    clone_path = f"temp_repos/{repo_id}"
+    clone_path = os.path.abspath(f"temp_repos/{repo_id}")
     os.makedirs(clone_path, exist_ok=True)
 
     try:
-        clone_cmd = ["git", "clone", req.repo_url, clone_path]
-        result = subprocess.run(clone_cmd, capture_output=True, text=True)
-
-        if result.returncode != 0:
+        try:
+            REPO_CACHE.checkout(repo_url, clone_path, commit=commit)
+        except RepoCacheError as e:
             raise HTTPException(
                 status_code=400,
-                detail=f"Failed to clone repo: {result.stderr}"
+                detail=f"Failed to clone repo: {e}"
             )
 
         eval_script = os.path.join(clone_path, "evaluate.py")
@@ -69,15 +123,10 @@ def evaluate(req: EvaluationRequest):
             )
 
         with open(results_path, "r") as f:
-            metrics = json.load(f)
-
-        return {
-            "status": "success",
-            "repo": req.repo_url,
-            "model_type": req.model_type,
-            "metrics": metrics
-        }
+            return json.load(f)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -11,6 +11,7 @@ from .performance_claims_metric import PerformanceClaimsMetric
 from .ramp_up_time_metric import RampUpTimeMetric
 from .size_score_metric import SizeScoreMetric
 from .metrics import METRIC_CLASSES
+from .registry import MetricRegistry, get_metric_registry, parse_metric_selection
 
 # Export all classes and constants
 __all__ = [
@@ -23,5 +24,8 @@ __all__ = [
     'PerformanceClaimsMetric',
     'RampUpTimeMetric',
     'SizeScoreMetric',
-    'METRIC_CLASSES'
+    'METRIC_CLASSES',
+    'MetricRegistry',
+    'get_metric_registry',
+    'parse_metric_selection'
 ]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Tuple, Dict, List, Any
+from typing import Tuple, Dict, List, Any, Optional
 import logging
 from url_classifier import URLType
 
@@ -15,6 +15,33 @@ class BaseMetric(ABC):
         """Returns list of URL types required to calculate this metric"""
         pass
 
+    def required_artifacts(self) -> Dict[URLType, List[str]]:
+        """
+        Returns the data artifacts this metric reads, per URL type
+
+        Artifacts are fetched once by the fetch planner before any metric runs,
+        so calculate() only reads handler caches.
+        """
+        return {}
+
+    def required_fields(self) -> Dict[URLType, Dict[str, List[str]]]:
+        """
+        Returns the payload fields this metric reads from JSON artifacts, per URL type
+
+        Handlers keep only the fields the built-in metrics use (their *_FIELDS
+        tuples) and drop the rest of each API payload. A metric that reads
+        another field, e.g. ``{URLType.CODE: {"repo_info": ["forks_count"]}}``,
+        declares it here so the evaluator asks the handlers to keep it.
+        """
+        return {}
+
+    def score_fields(self) -> Optional[List[str]]:
+        """
+        Keys of the score when calculate() returns a dictionary (one output
+        column each, e.g. one per hardware platform), or None for a single number
+        """
+        return None
+
     @abstractmethod
     def calculate(self, resources: Dict[URLType, List[Any]]) -> Tuple[float, int]:
         """
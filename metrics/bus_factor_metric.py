@@ -11,6 +11,13 @@ class BusFactorMetric(BaseMetric):
         # Bus factor should consider all related resources
         return [URLType.MODEL, URLType.DATASET, URLType.CODE]
 
+    def required_artifacts(self) -> Dict[URLType, List[str]]:
+        return {
+            URLType.MODEL: ["hf_model_info"],
+            URLType.DATASET: ["hf_dataset_info"],
+            URLType.CODE: ["contributors"]
+        }
+
     def calculate(self, resources: Dict[URLType, List[Any]]) -> Tuple[float, int]:
         start_time = time.time()
 
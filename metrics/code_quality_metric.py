@@ -10,6 +10,9 @@ class CodeQualityMetric(BaseMetric):
     def required_url_types(self) -> List[URLType]:
         return [URLType.CODE]
 
+    def required_artifacts(self) -> Dict[URLType, List[str]]:
+        return {URLType.CODE: ["repo_info"]}
+
     def calculate(self, resources: Dict[URLType, List[Any]]) -> Tuple[float, int]:
         start_time = time.time()
 
@@ -10,6 +10,9 @@ class DatasetQualityMetric(BaseMetric):
     def required_url_types(self) -> List[URLType]:
         return [URLType.DATASET]
 
+    def required_artifacts(self) -> Dict[URLType, List[str]]:
+        return {URLType.DATASET: ["hf_dataset_info"]}
+
     def calculate(self, resources: Dict[URLType, List[Any]]) -> Tuple[float, int]:
         start_time = time.time()
 
@@ -11,6 +11,9 @@ class LicenseMetric(BaseMetric):
         # Only check MODEL license
         return [URLType.MODEL]
 
+    def required_artifacts(self) -> Dict[URLType, List[str]]:
+        return {URLType.MODEL: ["readme"]}
+
     def calculate(self, resources: Dict[URLType, List[Any]]) -> Tuple[float, int]:
         start_time = time.time()
 
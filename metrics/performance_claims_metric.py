@@ -11,6 +11,13 @@ class PerformanceClaimsMetric(BaseMetric):
         # Performance claims need model + dataset + evaluation code
         return [URLType.MODEL, URLType.DATASET, URLType.CODE]
 
+    def required_artifacts(self) -> Dict[URLType, List[str]]:
+        return {
+            URLType.MODEL: ["readme"],
+            URLType.DATASET: ["hf_dataset_info"],
+            URLType.CODE: ["code_search"]
+        }
+
     def calculate(self, resources: Dict[URLType, List[Any]]) -> Tuple[float, int]:
         start_time = time.time()
 
@@ -11,6 +11,13 @@ class RampUpTimeMetric(BaseMetric):
         # Ramp-up depends on documentation quality across all resources
         return [URLType.MODEL, URLType.DATASET, URLType.CODE]
 
+    def required_artifacts(self) -> Dict[URLType, List[str]]:
+        return {
+            URLType.MODEL: ["readme"],
+            URLType.DATASET: ["hf_dataset_info"],
+            URLType.CODE: ["repo_info"]
+        }
+
     def calculate(self, resources: Dict[URLType, List[Any]]) -> Tuple[float, int]:
         start_time = time.time()
 
@@ -0,0 +1,102 @@
+from typing import Dict, Iterable, List, Optional, Type
+from importlib import import_module
+from importlib.metadata import entry_points
+import json
+import logging
+import os
+
+from .base_metric import BaseMetric
+from .metrics import METRIC_CLASSES
+
+
+class MetricRegistry:
+    """
+    Registry of metric classes by name.
+
+    Besides the built-in metrics, classes can be contributed by installed
+    packages through the ``model_evaluator.metrics`` entry point group, or by a
+    JSON config file of the form ``{"metrics": {"name": "module:ClassName"}}``.
+    """
+
+    ENTRY_POINT_GROUP = "model_evaluator.metrics"
+
+    def __init__(self, metric_classes: Optional[Dict[str, Type[BaseMetric]]] = None):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._classes: Dict[str, Type[BaseMetric]] = dict(metric_classes or {})
+
+    def register(self, name: str, metric_class: Type[BaseMetric]) -> None:
+        """Register a metric class under a name, replacing any previous one"""
+        if not (isinstance(metric_class, type) and issubclass(metric_class, BaseMetric)):
+            raise TypeError(f"Metric '{name}' must be a BaseMetric subclass")
+        self._classes[name] = metric_class
+
+    def names(self) -> List[str]:
+        """Names of all registered metrics"""
+        return list(self._classes)
+
+    def load_entry_points(self) -> None:
+        """Register metrics advertised by installed packages"""
+        eps = entry_points()
+        group = eps.select(group=self.ENTRY_POINT_GROUP) if hasattr(eps, 'select') \
+            else eps.get(self.ENTRY_POINT_GROUP, [])
+        for entry_point in group:
+            try:
+                self.register(entry_point.name, entry_point.load())
+            except Exception as e:
+                self.logger.error(f"Failed to load metric plugin {entry_point.name}: {e}")
+
+    def load_config(self, config_path: str) -> None:
+        """Register metrics listed in a JSON config file"""
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+
+        for name, target in config.get("metrics", {}).items():
+            module_name, _, class_name = target.partition(':')
+            try:
+                self.register(name, getattr(import_module(module_name), class_name))
+            except Exception as e:
+                self.logger.error(f"Failed to load metric plugin {name} ({target}): {e}")
+
+    def create(self, selected: Optional[Iterable[str]] = None) -> Dict[str, BaseMetric]:
+        """
+        Instantiate the selected metrics
+
+        Args:
+            selected: Metric names to instantiate (defaults to all registered metrics)
+
+        Returns:
+            Dictionary mapping metric name to metric instance
+        """
+        names = list(selected) if selected is not None else self.names()
+        unknown = [name for name in names if name not in self._classes]
+        if unknown:
+            raise ValueError(
+                f"Unknown metric(s): {', '.join(unknown)}. Available: {', '.join(self.names())}"
+            )
+        return {name: self._classes[name]() for name in names}
+
+
+_default_registry: Optional[MetricRegistry] = None
+
+
+def get_metric_registry() -> MetricRegistry:
+    """Return the process-wide registry: built-in metrics plus installed and configured plugins"""
+    global _default_registry
+    if _default_registry is None:
+        registry = MetricRegistry(METRIC_CLASSES)
+        registry.load_entry_points()
+
+        config_path = os.environ.get('METRIC_PLUGINS_CONFIG')
+        if config_path:
+            registry.load_config(config_path)
+
+        _default_registry = registry
+    return _default_registry
+
+
+def parse_metric_selection(value: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated metric selector; empty means all metrics"""
+    if not value:
+        return None
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    return names or None
@@ -1,9 +1,13 @@
-from typing import Tuple, Dict, List, Any
+from typing import Tuple, Dict, List, Any, Optional
 import time
 from .base_metric import BaseMetric
 from url_classifier import URLType
 
 
+# Hardware platforms scored by SizeScoreMetric, in output order
+HARDWARE_PLATFORMS = ["raspberry_pi", "jetson_nano", "desktop_pc", "aws_server"]
+
+
 class SizeScoreMetric(BaseMetric):
     """Metric for model size compatibility with different hardware"""
 
@@ -11,6 +15,12 @@ class SizeScoreMetric(BaseMetric):
         # Size is primarily a model concern
         return [URLType.MODEL]
 
+    def required_artifacts(self) -> Dict[URLType, List[str]]:
+        return {URLType.MODEL: ["model_files"]}
+
+    def score_fields(self) -> Optional[List[str]]:
+        return list(HARDWARE_PLATFORMS)
+
     def calculate(self, resources: Dict[URLType, List[Any]]) -> Tuple[float, int]:
         start_time = time.time()
 
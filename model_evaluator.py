@@ -1,54 +1,96 @@
 
-from typing import List, Dict, Any, Optional, Tuple
-import json
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Callable
+import argparse
 import logging
 import os
 import sys
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
 from url_classifier import URLClassifier, URLType
+from url_input import read_url_groups
+from evaluation_result import EvaluationResult
+from result_writers import NDJSONWriter
 from resource_handlers import ModelHandler, DatasetHandler, CodeHandler, BaseResourceHandler
-from metrics import METRIC_CLASSES
+from metrics import get_metric_registry, parse_metric_selection
 from metrics.base_metric import BaseMetric
+from fetch_planner import FetchPlanner
+from scoring import DEFAULT_WEIGHTS, MetricStore, get_weights, metric_value, net_score
+from instrumentation import INSTRUMENTATION
+from http_cassette import CassetteMissError, check_strict_replay
+from profiling import phase, profile_run
 
 
 
+# Field order of the NDJSON output for the built-in metrics; plugin metrics follow
+RESULT_METRIC_ORDER = [
+    "ramp_up_time", "bus_factor", "performance_claims", "license", "size_score",
+    "dataset_and_code_score", "dataset_quality", "code_quality"
+]
+
+
 class ModelEvaluator:
     """Main orchestrator for evaluating models with their associated datasets and code"""
 
-    def __init__(self, max_workers: int = 4):
+    def __init__(self, max_workers: int = 4, metrics: Optional[List[str]] = None,
+                 weights: Optional[Dict[str, float]] = None, max_in_flight: Optional[int] = None):
         self.url_classifier = URLClassifier()
         self.max_workers = max_workers
+        # Lines of a URL file evaluated concurrently; the reader waits while the window is full
+        if max_in_flight is None:
+            max_in_flight = int(os.environ.get('MAX_IN_FLIGHT_LINES', '1'))
+        self.max_in_flight = max(1, max_in_flight)
         self.logger = logging.getLogger(__name__)
 
-        # Initialize metrics
-        self.metrics = {name: metric_class() for name, metric_class in METRIC_CLASSES.items()}
+        # Scoring profile applied to the raw metric values
+        self.weights = weights if weights is not None else DEFAULT_WEIGHTS
+
+        # Initialize the selected metrics (all registered metrics by default);
+        # skipped metrics never contribute fetches to the planner
+        self.metrics = get_metric_registry().create(metrics)
+        self._request_metric_fields()
+        # Shared by every result: scores are stored positionally in this order
+        self.result_metric_names = tuple(self._result_metric_order())
 
-    def evaluate_urls(self, urls: List[str]) -> List[Dict[str, Any]]:
+        # Artifacts needed by the metrics are fetched once, in parallel, before scoring
+        self.fetch_planner = FetchPlanner(max_workers=2 * max_workers)
+
+    def evaluate_urls(self, urls: List[str], strict: bool = False) -> List[EvaluationResult]:
         """
         Evaluate a list of URLs and return results for MODEL URLs only
 
         Args:
             urls: List of URLs to evaluate
+            strict: Raise if a model cannot be evaluated instead of logging and skipping it
 
         Returns:
             List of evaluation results for model URLs
         """
         # Group URLs by type
-        grouped_urls = self.url_classifier.group_urls_by_type(urls)
+        with phase("classification"):
+            grouped_urls = self.url_classifier.group_urls_by_type(urls)
 
         # Create resource handlers
-        resources = self._create_resource_handlers(grouped_urls)
+        with phase("handler_construction"):
+            resources = self._create_resource_handlers(grouped_urls)
 
         # Find model URLs to evaluate
         model_urls = grouped_urls[URLType.MODEL]
 
+        # Single I/O phase: every artifact the metrics need, fetched once
+        if model_urls:
+            with phase("fetch"):
+                self.fetch_planner.prefetch(self.metrics.values(), resources)
+
         results = []
-        for model_url in model_urls:
-            result = self._evaluate_single_model(model_url, resources)
-            if result:
-                results.append(result)
+        with phase("scoring"):
+            for model_url in model_urls:
+                result = self._evaluate_single_model(model_url, resources)
+                if result:
+                    results.append(result)
+                elif strict:
+                    raise RuntimeError(f"Evaluation of {model_url} failed")
 
         return results
 
@@ -94,7 +136,7 @@ class ModelEvaluator:
 
         return resources
 
-    def _evaluate_single_model(self, model_url: str, resources: Dict[URLType, List[BaseResourceHandler]]) -> Optional[Dict[str, Any]]:
+    def _evaluate_single_model(self, model_url: str, resources: Dict[URLType, List[BaseResourceHandler]]) -> Optional[EvaluationResult]:
         """Evaluate a single model with available resources"""
         try:
             model_handler = ModelHandler(model_url)
@@ -112,35 +154,36 @@ class ModelEvaluator:
             net_score, net_score_latency = self._calculate_net_score(metric_results)
 
             # Build result according to specification
-            result = {
-                "name": model_name,
-                "category": "MODEL",
-                "net_score": net_score,
-                "net_score_latency": net_score_latency,
-                "ramp_up_time": metric_results.get("ramp_up_time", {}).get("score", 0.0),
-                "ramp_up_time_latency": metric_results.get("ramp_up_time", {}).get("latency", 0),
-                "bus_factor": metric_results.get("bus_factor", {}).get("score", 0.0),
-                "bus_factor_latency": metric_results.get("bus_factor", {}).get("latency", 0),
-                "performance_claims": metric_results.get("performance_claims", {}).get("score", 0.0),
-                "performance_claims_latency": metric_results.get("performance_claims", {}).get("latency", 0),
-                "license": metric_results.get("license", {}).get("score", 0.0),
-                "license_latency": metric_results.get("license", {}).get("latency", 0),
-                "size_score": metric_results.get("size_score", {}).get("score", {}),
-                "size_score_latency": metric_results.get("size_score", {}).get("latency", 0),
-                "dataset_and_code_score": metric_results.get("dataset_and_code_score", {}).get("score", 0.0),
-                "dataset_and_code_score_latency": metric_results.get("dataset_and_code_score", {}).get("latency", 0),
-                "dataset_quality": metric_results.get("dataset_quality", {}).get("score", 0.0),
-                "dataset_quality_latency": metric_results.get("dataset_quality", {}).get("latency", 0),
-                "code_quality": metric_results.get("code_quality", {}).get("score", 0.0),
-                "code_quality_latency": metric_results.get("code_quality", {}).get("latency", 0)
-            }
-
-            return result
+            scores = []
+            latencies = []
+            for metric_name in self.result_metric_names:
+                default_score = {} if metric_name == "size_score" else 0.0
+                scores.append(metric_results.get(metric_name, {}).get("score", default_score))
+                latencies.append(metric_results.get(metric_name, {}).get("latency", 0))
+
+            return EvaluationResult(model_name, net_score, net_score_latency, self.result_metric_names,
+                                    tuple(scores), tuple(latencies))
 
         except Exception as e:
             self.logger.error(f"Error evaluating model {model_url}: {e}")
             return None
 
+    def _request_metric_fields(self) -> None:
+        """Have handlers keep the payload fields the selected metrics declare in required_fields()"""
+        handler_classes = {URLType.MODEL: ModelHandler, URLType.DATASET: DatasetHandler, URLType.CODE: CodeHandler}
+        for metric_name, metric in self.metrics.items():
+            for url_type, artifacts in metric.required_fields().items():
+                for artifact, fields in artifacts.items():
+                    try:
+                        handler_classes[url_type].request_fields(artifact, fields)
+                    except KeyError as e:
+                        self.logger.error(f"Metric '{metric_name}' requests fields of an unknown artifact: {e}")
+
+    def _result_metric_order(self) -> List[str]:
+        """Selected metrics in output order"""
+        ordered = [name for name in RESULT_METRIC_ORDER if name in self.metrics]
+        return ordered + [name for name in self.metrics if name not in RESULT_METRIC_ORDER]
+
     def _calculate_metrics_parallel(self, resources: Dict[URLType, List[BaseResourceHandler]]) -> Dict[str, Dict[str, Any]]:
         """Calculate all metrics in parallel with graceful handling of missing resources"""
         metric_results = {}
@@ -184,82 +227,105 @@ class ModelEvaluator:
 
     def _calculate_net_score(self, metric_results: Dict[str, Dict[str, Any]]) -> Tuple[float, int]:
         """Calculate weighted net score"""
-        # Define weights based on Sarah's priorities
-        weights = {
-            "license": 0.2,           # High priority - legal compliance
-            "performance_claims": 0.15, # High priority - proven performance
-            "ramp_up_time": 0.15,     # Important for adoption
-            "bus_factor": 0.1,        # Risk management
-            "size_score": 0.1,        # Deployment considerations
-            "dataset_and_code_score": 0.1, # Reproducibility
-            "dataset_quality": 0.1,   # Data quality matters
-            "code_quality": 0.1       # Maintainability
-        }
-
-        weighted_sum = 0.0
-        total_weight = 0.0
+        metric_values = {}
         total_latency = 0
 
-        for metric_name, weight in weights.items():
+        for metric_name in self.weights:
             if metric_name in metric_results:
-                score = metric_results[metric_name]["score"]
-                latency = metric_results[metric_name]["latency"]
-
-                # Handle size_score which is a dict
-                if isinstance(score, dict):
-                    # Average the hardware scores
-                    if score:
-                        score = sum(score.values()) / len(score.values())
-                    else:
-                        score = 0.0
-
-                weighted_sum += score * weight
-                total_weight += weight
-                total_latency += latency
+                metric_values[metric_name] = metric_value(metric_results[metric_name]["score"])
+                total_latency += metric_results[metric_name]["latency"]
 
-        net_score = weighted_sum / total_weight if total_weight > 0 else 0.0
+        return net_score(metric_values, self.weights), total_latency
 
-        return net_score, total_latency
-
-    def evaluate_from_file(self, url_file_path: str) -> List[Dict[str, Any]]:
+    def evaluate_from_file(self, url_file_path: str,
+                           sink: Optional[Callable[[EvaluationResult], None]] = None) -> List[EvaluationResult]:
         """
         Evaluate URLs from a file where each line represents a group of related URLs
 
         Args:
-            url_file_path: Path to file containing line-by-line comma-separated URLs
+            url_file_path: Path to a plain, gzip or zstd URL file ("-" for stdin)
+            sink: Optional callable receiving each result as soon as it is produced;
+                  results handed to a sink are not accumulated
 
         Returns:
-            List of evaluation results
+            List of evaluation results (empty when a sink is given)
         """
         self.logger.info(f"Starting evaluation of URL file: {url_file_path}")
         try:
             results = []
-            with open(url_file_path, 'r') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if line:
-                        # Split each line by commas and filter out empty URLs
-                        line_urls = [url.strip() for url in line.split(',') if url.strip()]
-                        if line_urls:
-                            self.logger.info(f"Processing line {line_num} with {len(line_urls)} URLs")
-                            # Evaluate each line's URLs as a group
-                            line_results = self.evaluate_urls(line_urls)
-                            results.extend(line_results)
-
-            self.logger.info(f"Evaluation completed. Generated {len(results)} results")
+            result_count = 0
+            for _, line_results in self.evaluate_lines(url_file_path):
+                result_count += len(line_results)
+                if sink:
+                    for result in line_results:
+                        sink(result)
+                else:
+                    results.extend(line_results)
+
+            self.logger.info(f"Evaluation completed. Generated {result_count} results")
             return results
 
         except FileNotFoundError:
             self.logger.error(f"URL file not found: {url_file_path}")
             return []
-        except Exception as e:
+        except CassetteMissError:
+            # A strict replay must fail the run, not end it early as if the file were done
+            raise
+        except (OSError, EOFError) as e:
+            # Unreadable or truncated (e.g. cut-off gzip) input
             self.logger.error(f"Error reading URL file: {e}")
             return []
 
-    def print_results_ndjson(self, results: List[Dict[str, Any]]) -> None:
+    def evaluate_lines(self, url_file_path: str, shard_index: int = 0,
+                       shard_count: int = 1) -> Iterator[Tuple[int, List[EvaluationResult]]]:
+        """
+        Evaluate each line of a URL file as a group of related URLs
+
+        At most ``max_in_flight`` lines are read ahead and evaluated at once,
+        and results are yielded in line order, so memory stays bounded however
+        large the input is.
+
+        Args:
+            url_file_path: Path to a plain, gzip or zstd URL file, or "-" for stdin
+            shard_index: Only evaluate lines whose (line number - 1) % shard_count equals this
+            shard_count: Number of shards the file is split into
+
+        Yields:
+            (line number, evaluation results for the line)
+        """
+        url_groups = (
+            (line_num, line_urls) for line_num, line_urls in read_url_groups(url_file_path)
+            if (line_num - 1) % shard_count == shard_index
+        )
+
+        if self.max_in_flight == 1:
+            for line_num, line_urls in url_groups:
+                yield line_num, self._evaluate_line(line_num, line_urls)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            in_flight = deque()
+            for line_num, line_urls in url_groups:
+                # Backpressure: hand back the oldest line before reading another
+                if len(in_flight) >= self.max_in_flight:
+                    done_line, future = in_flight.popleft()
+                    yield done_line, future.result()
+                in_flight.append((line_num, executor.submit(self._evaluate_line, line_num, line_urls)))
+
+            while in_flight:
+                done_line, future = in_flight.popleft()
+                yield done_line, future.result()
+
+    def _evaluate_line(self, line_num: int, line_urls: List[str]) -> List[EvaluationResult]:
+        self.logger.info(f"Processing line {line_num} with {len(line_urls)} URLs")
+        # Evaluate each line's URLs as a group
+        return self.evaluate_urls(line_urls)
+
+    def print_results_ndjson(self, results: List[EvaluationResult]) -> None:
         """Print results in NDJSON format to stdout"""
-        for result in results:
-            print(json.dumps(result))
+        with phase("serialization"), NDJSONWriter() as writer:
+            for result in results:
+                writer.write(result.to_dict())
 
     def setup_logging(self) -> None:
         """Setup logging based on environment variables"""
@@ -314,23 +380,63 @@ class ModelEvaluator:
 
 def main():
     """Main entry point for command line usage"""
-    if len(sys.argv) != 2:
-        print("Usage: python model_evaluator.py <URL_FILE>", file=sys.stderr)
+    parser = argparse.ArgumentParser(usage="python model_evaluator.py <URL_FILE> [--metrics NAME,...] [--weights PROFILE] [--profile [PREFIX]]")
+    parser.add_argument("url_file")
+    parser.add_argument("--metrics", help="Comma-separated metrics to run (default: all)")
+    parser.add_argument("--weights", default="default", help="Named scoring profile for the net score")
+    parser.add_argument("--metrics-db", help="SQLite file to append raw metric values to")
+    parser.add_argument("--http-stats", default=os.environ.get("HTTP_STATS_FILE"),
+                        help="Write per-endpoint HTTP and cache statistics as JSON")
+    parser.add_argument("--profile", nargs="?", const="profile", metavar="PREFIX",
+                        help="Profile the run into PREFIX.pstats, PREFIX.collapsed and PREFIX.phases.json")
+    args = parser.parse_args()
+
+    url_file = args.url_file
+
+    try:
+        evaluator = ModelEvaluator(metrics=parse_metric_selection(args.metrics), weights=get_weights(args.weights))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
-
-    url_file = sys.argv[1]
-
-    evaluator = ModelEvaluator()
     evaluator.setup_logging()
 
-    results = evaluator.evaluate_from_file(url_file)
+    with profile_run(args.profile):
+        # Results are streamed out as they are produced instead of collected in memory
+        result_count = 0
+        # Keep raw metric values so net scores can be recomputed offline
+        store = MetricStore(args.metrics_db) if args.metrics_db else None
+        writer = NDJSONWriter()
+
+        def emit(result: EvaluationResult) -> None:
+            nonlocal result_count
+            # A strict replay stops at the first result built from missing responses
+            check_strict_replay()
+            result_count += 1
+            with phase("serialization"):
+                record = result.to_dict()
+                writer.write(record)
+                if store is not None:
+                    store.write(record)
 
-    if not results:
+        try:
+            evaluator.evaluate_from_file(url_file, sink=emit)
+            check_strict_replay()
+        except CassetteMissError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            with phase("serialization"):
+                writer.close()
+                if store is not None:
+                    store.close()
+
+    if args.http_stats:
+        INSTRUMENTATION.dump(args.http_stats)
+
+    if not result_count:
         print("No results generated", file=sys.stderr)
         sys.exit(1)
 
-    evaluator.print_results_ndjson(results)
-
 
 if __name__ == "__main__":
     main()
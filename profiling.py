@@ -0,0 +1,193 @@
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+import cProfile
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+
+
+# Evaluation phases reported by --profile
+PHASES = ("classification", "handler_construction", "fetch", "scoring", "serialization")
+
+_active_profiler: Optional["Profiler"] = None
+
+
+class Profiler:
+    """
+    Deterministic and sampling profiler for one CLI run.
+
+    cProfile is enabled in the calling thread and in every thread started while
+    profiling (fetch and metric worker pools), and the merged stats are written
+    as pstats. A background sampler records the stacks of all threads every
+    ``sample_interval`` seconds into a flamegraph-compatible collapsed-stack
+    file, with the sampled thread's evaluation phase as the root frame. Wall
+    and CPU time per phase are written as JSON.
+
+    Phases are tracked per thread, since lines are evaluated concurrently.
+    Pool threads that never enter a phase themselves (fetch and metric
+    workers) are sampled under the phase of the thread that started the
+    profiler. CPU time is that of the threads entering the phase, so work done
+    by pool workers shows up in the phase's samples rather than its CPU time.
+    """
+
+    def __init__(self, output_prefix: str, sample_interval: float = 0.005):
+        self.output_prefix = output_prefix
+        self.sample_interval = sample_interval
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._lock = threading.Lock()
+        self._main_profile: Optional[cProfile.Profile] = None
+        self._thread_profiles: List[cProfile.Profile] = []
+        self._samples: Counter = Counter()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self._phases: Dict[int, str] = {}  # current phase per thread id
+        self._main_thread_id: Optional[int] = None
+        self._phase_times: Dict[str, Dict[str, float]] = {}
+
+    def start(self) -> None:
+        self._main_thread_id = threading.get_ident()
+        self._main_profile = cProfile.Profile()
+        threading.setprofile(self._profile_new_thread)
+        self._main_profile.enable()
+
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._main_profile.disable()
+        threading.setprofile(None)
+        self._stop.set()
+        self._sampler.join()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Attribute wall time, CPU time and samples of the calling thread inside the block to a phase"""
+        thread_id = threading.get_ident()
+        previous = self._phases.get(thread_id)
+        if previous == name:
+            yield
+            return
+
+        with self._lock:
+            self._phases[thread_id] = name
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+            with self._lock:
+                totals = self._phase_times.setdefault(name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0})
+                totals["calls"] += 1
+                totals["wall_seconds"] += wall
+                totals["cpu_seconds"] += cpu
+                if previous is None:
+                    del self._phases[thread_id]
+                else:
+                    self._phases[thread_id] = previous
+
+    def write(self) -> Dict[str, str]:
+        """Write pstats, collapsed stacks and the phase summary; returns the paths"""
+        paths = {
+            "pstats": f"{self.output_prefix}.pstats",
+            "collapsed": f"{self.output_prefix}.collapsed",
+            "phases": f"{self.output_prefix}.phases.json"
+        }
+        directory = os.path.dirname(self.output_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        stats = pstats.Stats(self._main_profile)
+        for profile in self._thread_profiles:
+            try:
+                stats.add(profile)
+            except TypeError:
+                # A worker thread that never made a profiled call has no stats
+                continue
+        stats.dump_stats(paths["pstats"])
+
+        with open(paths["collapsed"], 'w') as f:
+            for stack, count in self._samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        samples_per_phase: Counter = Counter()
+        for stack, count in self._samples.items():
+            samples_per_phase[stack.split(';', 1)[0][len("phase:"):]] += count
+        summary = {
+            name: dict(self._phase_times.get(name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0}),
+                       samples=samples_per_phase.get(name, 0))
+            for name in list(PHASES) + [p for p in self._phase_times if p not in PHASES]
+        }
+        summary["other"] = {"samples": samples_per_phase.get("other", 0)}
+        with open(paths["phases"], 'w') as f:
+            json.dump(summary, f, indent=2)
+
+        return paths
+
+    def _profile_new_thread(self, frame: Any, event: str, arg: Any) -> None:
+        """threading.setprofile hook: switch each new thread over to its own cProfile"""
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Only one profiler may be active at a time on newer interpreters
+            return
+        with self._lock:
+            self._thread_profiles.append(profile)
+
+    def _sample(self) -> None:
+        sampler_id = threading.get_ident()
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                phases = dict(self._phases)
+            default_phase = phases.get(self._main_thread_id, "other")
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+                phase = phases.get(thread_id, default_phase)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(f"phase:{phase}")
+                self._samples[";".join(reversed(stack))] += 1
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Mark an evaluation phase for the active profiler (no-op when not profiling)"""
+    profiler = _active_profiler
+    if profiler is None:
+        yield
+        return
+    with profiler.phase(name):
+        yield
+
+
+@contextmanager
+def profile_run(output_prefix: Optional[str], sample_interval: float = 0.005) -> Iterator[Optional[Profiler]]:
+    """Profile the enclosed block and write the results under output_prefix (disabled if None)"""
+    global _active_profiler
+    if not output_prefix:
+        yield None
+        return
+
+    profiler = Profiler(output_prefix, sample_interval)
+    _active_profiler = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active_profiler = None
+        paths = profiler.write()
+        print(f"Profile written to {', '.join(paths.values())}", file=sys.stderr)
@@ -0,0 +1,84 @@
+from typing import Dict, Optional
+import os
+import tempfile
+import threading
+import time
+
+from sqlite_util import LocalConnections
+
+
+class RateLimiter:
+    """
+    Token bucket per key (host), shared by every process using the same SQLite file.
+
+    Each bucket refills at ``rate`` tokens per second up to ``burst`` tokens.
+    acquire() takes a token inside an immediate transaction, so concurrent
+    processes draw from one budget instead of each getting their own.
+    """
+
+    def __init__(self, db_path: str, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("Rate limit must be positive")
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._connections = LocalConnections(self.db_path, timeout=30)
+
+        self._connections.get().execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)"
+        )
+
+    def acquire(self, key: str) -> float:
+        """Block until a token for key is available; returns the seconds spent waiting"""
+        waited = 0.0
+        conn = self._connections.get()
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens = self.burst if row is None else min(self.burst, row[0] + (now - row[1]) * self.rate)
+                if tokens >= 1:
+                    tokens -= 1
+                    wait = 0.0
+                else:
+                    wait = (1 - tokens) / self.rate
+                conn.execute("INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                             (key, tokens, now))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            if not wait:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Limiter for HTTP_RATE_LIMIT requests per second per host, or None when unset.
+
+    The bucket file is HTTP_RATE_LIMIT_DB, defaulting to rate_limit.db in
+    HTTP_CACHE_DIR (or the system temp directory).
+    """
+    rate = os.environ.get('HTTP_RATE_LIMIT')
+    if not rate:
+        return None
+
+    db_path = os.environ.get('HTTP_RATE_LIMIT_DB') or os.path.join(
+        os.environ.get('HTTP_CACHE_DIR') or tempfile.gettempdir(), "rate_limit.db"
+    )
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(db_path)
+        if limiter is None or limiter.rate != float(rate):
+            limiter = _rate_limiters[db_path] = RateLimiter(db_path, float(rate))
+        return limiter
@@ -0,0 +1,244 @@
+from typing import Dict, List, Optional, Any
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+
+
+class RepoCacheError(Exception):
+    """Raised when a repository cannot be resolved or cloned"""
+    pass
+
+
+class RepoCache:
+    """
+    Content-addressed cache of shallow git clones keyed by repository URL and commit.
+
+    Each entry is a shallow, single-branch clone stored under
+    ``<cache_dir>/<sha256(url, commit)>``. When a new commit appears for a URL that
+    is already cached, the previous entry is copied and refreshed with
+    ``git fetch --depth 1`` so unchanged objects (including LFS weights) are not
+    downloaded again. Jobs never run inside the cache: they get a private copy of
+    the working tree. Total disk usage is bounded by ``max_bytes`` with LRU eviction.
+
+    Concurrent checkouts are coordinated with in-process locks only, so one
+    cache directory may be shared by the threads of one process but not by
+    several processes (e.g. uvicorn with ``--workers`` > 1): give each worker
+    process its own ``cache_dir``.
+    """
+
+    META_FILE = "meta.json"
+    REPO_DIR = "repo"
+
+    def __init__(self, cache_dir: str, max_bytes: int, git_timeout: int = 600):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.git_timeout = git_timeout
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._lock = threading.Lock()
+        # Per-entry locks, kept only while a checkout of the entry is in progress
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._in_use: Dict[str, int] = {}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def resolve_commit(self, repo_url: str, ref: str = "HEAD") -> str:
+        """Resolve a ref of a remote repository to a commit SHA without cloning it"""
+        output = self._git(["ls-remote", "--", repo_url, ref])
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) == 2:
+                return parts[0]
+        raise RepoCacheError(f"Could not resolve {ref} for {repo_url}")
+
+    def checkout(self, repo_url: str, dest: str, commit: Optional[str] = None) -> str:
+        """
+        Copy the working tree of ``repo_url`` at ``commit`` into ``dest``
+
+        Args:
+            repo_url: Remote repository URL
+            dest: Per-job directory to copy the working tree into
+            commit: Commit SHA to check out (defaults to the remote HEAD)
+
+        Returns:
+            The commit SHA that was checked out
+        """
+        repo_url = self._normalize_url(repo_url)
+        if commit is None:
+            commit = self.resolve_commit(repo_url)
+
+        key = self._cache_key(repo_url, commit)
+        self._acquire(key)
+        try:
+            with self._key_lock(key):
+                entry_path = os.path.join(self.cache_dir, key)
+                if os.path.isdir(entry_path):
+                    self.logger.info(f"Repository cache hit: {repo_url}@{commit}")
+                else:
+                    self.logger.info(f"Repository cache miss: {repo_url}@{commit}")
+                    self._populate(repo_url, commit, entry_path)
+
+                self._touch(entry_path)
+                shutil.copytree(
+                    os.path.join(entry_path, self.REPO_DIR), dest,
+                    ignore=shutil.ignore_patterns('.git'), dirs_exist_ok=True
+                )
+        finally:
+            self._release(key)
+
+        self._evict(keep=key)
+        return commit
+
+    def _populate(self, repo_url: str, commit: str, entry_path: str) -> None:
+        """Create a cache entry, refreshing an older entry for the same URL if possible"""
+        tmp_path = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}")
+        repo_path = os.path.join(tmp_path, self.REPO_DIR)
+        os.makedirs(tmp_path)
+
+        try:
+            previous = self._latest_entry_for(repo_url)
+            refreshed = False
+            if previous:
+                try:
+                    shutil.copytree(os.path.join(previous, self.REPO_DIR), repo_path, symlinks=True)
+                    self._fetch_commit(repo_path, commit)
+                    refreshed = True
+                except (RepoCacheError, OSError) as e:
+                    self.logger.warning(f"Refreshing cached clone failed, cloning instead: {e}")
+                    shutil.rmtree(repo_path, ignore_errors=True)
+
+            if not refreshed:
+                self._git([
+                    "clone", "--depth", "1", "--single-branch", "--no-tags", "--", repo_url, repo_path
+                ])
+                head = self._git(["rev-parse", "HEAD"], cwd=repo_path).strip()
+                if head != commit:
+                    # The remote moved between ls-remote and clone
+                    self._fetch_commit(repo_path, commit)
+
+            meta = {
+                "url": repo_url,
+                "commit": commit,
+                "size_bytes": self._dir_size(repo_path),
+                "last_used": time.time()
+            }
+            with open(os.path.join(tmp_path, self.META_FILE), 'w') as f:
+                json.dump(meta, f)
+
+            os.rename(tmp_path, entry_path)
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+    def _fetch_commit(self, repo_path: str, commit: str) -> None:
+        """Shallow-fetch a single commit into an existing clone and check it out"""
+        self._git(["fetch", "--depth", "1", "--no-tags", "origin", commit], cwd=repo_path)
+        self._git(["checkout", "--force", "--detach", "FETCH_HEAD"], cwd=repo_path)
+        self._git(["clean", "-fdx"], cwd=repo_path)
+
+    def _latest_entry_for(self, repo_url: str) -> Optional[str]:
+        """Return the most recently used entry for a URL, if any"""
+        candidates = [e for e in self._entries() if e["url"] == repo_url]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda e: e["last_used"])["path"]
+
+    def _evict(self, keep: str) -> None:
+        """Delete least recently used entries until the cache fits in its quota, sparing ``keep``"""
+        with self._lock:
+            entries = self._entries()
+            total = sum(e["size_bytes"] for e in entries)
+            if total <= self.max_bytes:
+                return
+
+            for entry in sorted(entries, key=lambda e: e["last_used"]):
+                if total <= self.max_bytes:
+                    break
+                key = os.path.basename(entry["path"])
+                if key == keep or self._in_use.get(key):
+                    continue
+                self.logger.info(f"Evicting cached clone {entry['url']}@{entry['commit']}")
+                shutil.rmtree(entry["path"], ignore_errors=True)
+                total -= entry["size_bytes"]
+
+    def _entries(self) -> List[Dict[str, Any]]:
+        """Read metadata of all complete cache entries"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith('.'):
+                continue
+            meta_path = os.path.join(self.cache_dir, name, self.META_FILE)
+            try:
+                with open(meta_path, 'r') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            meta["path"] = os.path.join(self.cache_dir, name)
+            entries.append(meta)
+        return entries
+
+    def _touch(self, entry_path: str) -> None:
+        """Record that an entry was just used"""
+        meta_path = os.path.join(entry_path, self.META_FILE)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            meta["last_used"] = time.time()
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not update cache metadata: {e}")
+
+    def _acquire(self, key: str) -> None:
+        with self._lock:
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._in_use[key] -= 1
+            if not self._in_use[key]:
+                # Nobody holds or waits for the entry's lock any more
+                del self._in_use[key]
+                self._key_locks.pop(key, None)
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _git(self, args: List[str], cwd: Optional[str] = None) -> str:
+        """Run a git command and return its stdout"""
+        try:
+            result = subprocess.run(
+                ["git"] + args, capture_output=True, text=True,
+                cwd=cwd, timeout=self.git_timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise RepoCacheError(f"git {args[0]} timed out")
+
+        if result.returncode != 0:
+            raise RepoCacheError(result.stderr.strip() or f"git {args[0]} failed")
+        return result.stdout
+
+    @staticmethod
+    def _normalize_url(repo_url: str) -> str:
+        return repo_url.strip().rstrip('/')
+
+    @staticmethod
+    def _cache_key(repo_url: str, commit: str) -> str:
+        return hashlib.sha256(f"{repo_url}\n{commit}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _dir_size(path: str) -> int:
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                file_path = os.path.join(root, name)
+                if not os.path.islink(file_path):
+                    total += os.path.getsize(file_path)
+        return total
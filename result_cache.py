@@ -0,0 +1,73 @@
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future
+import logging
+import threading
+import time
+
+
+class ResultCache:
+    """
+    In-memory LRU cache of evaluation results with request coalescing.
+
+    Identical requests that arrive while a computation for the same key is still
+    running wait for that computation instead of starting their own. Failures are
+    propagated to every waiter but never cached.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, Future] = {}
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Return the cached value for ``key``, computing it at most once
+
+        Args:
+            key: Hashable cache key
+            compute: Zero-argument callable producing the value on a miss
+
+        Returns:
+            Tuple of (value, served_from_cache)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry):
+                self._entries.move_to_end(key)
+                return entry[1], True
+
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not owner:
+            self.logger.info(f"Coalescing request for {key}")
+            return future.result(), True
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            del self._in_flight[key]
+        future.set_result(value)
+
+        return value, False
+
+    def _expired(self, entry: Tuple[float, Any]) -> bool:
+        return self.ttl_seconds is not None and time.time() - entry[0] > self.ttl_seconds
@@ -0,0 +1,211 @@
+from typing import IO, Any, Dict, List, Optional, Set
+import io
+import logging
+import sys
+
+import json_backend
+
+
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+
+def flatten_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten nested metric scores, e.g. size_score -> size_score_raspberry_pi, ..."""
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                flat[f"{key}_{sub_key}"] = sub_value
+        else:
+            flat[key] = value
+    return flat
+
+
+class NDJSONWriter:
+    """
+    Writes results as NDJSON lines through an in-memory buffer.
+
+    Lines are encoded with the configured JSON backend and written to the
+    stream in batches of ``buffer_lines`` lines (binary streams, or the binary
+    buffer under a text stream such as stdout, receive the encoded bytes
+    directly), instead of one write and flush per line.
+    """
+
+    def __init__(self, stream: Optional[IO] = None, buffer_lines: int = 256):
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_lines = buffer_lines
+        self.rows_written = 0
+        self._lines: List[bytes] = []
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Buffer one record, writing the batch out when the buffer is full"""
+        self._lines.append(json_backend.dumps(record))
+        if len(self._lines) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered lines to the stream"""
+        if not self._lines:
+            return
+        data = b"\n".join(self._lines) + b"\n"
+        self.rows_written += len(self._lines)
+        self._lines.clear()
+
+        if not isinstance(self.stream, io.TextIOBase):
+            self.stream.write(data)
+        elif getattr(self.stream, "buffer", None) is not None:
+            # Keep anything already printed to the text layer ahead of these lines
+            self.stream.flush()
+            self.stream.buffer.write(data)
+            self.stream.buffer.flush()
+        else:
+            self.stream.write(data.decode("utf-8"))
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Write any remaining lines (the stream itself is left open)"""
+        self.flush()
+
+    def __enter__(self) -> "NDJSONWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class ColumnarResultWriter:
+    """
+    Writes evaluation results as typed Arrow record batches.
+
+    Results are buffered and flushed every ``row_group_size`` rows, so each
+    flush becomes one Parquet row group (or one Arrow IPC record batch) and a
+    long run never holds more than one batch in memory. The columns come from
+    ``score_fields`` (metric name -> keys of a dictionary score, or None for a
+    single number, as declared by BaseMetric.score_fields) and otherwise from
+    the first result: name/category are strings, ``*_latency`` columns are
+    int64 and all metric scores are float64. Values that do not fit a column,
+    and columns missing from the schema, are logged rather than written.
+    """
+
+    def __init__(self, path: str, output_format: str = "parquet", row_group_size: int = 10000,
+                 score_fields: Optional[Dict[str, Optional[List[str]]]] = None):
+        if output_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported columnar format '{output_format}'. Use one of: {', '.join(COLUMNAR_FORMATS)}")
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("pyarrow is required for parquet/arrow output (pip install pyarrow)")
+
+        self.path = path
+        self.output_format = output_format
+        self.row_group_size = row_group_size
+        self.score_fields = score_fields
+        self.rows_written = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._warned: Set[str] = set()
+        self._schema = None
+        self._writer = None
+        self._columns: Dict[str, List[Any]] = {}
+        self._buffered = 0
+
+    def write(self, result: Dict[str, Any]) -> None:
+        """Buffer one result, flushing a row group when the buffer is full"""
+        flat = flatten_result(result)
+        for metric_name, fields in (self.score_fields or {}).items():
+            # A fallback number for a dictionary metric fills each of its columns
+            if fields and not isinstance(result.get(metric_name), dict) and metric_name in flat:
+                value = flat.pop(metric_name)
+                for field in fields:
+                    flat[f"{metric_name}_{field}"] = value
+        if self._schema is None:
+            self._open(self._metric_columns() if self.score_fields is not None else list(flat))
+
+        for name in flat.keys() - self._columns.keys():
+            self._warn(name, f"Column '{name}' is not in the {self.output_format} schema and was not written")
+        for name, values in self._columns.items():
+            values.append(self._convert(name, flat.get(name)))
+        self._buffered += 1
+
+        if self._buffered >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered rows as one row group"""
+        if not self._buffered:
+            return
+        import pyarrow as pa
+
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(self._columns[field.name], type=field.type) for field in self._schema],
+            schema=self._schema
+        )
+        if self.output_format == "parquet":
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+
+        self.rows_written += self._buffered
+        self._buffered = 0
+        for values in self._columns.values():
+            values.clear()
+
+    def close(self) -> None:
+        """Flush remaining rows and finalize the file"""
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _metric_columns(self) -> List[str]:
+        columns = ["name", "category", "net_score", "net_score_latency"]
+        for metric_name, fields in self.score_fields.items():
+            if fields:
+                columns.extend(f"{metric_name}_{field}" for field in fields)
+            else:
+                columns.append(metric_name)
+            columns.append(f"{metric_name}_latency")
+        return columns
+
+    def _convert(self, name: str, value: Any) -> Any:
+        """Value as the column's type, or None (logged) if it cannot be converted"""
+        if value is None:
+            return None
+        if name in ("name", "category"):
+            return str(value)
+        try:
+            return int(value) if name.endswith("_latency") else float(value)
+        except (TypeError, ValueError):
+            self._warn(f"{name}:type", f"Column '{name}' got a non-numeric value ({type(value).__name__}); written as null")
+            return None
+
+    def _warn(self, key: str, message: str) -> None:
+        if key not in self._warned:
+            self._warned.add(key)
+            self.logger.warning(message)
+
+    def _open(self, column_names: List[str]) -> None:
+        import pyarrow as pa
+
+        fields = []
+        for name in column_names:
+            if name in ("name", "category"):
+                fields.append(pa.field(name, pa.string()))
+            elif name.endswith("_latency"):
+                fields.append(pa.field(name, pa.int64()))
+            else:
+                fields.append(pa.field(name, pa.float64()))
+        self._schema = pa.schema(fields)
+        self._columns = {field.name: [] for field in self._schema}
+
+        if self.output_format == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        else:
+            self._writer = pa.ipc.new_file(self.path, self._schema)
+
+    def __enter__(self) -> "ColumnarResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,243 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+
+
+# Weights based on Sarah's priorities
+DEFAULT_WEIGHTS = {
+    "license": 0.2,                 # High priority - legal compliance
+    "performance_claims": 0.15,     # High priority - proven performance
+    "ramp_up_time": 0.15,           # Important for adoption
+    "bus_factor": 0.1,              # Risk management
+    "size_score": 0.1,              # Deployment considerations
+    "dataset_and_code_score": 0.1,  # Reproducibility
+    "dataset_quality": 0.1,         # Data quality matters
+    "code_quality": 0.1             # Maintainability
+}
+
+# Named scoring profiles; more can be loaded from SCORING_PROFILES_FILE
+WEIGHT_PROFILES = {
+    "default": DEFAULT_WEIGHTS,
+    "compliance": {
+        "license": 0.4, "bus_factor": 0.2, "code_quality": 0.2,
+        "dataset_quality": 0.1, "dataset_and_code_score": 0.1
+    },
+    "deployment": {
+        "size_score": 0.35, "ramp_up_time": 0.25, "license": 0.2,
+        "performance_claims": 0.1, "code_quality": 0.1
+    },
+    "reproducibility": {
+        "dataset_and_code_score": 0.3, "dataset_quality": 0.25, "performance_claims": 0.25,
+        "code_quality": 0.1, "license": 0.1
+    }
+}
+
+_COLUMN_PATTERN = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+
+def column_name(metric_name: str) -> str:
+    """Metric name as a metric store column: lowercase, other characters replaced by '_'"""
+    column = re.sub(r'[^a-z0-9_]', '_', metric_name.lower())
+    return f"_{column}" if column[:1].isdigit() else column
+
+
+def metric_value(score: Any) -> float:
+    """Collapse a metric score to one number (size_score is averaged over devices)"""
+    if isinstance(score, dict):
+        return sum(score.values()) / len(score) if score else 0.0
+    return float(score)
+
+
+def net_score(metric_values: Dict[str, float], weights: Dict[str, float]) -> float:
+    """Weighted mean of the metrics that are both weighted and present"""
+    weighted_sum = 0.0
+    total_weight = 0.0
+    for metric_name, weight in weights.items():
+        if metric_name in metric_values:
+            weighted_sum += metric_values[metric_name] * weight
+            total_weight += weight
+    return weighted_sum / total_weight if total_weight > 0 else 0.0
+
+
+def load_weight_profiles(profiles_path: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Built-in profiles merged with a JSON file of {"name": {"metric": weight}}"""
+    profiles = dict(WEIGHT_PROFILES)
+    profiles_path = profiles_path or os.environ.get('SCORING_PROFILES_FILE')
+    if profiles_path:
+        with open(profiles_path, 'r') as f:
+            profiles.update(json.load(f))
+    return profiles
+
+
+def get_weights(profile: str = "default", profiles_path: Optional[str] = None) -> Dict[str, float]:
+    """Look up a named weight profile"""
+    profiles = load_weight_profiles(profiles_path)
+    if profile not in profiles:
+        raise ValueError(f"Unknown scoring profile '{profile}'. Available: {', '.join(profiles)}")
+    return profiles[profile]
+
+
+class MetricStore:
+    """
+    SQLite table of raw metric values, one row per evaluated model.
+
+    Net scores are not stored: rescore() recomputes them for any weight profile
+    with a single SQL aggregate over the table, without refetching anything.
+    Results streamed in with write() are inserted ``batch_size`` at a time, in
+    one transaction per batch. Metric names become columns through
+    column_name(), so plugin metrics such as "My-Metric" are stored (and
+    weighted) as "my_metric".
+    """
+
+    TABLE = "metric_values"
+
+    def __init__(self, db_path: str, batch_size: int = 500):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._pending: List[Dict[str, Any]] = []
+        self._skipped_columns = set()
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+            "id INTEGER PRIMARY KEY, name TEXT, category TEXT, evaluated_at REAL)"
+        )
+        self._columns = self._existing_columns()
+
+    def write(self, result: Dict[str, Any]) -> None:
+        """Buffer one evaluation result, storing the batch when the buffer is full"""
+        self._pending.append(result)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Store the buffered results"""
+        if self._pending:
+            results, self._pending = self._pending, []
+            self.add_results(results)
+
+    def add_results(self, results: Iterable[Dict[str, Any]]) -> None:
+        """Store the raw metric values of evaluation results in one transaction"""
+        rows = [self._flatten(result) for result in results]
+        for row in rows:
+            for column in list(row):
+                if not self._ensure_column(column):
+                    del row[column]
+
+        with self._conn:
+            for row in rows:
+                columns = ", ".join(f'"{column}"' for column in row)
+                placeholders = ", ".join("?" for _ in row)
+                self._conn.execute(
+                    f"INSERT INTO {self.TABLE} ({columns}) VALUES ({placeholders})", list(row.values())
+                )
+
+    def rescore(self, weights: Dict[str, float]) -> List[Tuple[str, float]]:
+        """
+        Recompute net scores for every stored model under the given weights
+
+        Args:
+            weights: Mapping of metric name to weight
+
+        Returns:
+            List of (model name, net score) in insertion order
+        """
+        weighted = [(column_name(metric), weight) for metric, weight in weights.items()
+                    if column_name(metric) in self._columns]
+        if not weighted:
+            return [(name, 0.0) for (name,) in self._conn.execute(f"SELECT name FROM {self.TABLE} ORDER BY id")]
+
+        # Missing metrics (NULL) drop out of both the weighted sum and the total weight
+        numerator = " + ".join(f'COALESCE("{metric}" * ?, 0)' for metric, _ in weighted)
+        denominator = " + ".join(f'("{metric}" IS NOT NULL) * ?' for metric, _ in weighted)
+        params = [weight for _, weight in weighted] * 2
+        query = (
+            f"SELECT name, COALESCE(({numerator}) / NULLIF({denominator}, 0), 0.0) "
+            f"FROM {self.TABLE} ORDER BY id"
+        )
+        return [(name, float(score)) for name, score in self._conn.execute(query, params)]
+
+    def load_table(self) -> "MetricTable":
+        """Load every stored metric column into a columnar in-memory table (requires NumPy)"""
+        import numpy as np
+
+        columns = [c for c in self._columns if c not in ("id", "name", "category", "evaluated_at")]
+        selected = ", ".join(["name"] + [f'"{column}"' for column in columns])
+        rows = self._conn.execute(f"SELECT {selected} FROM {self.TABLE} ORDER BY id").fetchall()
+
+        names = [row[0] for row in rows]
+        values = np.array([row[1:] for row in rows], dtype=float).reshape(len(rows), len(columns))
+        return MetricTable(names, columns, values)
+
+    def close(self) -> None:
+        """Store any buffered results and close the database"""
+        self.flush()
+        self._conn.close()
+
+    @staticmethod
+    def _flatten(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Raw numeric metric values of one result; size_score is also kept per device"""
+        row = {"name": result.get("name"), "category": result.get("category"), "evaluated_at": time.time()}
+        for key, value in result.items():
+            if key in ("name", "category", "net_score") or key.endswith("_latency"):
+                continue
+            if isinstance(value, dict):
+                for device, device_score in value.items():
+                    row[column_name(f"{key}_{device}")] = float(device_score)
+                row[column_name(key)] = metric_value(value)
+            elif isinstance(value, (int, float)):
+                row[column_name(key)] = float(value)
+        return row
+
+    def _existing_columns(self) -> set:
+        return {row[1] for row in self._conn.execute(f"PRAGMA table_info({self.TABLE})")}
+
+    def _ensure_column(self, column: str) -> bool:
+        """Add a column for a new metric; False (with a warning) if the name cannot be one"""
+        if column in self._columns:
+            return True
+        if not _COLUMN_PATTERN.match(column):
+            if column not in self._skipped_columns:
+                self._skipped_columns.add(column)
+                self.logger.warning(f"Not storing metric '{column}': not a valid column name")
+            return False
+        self._conn.execute(f'ALTER TABLE {self.TABLE} ADD COLUMN "{column}" REAL')
+        self._columns.add(column)
+        return True
+
+
+class MetricTable:
+    """
+    Metric values as a (models x metrics) matrix for vectorized re-scoring.
+
+    Applying a weight profile is two matrix-vector products, so trying several
+    profiles over hundreds of thousands of models takes milliseconds each.
+    """
+
+    def __init__(self, names: List[str], columns: List[str], values: Any):
+        import numpy as np
+
+        self.names = names
+        self.columns = columns
+        self._column_index = {column: i for i, column in enumerate(columns)}
+        # Missing metrics (NaN) drop out of both the weighted sum and the total weight
+        self._present = (~np.isnan(values)).astype(float)
+        self._values = np.nan_to_num(values, nan=0.0)
+
+    def rescore(self, weights: Dict[str, float]) -> Any:
+        """Net score of every model under the given weights, as a NumPy array"""
+        import numpy as np
+
+        vector = np.zeros(len(self.columns))
+        for metric_name, weight in weights.items():
+            column = column_name(metric_name)
+            if column in self._column_index:
+                vector[self._column_index[column]] = weight
+
+        weighted_sum = self._values @ vector
+        total_weight = self._present @ vector
+        return np.divide(weighted_sum, total_weight, out=np.zeros_like(weighted_sum), where=total_weight > 0)
@@ -0,0 +1,118 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import heapq
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+import json_backend
+from evaluation_result import EvaluationResult
+from http_cassette import append_cassette, close_cassettes, get_cassette
+from instrumentation import INSTRUMENTATION
+
+
+logger = logging.getLogger(__name__)
+
+
+def _evaluate_shard(task: Tuple[str, int, int, Optional[List[str]], Optional[Dict[str, float]], str]
+                    ) -> Tuple[int, Dict[str, Any]]:
+    """
+    Worker process: evaluate one shard of the URL file into an ordered NDJSON file
+
+    Returns the number of results and the worker's instrumentation snapshot.
+    Responses recorded for HTTP_CASSETTE go to a cassette file next to the
+    shard output, closed here because pool workers exit without running atexit.
+    """
+    url_file_path, shard_index, shard_count, metrics, weights, output_path = task
+
+    # Imported here so each worker builds its own evaluator, HTTP sessions and pools
+    from model_evaluator import ModelEvaluator
+
+    os.environ['HTTP_CASSETTE_RECORD_PATH'] = _cassette_path(output_path)
+    INSTRUMENTATION.reset()
+    evaluator = ModelEvaluator(metrics=metrics, weights=weights)
+    evaluator.setup_logging()
+
+    result_count = 0
+    try:
+        with open(output_path, 'wb') as f:
+            for line_num, results in evaluator.evaluate_lines(url_file_path, shard_index, shard_count):
+                for result in results:
+                    f.write(json_backend.dumps({"line": line_num, "result": result.to_dict()}) + b"\n")
+                    result_count += 1
+    finally:
+        close_cassettes()
+    return result_count, INSTRUMENTATION.snapshot()
+
+
+def _cassette_path(output_path: str) -> str:
+    return output_path + ".cassette.jsonl.gz"
+
+
+def _read_shard(path: str) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+    with open(path, 'rb') as f:
+        for position, line in enumerate(f):
+            record = json_backend.loads(line)
+            yield record["line"], position, record["result"]
+
+
+def evaluate_sharded(url_file_path: str, shard_count: int, sink: Callable[[EvaluationResult], None],
+                     metrics: Optional[List[str]] = None, weights: Optional[Dict[str, float]] = None) -> int:
+    """
+    Evaluate a URL file with one worker process per shard and emit results in line order
+
+    Lines are dealt round-robin to ``shard_count`` processes, each with its own
+    evaluator and HTTP pools. Workers share the on-disk HTTP cache and the
+    HTTP_RATE_LIMIT budget; if HTTP_CACHE_DIR is not set, a cache scoped to this
+    run is used. Each worker writes its results in line order, and the parent
+    merges the shard files so ``sink`` sees the same order as a single-process run.
+    Worker instrumentation is merged into the parent's, and responses recorded
+    by the workers are appended to the HTTP_CASSETTE archive.
+
+    Args:
+        url_file_path: Path to file containing line-by-line comma-separated URLs
+        shard_count: Number of worker processes
+        sink: Callable receiving each result, in input line order
+        metrics: Metric names to run (defaults to all)
+        weights: Scoring profile for the net score
+
+    Returns:
+        Number of results emitted
+    """
+    if not os.path.exists(url_file_path):
+        raise FileNotFoundError(url_file_path)
+
+    work_dir = tempfile.mkdtemp(prefix="shards_")
+    scoped_cache = not os.environ.get('HTTP_CACHE_DIR')
+    try:
+        if scoped_cache:
+            os.environ['HTTP_CACHE_DIR'] = os.path.join(work_dir, "http_cache")
+
+        tasks = [
+            (url_file_path, index, shard_count, metrics, weights, os.path.join(work_dir, f"shard-{index}.ndjson"))
+            for index in range(shard_count)
+        ]
+        with multiprocessing.Pool(processes=shard_count) as pool:
+            outcomes = pool.map(_evaluate_shard, tasks)
+        counts = [count for count, _ in outcomes]
+        logger.info(f"Shards produced {sum(counts)} results: {counts}")
+
+        for _, snapshot in outcomes:
+            INSTRUMENTATION.merge(snapshot)
+        cassette = get_cassette()
+        if cassette is not None and cassette.mode != "replay":
+            cassette.close()
+            for task in tasks:
+                append_cassette(cassette.record_path, _cassette_path(task[-1]))
+
+        result_count = 0
+        for _, _, record in heapq.merge(*(_read_shard(task[-1]) for task in tasks), key=lambda entry: entry[:2]):
+            sink(EvaluationResult.from_dict(record))
+            result_count += 1
+        return result_count
+
+    finally:
+        if scoped_cache:
+            os.environ.pop('HTTP_CACHE_DIR', None)
+        shutil.rmtree(work_dir, ignore_errors=True)
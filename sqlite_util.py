@@ -0,0 +1,31 @@
+from typing import Iterable
+import os
+import sqlite3
+import threading
+
+
+class LocalConnections:
+    """
+    One autocommit SQLite connection per thread and process.
+
+    SQLite connections must not be shared across threads or carried across a
+    fork, so each thread gets its own connection, reopened when the process
+    id changes (e.g. in the workers of a sharded run).
+    """
+
+    def __init__(self, db_path: str, timeout: float = 30, pragmas: Iterable[str] = ()):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.pragmas = tuple(pragmas)
+        self._local = threading.local()
+
+    def get(self) -> sqlite3.Connection:
+        """This thread's connection, opened (and set up with the pragmas) on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+            for pragma in self.pragmas:
+                conn.execute(f"PRAGMA {pragma}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
@@ -1,17 +1,56 @@
 import unittest
+import argparse
+import random
 import tempfile
 import os
+import gzip
+import io
+import json
+import pstats
+import time
+import shutil
+import sqlite3
+import subprocess
+import sys
+import threading
 from unittest.mock import Mock, patch, MagicMock
 from typing import Dict, List, Any
 
+import numpy as np
+import pandas as pd
+import requests
+
 from url_classifier import URLClassifier, URLType
 from resource_handlers import ModelHandler, DatasetHandler, CodeHandler
+from handlers.license_matcher import find_license, license_score, normalize_license
+from handlers import model_card
+from handlers.model_card import parse_model_card
 from metrics import (
     LicenseMetric, SizeScoreMetric, RampUpTimeMetric, BusFactorMetric,
     PerformanceClaimsMetric, DatasetAndCodeScoreMetric, DatasetQualityMetric,
-    CodeQualityMetric
+    CodeQualityMetric, MetricRegistry, METRIC_CLASSES
 )
+from metrics.base_metric import BaseMetric
+import model_evaluator
 from model_evaluator import ModelEvaluator
+from evaluation_result import EvaluationResult
+from url_input import canonicalize_url, read_url_groups
+from repo_cache import RepoCache, RepoCacheError
+from result_cache import ResultCache
+from fetch_planner import FetchPlanner
+from scoring import MetricStore, WEIGHT_PROFILES, get_weights
+from result_writers import ColumnarResultWriter, NDJSONWriter
+import json_backend
+from instrumentation import INSTRUMENTATION
+from profiling import phase, profile_run
+from http_cassette import CassetteMissError, close_cassettes
+from benchmarks.mock_server import MockHubServer
+from benchmarks.run_benchmark import run_benchmark, write_url_file
+from sharding import evaluate_sharded
+from rate_limiter import RateLimiter
+from concurrency_limiter import AdaptiveConcurrencyLimiter
+from work_queue import WorkQueue, run_worker
+from sqlite_util import LocalConnections
 
 
 class TestURLClassifier(unittest.TestCase):
@@ -58,6 +97,36 @@ class TestURLClassifier(unittest.TestCase):
         self.assertEqual(len(result[URLType.CODE]), 1)
         self.assertEqual(len(result[URLType.UNKNOWN]), 0)
 
+    def test_classify_url_variants(self):
+        """Test 59: hf.co, www., /tree/ and /blob/ URLs are classified by host and path"""
+        cases = {
+            "https://hf.co/google/gemma-3-270m/tree/v1.0": URLType.MODEL,
+            "https://www.huggingface.co/datasets/xlangai/AgentNet/blob/main/README.md": URLType.DATASET,
+            "https://huggingface.co/gpt2": URLType.MODEL,
+            "https://github.com/SkyworkAI/Matrix-Game.git": URLType.CODE,
+            "https://example.com/some/path": URLType.UNKNOWN,
+        }
+        for url, url_type in cases.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.classifier.classify_url(url), url_type)
+
+    def test_grouping_matches_classify_url(self):
+        """Test 68: group_urls_by_type routes every URL exactly as classify_url does"""
+        urls = [
+            "https://huggingface.co/",
+            "https://sub.huggingface.co/x/y",
+            "https://huggingface.co/datasets/xlangai/AgentNet\r",
+            "https://github.com/a/b c",
+            "https://hf.co/google/gemma-3-270m",
+            "huggingface.co/gpt2",
+            "https://example.com/some/path",
+        ]
+        grouped = self.classifier.group_urls_by_type(urls)
+
+        for url in urls:
+            self.assertIn(url, grouped[self.classifier.classify_url(url)])
+        self.assertEqual(sum(len(group) for group in grouped.values()), len(urls))
+
 
 class TestResourceHandlers(unittest.TestCase):
     """Test resource handler functionality"""
@@ -110,6 +179,128 @@ class TestResourceHandlers(unittest.TestCase):
 
         self.assertEqual(data["stargazers_count"], 100)
 
+    def test_license_text_matching(self):
+        """Test 43: License text matching ignores words that merely contain a license name"""
+        self.assertIsNone(find_license("Please submit issues; the rate limit is 10 requests"))
+        self.assertEqual(find_license("Released under the MIT License."), "MIT")
+        self.assertEqual(find_license("Licensed under the Apache License,\nVersion 2.0"), "Apache-2.0")
+        self.assertEqual(find_license("lgpl-2.1 only"), "LGPL-2.1-only")
+        self.assertEqual(find_license("An MIT-licensed port of the original model"), "MIT")
+        self.assertEqual(find_license("This checkpoint is Apache-2.0-licensed."), "Apache-2.0")
+        self.assertEqual(find_license("See the bsd-3-clause-license file"), "BSD-3-Clause")
+        self.assertIsNone(find_license("mit-ai lab release"))
+
+        handler = ModelHandler("https://huggingface.co/google/gemma-3-270m")
+        self.assertEqual(handler._parse_license_from_text("Submit results within the limit"), 0.0)
+
+    def test_license_text_prefers_accepted_license(self):
+        """Test 76: An accepted license wins over a non-accepted one mentioned earlier in the text"""
+        readme = "The weights are released under openrail.\nThe training code is under the MIT License."
+        self.assertEqual(find_license(readme), "MIT")
+        self.assertEqual(find_license("cc-by-nc-4.0, see also agpl-3.0"), "CC-BY-NC-4.0")
+
+        handler = ModelHandler("https://huggingface.co/google/gemma-3-270m")
+        self.assertEqual(handler._parse_license_from_text(readme), 1.0)
+
+    def test_license_identifier_normalization(self):
+        """Test 44: License identifiers are normalized to SPDX IDs"""
+        self.assertEqual(normalize_license(" Apache-2.0 "), "Apache-2.0")
+        self.assertEqual(normalize_license("bsd-3-clause"), "BSD-3-Clause")
+        self.assertIsNone(normalize_license("other"))
+        self.assertEqual(license_score(normalize_license("cc-by-nc-4.0")), 0.0)
+        self.assertEqual(license_score(normalize_license("gplv3")), 1.0)
+
+    def test_model_card_parsing(self):
+        """Test 45: Model cards are parsed into frontmatter, sections, code blocks and tables"""
+        if model_card.yaml is None:
+            self.skipTest("PyYAML is not installed")
+        card = parse_model_card(
+            "---\nlicense: apache-2.0\ndatasets:\n- squad\nmodel-index:\n- name: m\n  results:\n"
+            "  - task: {type: question-answering}\n    dataset: {name: SQuAD, type: squad}\n"
+            "    metrics:\n    - {type: f1, value: 88.5}\n---\n"
+            "# Model\nIntro\n## Usage\n```python\n# not a heading\nmodel()\n```\n"
+            "## Results\n| task | f1 |\n|------|----|\n| qa | 88.5 |\n"
+        )
+
+        self.assertEqual(card.license, "apache-2.0")
+        self.assertEqual(card.datasets, ["squad"])
+        self.assertEqual(card.eval_results, [{"task": "question-answering", "dataset": "SQuAD", "metric": "f1", "value": 88.5}])
+        self.assertEqual([(s["level"], s["title"]) for s in card.sections], [(1, "Model"), (2, "Usage"), (2, "Results")])
+        self.assertIn("model()", card.section("usage"))
+        self.assertEqual((card.code_blocks, card.tables), (1, 1))
+        self.assertTrue(card.has_keyword("usage"))
+
+    @patch('requests.get')
+    def test_benchmarks_from_model_index(self, mock_get):
+        """Test 46: model-index results count as benchmarks without any benchmark keywords"""
+        if model_card.yaml is None:
+            self.skipTest("PyYAML is not installed")
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.text = "---\nmodel-index:\n- name: m\n  results:\n  - task: {type: qa}\n    values:\n    - {type: f1, value: 1}\n---\n"
+        mock_get.return_value = mock_response
+        handler = ModelHandler("https://huggingface.co/google/gemma-3-270m")
+        self.assertFalse(handler.has_performance_benchmarks())
+
+        mock_response.text = "---\nmodel-index:\n- name: m\n  results:\n  - task: {type: qa}\n    metrics:\n    - {type: f1, value: 1}\n---\n"
+        handler = ModelHandler("https://huggingface.co/google/gemma-3-270m")
+        self.assertTrue(handler.has_performance_benchmarks())
+
+
+    def test_revision_pinned_fetches(self):
+        """Test 60: A /tree/<rev> URL resolves to a commit SHA; files fetched at the SHA are cached for good"""
+        with tempfile.TemporaryDirectory() as temp_dir, MockHubServer() as server, \
+                patch.dict(os.environ, {"HF_ENDPOINT": server.url, "HTTP_CACHE_DIR": temp_dir, "HTTP_CACHE_TTL": "0"}):
+            handler = ModelHandler("https://hf.co/google/gemma-3-270m/tree/v1.0")
+            sha = handler.get_revision_sha()
+            handler.get_model_files()
+            handler.get_readme()
+
+            # Branch and tag lookups expire with the TTL; SHA-addressed responses do not
+            again = ModelHandler("https://huggingface.co/google/gemma-3-270m/tree/v1.0")
+            again.get_model_files()
+            again.get_readme()
+            counts = dict(server.request_counts)
+
+        self.assertEqual((handler.model_id, handler.revision), ("google/gemma-3-270m", "v1.0"))
+        self.assertTrue(ModelHandler.is_commit_sha(sha))
+        self.assertEqual(counts, {
+            "/api/models/{id}/revision/{rev}": 2,
+            "/api/models/{id}/tree/{rev}": 1,
+            "/{id}/raw/{rev}/README.md": 1,
+        })
+        self.assertIsNone(DatasetHandler("https://huggingface.co/datasets/squad").revision)
+
+    def test_revision_parsing_after_repo_id(self):
+        """Test 73: Orgs named like revision markers are part of the repo id; refs/pr/<n> revisions are kept whole"""
+        cases = {
+            "https://huggingface.co/tree/gemma/blob/main/README.md": ("tree/gemma", "main"),
+            "https://huggingface.co/resolve/tree/tree/v1.0": ("resolve/tree", "v1.0"),
+            "https://huggingface.co/google/gemma-3-270m/tree/refs/pr/3": ("google/gemma-3-270m", "refs/pr/3"),
+            "https://huggingface.co/google/gemma-3-270m/blob/refs/pr/3/config.json": ("google/gemma-3-270m", "refs/pr/3"),
+            "https://huggingface.co/google/gemma-3-270m/tree/refs%2Fpr%2F3": ("google/gemma-3-270m", "refs/pr/3"),
+        }
+        for url, expected in cases.items():
+            with self.subTest(url=url):
+                handler = ModelHandler(url)
+                self.assertEqual((handler.model_id, handler.revision), expected)
+
+        dataset = DatasetHandler("https://huggingface.co/datasets/blob/AgentNet/resolve/refs/convert/parquet/data.parquet")
+        self.assertEqual((dataset.dataset_id, dataset.revision), ("blob/AgentNet", "refs/convert/parquet"))
+
+    def test_dataset_revision_sha(self):
+        """Test 81: Dataset revisions resolve to a commit SHA through the shared API lookup; code has none"""
+        with MockHubServer() as server, patch.dict(os.environ, {"HF_ENDPOINT": server.url}):
+            pinned = DatasetHandler("https://huggingface.co/datasets/bookcorpus/bookcorpus/tree/v2")
+            default = DatasetHandler("https://huggingface.co/datasets/bookcorpus")
+            shas = (pinned.get_revision_sha(), default.get_revision_sha())
+            counts = dict(server.request_counts)
+
+        self.assertTrue(all(DatasetHandler.is_commit_sha(sha) for sha in shas))
+        self.assertNotEqual(*shas)
+        self.assertEqual(counts, {"/api/datasets/{id}/revision/{rev}": 1, "/api/datasets/{id}": 1})
+        self.assertIsNone(CodeHandler("https://github.com/google-research/bert").get_revision_sha())
+
 
 class TestMetrics(unittest.TestCase):
     """Test metric calculation functionality"""
@@ -274,14 +465,36 @@ class TestModelEvaluator(unittest.TestCase):
                 self.assertIsInstance(results, list)
                 # Should have exactly one result (for the model URL)
                 if results:  # Only check if we got results (API calls might fail)
-                    self.assertIsInstance(results[0], dict)
+                    self.assertIsInstance(results[0], EvaluationResult)
                     self.assertIn("name", results[0])
                     self.assertIn("category", results[0])
                     self.assertEqual(results[0]["category"], "MODEL")
+                    self.assertEqual(results[0].to_dict()["category"], "MODEL")
 
         finally:
             os.unlink(temp_filename)
 
+    def test_compact_results_and_handler_payloads(self):
+        """Test 61: Results are slotted records serialized at the boundary; handlers keep only used API fields"""
+        names = ("license", "size_score")
+        result = EvaluationResult("gemma", 0.5, 12, names, (1.0, {"pc": 0.9}), (3, 4))
+        record = result.to_dict()
+
+        self.assertFalse(hasattr(result, "__dict__"))
+        self.assertEqual(list(record), ["name", "category", "net_score", "net_score_latency",
+                                        "license", "license_latency", "size_score", "size_score_latency"])
+        self.assertEqual((result["size_score_latency"], result.get("bus_factor")), (4, None))
+        self.assertEqual(EvaluationResult.from_dict(json.loads(json.dumps(record))), result)
+
+        payload = {"downloads": 5000, "tags": ["a", "b", "c"], "cardData": {"dataset_info": {"features": []}},
+                   "siblings": [{"rfilename": f"part-{i}.parquet"} for i in range(1000)], "gated": False}
+        with patch('requests.get', return_value=Mock(status_code=200, json=Mock(return_value=payload))):
+            handler = DatasetHandler("https://huggingface.co/datasets/xlangai/AgentNet")
+            cached = handler.get_huggingface_api_data()
+
+        self.assertEqual(cached, {"downloads": 5000, "tags": ["a", "b", "c"], "cardData": True, "siblings": 1000})
+        self.assertAlmostEqual(handler.get_quality_score(), 1.0)
+
     def test_setup_logging_silent(self):
         """Test 23: Logging setup with silent level"""
         with patch.dict(os.environ, {'LOG_LEVEL': '0'}):
@@ -303,5 +516,1095 @@ class TestModelEvaluator(unittest.TestCase):
                 os.unlink(temp_log_file)
 
 
+class TestFetchPlanner(unittest.TestCase):
+    """Test the shared fetch phase that runs before metric scoring"""
+
+    def test_plan_deduplicates_artifacts(self):
+        """Test 34: Artifacts shared by several metrics are planned once"""
+        model = ModelHandler("https://huggingface.co/google/gemma-3-270m")
+        code = CodeHandler("https://github.com/SkyworkAI/Matrix-Game")
+        resources = {URLType.MODEL: [model], URLType.CODE: [code]}
+        metrics = [LicenseMetric(), RampUpTimeMetric(), PerformanceClaimsMetric(), CodeQualityMetric()]
+
+        plan = FetchPlanner().plan(metrics, resources)
+
+        self.assertCountEqual(
+            [(handler.url, name) for handler, name in plan],
+            [(model.url, "readme"), (code.url, "repo_info"), (code.url, "code_search")]
+        )
+
+    @patch('requests.get')
+    def test_each_endpoint_fetched_once_per_evaluation(self, mock_get):
+        """Test 35: A full evaluation requests each artifact exactly once"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.text = "---\nlicense: mit\n---\n# Usage example"
+        mock_response.json.return_value = {"downloads": 1000, "likes": 50}
+        mock_get.return_value = mock_response
+
+        results = ModelEvaluator().evaluate_urls([
+            "https://huggingface.co/google/gemma-3-270m",
+            "https://github.com/SkyworkAI/Matrix-Game"
+        ])
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["license"], 1.0)
+        requested = [call.args[0] for call in mock_get.call_args_list]
+        self.assertEqual(len(requested), len(set(requested)))
+        self.assertEqual(len(requested), 6)
+
+
+class TestMetricRegistry(unittest.TestCase):
+    """Test metric plugins and selective execution"""
+
+    def test_load_config_registers_plugin(self):
+        """Test 36: Metrics listed in a config file are registered"""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as f:
+            f.write('{"metrics": {"model_license": "metrics.license_metric:LicenseMetric"}}')
+            config_path = f.name
+
+        try:
+            registry = MetricRegistry(METRIC_CLASSES)
+            registry.load_config(config_path)
+            self.assertIn("model_license", registry.names())
+            self.assertIsInstance(registry.create(["model_license"])["model_license"], LicenseMetric)
+            with self.assertRaises(ValueError):
+                registry.create(["no_such_metric"])
+        finally:
+            os.unlink(config_path)
+
+    @patch('requests.get')
+    def test_selected_metrics_skip_other_fetches(self, mock_get):
+        """Test 37: Only the selected metrics run and fetch data"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.text = "---\nlicense: apache-2.0\n---\n"
+        mock_response.json.return_value = [{"size": 1024}]
+        mock_get.return_value = mock_response
+
+        evaluator = ModelEvaluator(metrics=["license", "size_score"])
+        results = evaluator.evaluate_urls([
+            "https://huggingface.co/google/gemma-3-270m",
+            "https://github.com/SkyworkAI/Matrix-Game"
+        ])
+
+        self.assertEqual(set(evaluator.metrics), {"license", "size_score"})
+        self.assertNotIn("bus_factor", results[0])
+        self.assertEqual(results[0]["license"], 1.0)
+        requested = [call.args[0] for call in mock_get.call_args_list]
+        self.assertFalse(any("api.github.com" in url for url in requested))
+        # Model info (to resolve the revision SHA), file tree and README
+        self.assertEqual(len(requested), 3)
+
+
+    def test_plugin_metric_required_fields_are_kept(self):
+        """Test 72: Payload fields a plugin metric declares in required_fields() survive field trimming"""
+        class ForksMetric(BaseMetric):
+            def required_url_types(self):
+                return [URLType.CODE]
+
+            def required_artifacts(self):
+                return {URLType.CODE: ["repo_info"]}
+
+            def required_fields(self):
+                return {URLType.CODE: {"repo_info": ["forks_count"]}, URLType.DATASET: {"no_such_artifact": ["x"]}}
+
+            def calculate(self, resources):
+                return 0.0, 0
+
+        registry = MetricRegistry(METRIC_CLASSES)
+        registry.register("forks", ForksMetric)
+        payload = {"description": "demo", "forks_count": 12, "watchers_count": 3}
+
+        with patch.object(CodeHandler, "_requested_fields", {}), \
+                patch('model_evaluator.get_metric_registry', return_value=registry), \
+                patch('requests.get', return_value=Mock(status_code=200, json=Mock(return_value=payload))):
+            with self.assertLogs('model_evaluator', level='ERROR'):
+                ModelEvaluator(metrics=["forks"])
+            kept = CodeHandler("https://github.com/SkyworkAI/Matrix-Game").get_github_api_data()
+
+        self.assertEqual(kept, {"description": "demo", "forks_count": 12})
+        self.assertNotIn("_requested_fields", CodeHandler.__dict__)
+
+
+class TestScoring(unittest.TestCase):
+    """Test weight profiles and offline re-scoring of stored metric values"""
+
+    def setUp(self):
+        self.db_dir = tempfile.mkdtemp()
+        self.store = MetricStore(os.path.join(self.db_dir, "metrics.db"))
+        self.result = {
+            "name": "bert-base-uncased", "category": "MODEL",
+            "net_score": 0.0, "net_score_latency": 10,
+            "license": 1.0, "license_latency": 5,
+            "size_score": {"raspberry_pi": 0.0, "desktop_pc": 1.0}, "size_score_latency": 5,
+            "code_quality": 0.4, "code_quality_latency": 5
+        }
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.db_dir, ignore_errors=True)
+
+    def test_rescore_matches_evaluator_net_score(self):
+        """Test 38: SQL re-scoring reproduces the evaluator's net score for each profile"""
+        self.store.add_results([self.result, dict(self.result, name="other", license=0.0)])
+        metric_results = {
+            "license": {"score": 1.0, "latency": 5},
+            "size_score": {"score": {"raspberry_pi": 0.0, "desktop_pc": 1.0}, "latency": 5},
+            "code_quality": {"score": 0.4, "latency": 5}
+        }
+
+        for profile in WEIGHT_PROFILES:
+            weights = get_weights(profile)
+            expected, _ = ModelEvaluator(weights=weights)._calculate_net_score(metric_results)
+            rescored = self.store.rescore(weights)
+            self.assertEqual([name for name, _ in rescored], ["bert-base-uncased", "other"])
+            self.assertAlmostEqual(rescored[0][1], expected)
+
+    def test_metric_table_matches_sql_rescore(self):
+        """Test 40: Vectorized re-scoring agrees with the SQL aggregate"""
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            self.skipTest("NumPy not installed")
+
+        self.store.add_results([self.result, {"name": "bare", "category": "MODEL", "license": 0.5}])
+        table = self.store.load_table()
+
+        for profile in WEIGHT_PROFILES:
+            weights = get_weights(profile)
+            expected = [score for _, score in self.store.rescore(weights)]
+            for actual, wanted in zip(table.rescore(weights), expected):
+                self.assertAlmostEqual(actual, wanted)
+
+    def test_store_batches_writes_and_normalizes_names(self):
+        """Test 79: Streamed results are stored in batches; plugin metric names become valid columns"""
+        db_path = os.path.join(self.db_dir, "batched.db")
+        store = MetricStore(db_path, batch_size=2)
+        for i in range(3):
+            store.write({"name": f"m{i}", "category": "MODEL", "My-Metric": 1.0, "2x speed": 0.5, "license": 0.0})
+
+        reader = sqlite3.connect(db_path)
+        try:
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM metric_values").fetchone(), (2,))
+            store.close()
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM metric_values").fetchone(), (3,))
+        finally:
+            reader.close()
+
+        store = MetricStore(db_path)
+        try:
+            self.assertTrue({"my_metric", "_2x_speed"} <= store._columns)
+            self.assertEqual(store.rescore({"My-Metric": 1.0, "license": 1.0})[0], ("m0", 0.5))
+        finally:
+            store.close()
+
+    def test_unknown_profile_rejected(self):
+        """Test 41: Unknown scoring profiles raise ValueError"""
+        with self.assertRaises(ValueError):
+            get_weights("no_such_profile")
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test per-endpoint HTTP instrumentation"""
+
+    def setUp(self):
+        INSTRUMENTATION.reset()
+
+    @patch.dict(os.environ, {"HTTP_MAX_RETRIES": "1", "HTTP_RETRY_BACKOFF": "0"})
+    @patch('requests.get')
+    def test_requests_are_recorded_per_endpoint(self, mock_get):
+        """Test 47: Requests, retries, bytes and cache hits are recorded per endpoint template"""
+        busy = Mock(status_code=503, content=b"")
+        ok = Mock(status_code=200, content=b'{"downloads": 5}')
+        ok.json.return_value = {"downloads": 5}
+        mock_get.side_effect = [busy, ok]
+
+        handler = ModelHandler("https://huggingface.co/google/gemma-3-270m")
+        handler.get_huggingface_api_data()
+        handler.get_huggingface_api_data()
+
+        snapshot = INSTRUMENTATION.snapshot()
+        stats = snapshot["http"]["/api/models/{id}"]
+        self.assertEqual((stats["requests"], stats["retries"], stats["bytes"]), (1, 1, 16))
+        self.assertEqual(stats["status_codes"], {"200": 1})
+        self.assertEqual(snapshot["caches"]["hf_api_data"]["hit_ratio"], 0.5)
+
+    def test_prometheus_exposition(self):
+        """Test 48: Counters render as Prometheus text with cumulative histogram buckets"""
+        INSTRUMENTATION.record_request("/repos/{repo}", 200, 0.02, response_bytes=100)
+        INSTRUMENTATION.record_request("/repos/{repo}", None, 20.0)
+
+        text = INSTRUMENTATION.to_prometheus()
+
+        self.assertIn('http_client_requests_total{endpoint="/repos/{repo}",status="200"} 1', text)
+        self.assertIn('http_client_requests_total{endpoint="/repos/{repo}",status="error"} 1', text)
+        self.assertIn('http_client_request_duration_seconds_bucket{endpoint="/repos/{repo}",le="0.025"} 1', text)
+        self.assertIn('http_client_request_duration_seconds_bucket{endpoint="/repos/{repo}",le="+Inf"} 2', text)
+        self.assertIn('http_client_response_bytes_total{endpoint="/repos/{repo}"} 100', text)
+
+    def test_prometheus_skips_empty_families(self):
+        """Test 78: A process that only looked up the result cache exports only the cache families"""
+        INSTRUMENTATION.record_cache("result_cache", True)
+
+        text = INSTRUMENTATION.to_prometheus()
+
+        self.assertIn('cache_requests_total{cache="result_cache",result="hit"} 1', text)
+        self.assertIn('cache_hit_ratio{cache="result_cache"} 1.0', text)
+        self.assertNotIn("http_client", text)
+
+
+class TestProfiling(unittest.TestCase):
+    """Test the --profile mode"""
+
+    def test_profile_run_writes_per_phase_outputs(self):
+        """Test 49: Profiling writes pstats, phase-rooted collapsed stacks and phase timings"""
+        def busy(seconds):
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                pass
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            prefix = os.path.join(temp_dir, "run")
+            with patch('sys.stderr'), profile_run(prefix, sample_interval=0.001):
+                with phase("scoring"):
+                    busy(0.05)
+                with phase("fetch"):
+                    worker = threading.Thread(target=busy, args=(0.05,))
+                    worker.start()
+                    worker.join()
+
+            stats = pstats.Stats(prefix + ".pstats")
+            with open(prefix + ".collapsed") as f:
+                stacks = f.read().splitlines()
+            with open(prefix + ".phases.json") as f:
+                phases = json.load(f)
+
+        profiled_functions = {function for _, _, function in stats.stats}
+        self.assertIn("busy", profiled_functions)
+        self.assertTrue(any(line.startswith("phase:scoring;") for line in stacks))
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in stacks))
+        self.assertEqual(phases["scoring"]["calls"], 1)
+        self.assertGreater(phases["fetch"]["wall_seconds"], 0.04)
+        self.assertGreater(phases["fetch"]["samples"], 0)
+
+
+    def test_phases_are_tracked_per_thread(self):
+        """Test 74: Concurrent threads in different phases get their own samples and phase totals"""
+        def spin_scoring(seconds):
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                pass
+
+        def spin_fetch(seconds):
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                pass
+
+        def in_phase(name, work):
+            with phase(name):
+                work(0.1)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            prefix = os.path.join(temp_dir, "run")
+            with patch('sys.stderr'), profile_run(prefix, sample_interval=0.001):
+                threads = [threading.Thread(target=in_phase, args=("scoring", spin_scoring)),
+                           threading.Thread(target=in_phase, args=("fetch", spin_fetch))]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+            with open(prefix + ".collapsed") as f:
+                stacks = f.read().splitlines()
+            with open(prefix + ".phases.json") as f:
+                phases = json.load(f)
+
+        scoring_stacks = [line for line in stacks if "spin_scoring" in line]
+        fetch_stacks = [line for line in stacks if "spin_fetch" in line]
+        self.assertTrue(scoring_stacks and fetch_stacks)
+        self.assertTrue(all(line.startswith("phase:scoring;") for line in scoring_stacks))
+        self.assertTrue(all(line.startswith("phase:fetch;") for line in fetch_stacks))
+        self.assertEqual((phases["scoring"]["calls"], phases["fetch"]["calls"]), (1, 1))
+        self.assertLessEqual(phases["scoring"]["cpu_seconds"], phases["scoring"]["wall_seconds"] + 0.01)
+
+class TestBenchmarkHarness(unittest.TestCase):
+    """Test the offline benchmark harness and mock hub"""
+
+    def test_benchmark_against_mock_hub(self):
+        """Test 50: A benchmark run is served by the mock hub with a fixed request budget per model"""
+        with MockHubServer() as server, \
+                patch.dict(os.environ, {"HF_ENDPOINT": server.url, "GITHUB_API_URL": server.url}):
+            report = run_benchmark(3, server, max_workers=2)
+
+        self.assertEqual(report["models"], 3)
+        self.assertEqual(report["requests_per_model"], 7.0)
+        self.assertEqual(report["responses_by_status"], {"200": 21})
+        self.assertNotIn("unmatched", report["requests_by_endpoint"])
+        self.assertLessEqual(report["latency_ms"]["p50"], report["latency_ms"]["p99"])
+
+
+class TestHTTPCassette(unittest.TestCase):
+    """Test record/replay of handler HTTP exchanges"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "run.jsonl.gz")
+
+    def tearDown(self):
+        close_cassettes()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _handler_data(self, mode):
+        with patch.dict(os.environ, {"HTTP_CASSETTE_MODE": mode, "HTTP_CASSETTE": self.path}):
+            handler = ModelHandler("https://huggingface.co/google/gemma-3-270m")
+            return handler.get_huggingface_api_data(), handler.get_readme()
+
+    @patch('requests.get')
+    def test_record_then_replay(self, mock_get):
+        """Test 51: Recorded responses are replayed without touching the network"""
+        mock_get.return_value = Mock(status_code=200, content=b'{"downloads": 42}', text='{"downloads": 42}', headers={})
+        mock_get.return_value.json.return_value = {"downloads": 42}
+        recorded = self._handler_data("record")
+        close_cassettes()
+
+        mock_get.reset_mock()
+        mock_get.side_effect = AssertionError("network used during replay")
+        replayed = self._handler_data("replay")
+
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(replayed[0], {"downloads": 42})
+        mock_get.assert_not_called()
+
+    @patch('requests.get')
+    def test_replay_miss_fails_or_falls_through(self, mock_get):
+        """Test 52: A replay miss fails in strict mode and goes live in replay-or-live mode"""
+        mock_get.return_value = Mock(status_code=200, content=b'{"likes": 7}', headers={})
+        mock_get.return_value.json.return_value = {"likes": 7}
+
+        self.assertEqual(self._handler_data("replay")[0], {})
+        mock_get.assert_not_called()
+
+        self.assertEqual(self._handler_data("replay-or-live")[0], {"likes": 7})
+        self.assertTrue(mock_get.called)
+
+    def test_strict_replay_with_missing_responses_fails_the_run(self):
+        """Test 67: A strict replay in which every request misses exits nonzero without printing scores"""
+        url_file = os.path.join(self.temp_dir, "urls.txt")
+        write_url_file(url_file, 2)
+        env = dict(os.environ, HTTP_CASSETTE_MODE="replay", HTTP_CASSETTE=self.path)
+        run_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "run")
+
+        completed = subprocess.run([sys.executable, run_script, url_file], env=env, capture_output=True, text=True)
+
+        self.assertEqual(completed.returncode, 1)
+        self.assertNotIn('"net_score"', completed.stdout)
+        self.assertIn("not found in cassette", completed.stdout)
+
+
+    def test_sink_errors_are_not_swallowed(self):
+        """Test 80: Errors raised by a sink propagate out of evaluate_from_file; unreadable files return no results"""
+        url_file = os.path.join(self.temp_dir, "urls.txt")
+        with open(url_file, "w") as f:
+            f.write("https://huggingface.co/org/m1\n")
+        evaluator = ModelEvaluator()
+        result = EvaluationResult("m1", 0.5, 1, ("license",), (1.0,), (2,))
+
+        with patch.object(ModelEvaluator, "evaluate_urls", return_value=[result]):
+            for error in (CassetteMissError("2 requests missed"), RuntimeError("sink failed")):
+                with self.subTest(error=type(error).__name__), self.assertRaises(type(error)):
+                    evaluator.evaluate_from_file(url_file, sink=Mock(side_effect=error))
+
+        corrupt = os.path.join(self.temp_dir, "urls.gz")
+        with open(corrupt, "wb") as f:
+            f.write(gzip.compress(b"https://huggingface.co/org/m1\n")[:12])
+        with self.assertLogs("model_evaluator", level="ERROR"):
+            self.assertEqual(evaluator.evaluate_from_file(corrupt), [])
+
+class TestSharding(unittest.TestCase):
+    """Test multi-process sharded evaluation and the shared HTTP cache"""
+
+    def test_sharded_run_matches_line_order(self):
+        """Test 53: A sharded run emits the same models, in line order, as a single process"""
+        with tempfile.TemporaryDirectory() as temp_dir, MockHubServer() as server, \
+                patch.dict(os.environ, {"HF_ENDPOINT": server.url, "GITHUB_API_URL": server.url}):
+            url_file = os.path.join(temp_dir, "urls.txt")
+            write_url_file(url_file, 7)
+
+            sharded = []
+            count = evaluate_sharded(url_file, 3, sharded.append)
+            single = ModelEvaluator().evaluate_from_file(url_file)
+
+        self.assertEqual(count, 7)
+        self.assertEqual([r["name"] for r in sharded], [f"model-{i}" for i in range(7)])
+        self.assertEqual([r["net_score"] for r in sharded], [r["net_score"] for r in single])
+
+    def test_sharded_recording_and_stats(self):
+        """Test 66: Sharded workers record a replayable cassette and report their request counters"""
+        with tempfile.TemporaryDirectory() as temp_dir, MockHubServer() as server:
+            url_file = os.path.join(temp_dir, "urls.txt")
+            cassette_path = os.path.join(temp_dir, "cassette.jsonl.gz")
+            write_url_file(url_file, 5)
+            env = {"HF_ENDPOINT": server.url, "GITHUB_API_URL": server.url,
+                   "HTTP_CASSETTE": cassette_path, "HTTP_CASSETTE_MODE": "record"}
+
+            INSTRUMENTATION.reset()
+            with patch.dict(os.environ, env):
+                recorded = []
+                evaluate_sharded(url_file, 2, recorded.append)
+            http_stats = INSTRUMENTATION.snapshot()["http"]
+            live_requests = server.total_requests()
+
+            with patch.dict(os.environ, dict(env, HTTP_CASSETTE_MODE="replay")):
+                replayed = ModelEvaluator().evaluate_from_file(url_file)
+                close_cassettes()
+
+        self.assertEqual(sum(stats["requests"] for stats in http_stats.values()), 35)
+        self.assertEqual(server.total_requests(), live_requests)
+        self.assertEqual([(r.name, r.scores) for r in replayed], [(r.name, r.scores) for r in recorded])
+
+    @patch('requests.get')
+    def test_http_cache_and_rate_limiter(self, mock_get):
+        """Test 54: Responses cached on disk are shared by new handlers; rate limit buckets are shared"""
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"downloads": 3}'
+        mock_get.return_value = response
+
+        with tempfile.TemporaryDirectory() as temp_dir, patch.dict(os.environ, {"HTTP_CACHE_DIR": temp_dir}):
+            first = ModelHandler("https://huggingface.co/google/gemma-3-270m").get_huggingface_api_data()
+            second = ModelHandler("https://huggingface.co/google/gemma-3-270m").get_huggingface_api_data()
+
+            limiter = RateLimiter(os.path.join(temp_dir, "rate_limit.db"), rate=50, burst=2)
+            other_process_view = RateLimiter(limiter.db_path, rate=50, burst=2)
+            waits = [limiter.acquire("huggingface.co"), other_process_view.acquire("huggingface.co"),
+                     limiter.acquire("huggingface.co")]
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertGreater(waits[2], 0.0)
+
+
+class TestWorkQueue(unittest.TestCase):
+    """Test the shared work queue used by distributed workers"""
+
+    def test_lease_retry_and_result_order(self):
+        """Test 55: Expired leases are taken over, failures are retried up to max_attempts, results stay in line order"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            queue = WorkQueue(os.path.join(temp_dir, "queue.db"), visibility_timeout=60, max_attempts=2)
+            self.assertEqual(queue.enqueue([(1, ["a"]), (2, ["b"]), (3, ["c"])]), 3)
+
+            # worker-1 hangs: once its lease expires, worker-3 picks up the task
+            queue.visibility_timeout = -1
+            first = queue.lease("worker-1")
+            queue.visibility_timeout = 60
+            taken_over = queue.lease("worker-3")
+            second = queue.lease("worker-2")
+            self.assertEqual((taken_over["id"], taken_over["attempts"]), (first["id"], 2))
+            self.assertEqual(second["line"], 2)
+            self.assertFalse(queue.complete(first["id"], "worker-1", [{"name": "stale"}]))
+            self.assertTrue(queue.complete(first["id"], "worker-3", [{"name": "a"}]))
+
+            # Line 2 fails once and is retried; line 3 fails on every attempt
+            queue.fail(second["id"], "worker-2", "timeout")
+            retried = queue.lease("worker-2")
+            self.assertEqual(retried["line"], 2)
+            self.assertTrue(queue.complete(retried["id"], "worker-2", [{"name": "b1"}, {"name": "b2"}]))
+            for _ in range(2):
+                task = queue.lease("worker-1")
+                queue.fail(task["id"], "worker-1", "HTTP 500")
+
+            self.assertIsNone(queue.lease("worker-1"))
+            self.assertEqual(queue.stats(), {"queued": 0, "leased": 0, "done": 2, "failed": 1})
+            self.assertEqual([r["name"] for r in queue.iter_results()], ["a", "b1", "b2"])
+
+    def test_workers_drain_queue(self):
+        """Test 56: Concurrent workers drain the queue and every line is evaluated exactly once"""
+        with tempfile.TemporaryDirectory() as temp_dir, MockHubServer() as server, \
+                patch.dict(os.environ, {"HF_ENDPOINT": server.url, "GITHUB_API_URL": server.url}):
+            url_file = os.path.join(temp_dir, "urls.txt")
+            write_url_file(url_file, 6)
+            queue = WorkQueue(os.path.join(temp_dir, "queue.db"))
+            queue.enqueue(read_url_groups(url_file))
+
+            completed = []
+            workers = [
+                threading.Thread(target=lambda name=name: completed.append(
+                    run_worker(ModelEvaluator(), queue, worker_id=name, poll_interval=0.01)))
+                for name in ("node-a", "node-b")
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+        self.assertEqual(sum(completed), 6)
+        self.assertEqual([r["name"] for r in queue.iter_results()], [f"model-{i}" for i in range(6)])
+
+
+    def test_heartbeat_failures_and_idempotent_enqueue(self):
+        """Test 70: Slow groups keep their lease, failing groups are retried, re-enqueueing is a no-op"""
+        class SlowEvaluator:
+            def evaluate_urls(self, urls, strict=False):
+                if "broken" in urls:
+                    raise RuntimeError("Evaluation of broken failed")
+                time.sleep(0.5)
+                return [EvaluationResult(urls[0], 1.0, 0, (), (), ())]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            queue = WorkQueue(os.path.join(temp_dir, "queue.db"), visibility_timeout=0.2, max_attempts=2)
+            groups = [(1, ["slow"]), (2, ["broken"])]
+            self.assertEqual(queue.enqueue(groups, source="/data/urls.txt"), 2)
+            self.assertEqual(queue.enqueue(groups, source="/data/urls.txt"), 0)
+
+            completed = run_worker(SlowEvaluator(), queue, worker_id="node-a", poll_interval=0.01)
+
+            self.assertEqual(completed, 1)
+            self.assertEqual(queue.stats(), {"queued": 0, "leased": 0, "done": 1, "failed": 1})
+            self.assertEqual([r["name"] for r in queue.iter_results()], ["slow"])
+
+    def test_local_connections(self):
+        """Test 82: Shared SQLite connections are per thread, set up with the pragmas and reopened after a fork"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            connections = LocalConnections(os.path.join(temp_dir, "test.db"), pragmas=("journal_mode=WAL",))
+            conn = connections.get()
+            self.assertIs(connections.get(), conn)
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+            other = []
+            thread = threading.Thread(target=lambda: other.append(connections.get()))
+            thread.start()
+            thread.join()
+            self.assertIsNot(other[0], conn)
+
+            with patch('os.getpid', return_value=os.getpid() + 1):
+                self.assertIsNot(connections.get(), conn)
+
+
+class TestURLInput(unittest.TestCase):
+    """Test the streaming URL file reader"""
+
+    def test_compressed_input_is_validated_and_canonicalized(self):
+        """Test 57: Gzip input is streamed; URLs are canonicalized and invalid ones dropped"""
+        lines = [
+            "HTTPS://HuggingFace.co/google/Gemma-3-270m/#usage, not a url",
+            "",
+            "ftp://example.com/file,, https://github.com/SkyworkAI/Matrix-Game/",
+        ]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "urls.dump")
+            with gzip.open(path, "wt") as f:
+                f.write("\n".join(lines) + "\n")
+            groups = list(read_url_groups(path))
+
+        self.assertEqual(groups, [
+            (1, ["https://huggingface.co/google/Gemma-3-270m"]),
+            (3, ["https://github.com/SkyworkAI/Matrix-Game"]),
+        ])
+        self.assertIsNone(canonicalize_url("huggingface.co/google/gemma-3-270m"))
+        self.assertEqual(canonicalize_url("http://HF.co:8080/x?y=1"), "http://hf.co:8080/x?y=1")
+
+    def test_in_flight_window_keeps_line_order(self):
+        """Test 58: Lines evaluated concurrently are yielded in order with at most max_in_flight running"""
+        evaluator = ModelEvaluator(max_in_flight=3)
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def evaluate(urls):
+            with lock:
+                running.append(urls[0])
+                peak.append(len(running))
+            time.sleep(0.02 if urls[0].endswith("0") else 0.001)
+            with lock:
+                running.remove(urls[0])
+            return [{"name": urls[0]}]
+
+        with tempfile.TemporaryDirectory() as temp_dir, patch.object(evaluator, "evaluate_urls", side_effect=evaluate):
+            path = os.path.join(temp_dir, "urls.txt")
+            with open(path, "w") as f:
+                f.write("".join(f"https://huggingface.co/org/m{i}\n" for i in range(10)))
+            lines = [line_num for line_num, _ in evaluator.evaluate_lines(path)]
+
+        self.assertEqual(lines, list(range(1, 11)))
+        self.assertLessEqual(max(peak), 3)
+
+
+    def test_canonical_netloc_and_streaming_main(self):
+        """Test 75: IPv6 brackets and userinfo survive canonicalization; main() streams results to stdout"""
+        self.assertEqual(canonicalize_url("http://[FE80::1]:8080/x/"), "http://[fe80::1]:8080/x")
+        self.assertEqual(canonicalize_url("https://User:Pw@HF.co/org/m#a"), "https://User:Pw@hf.co/org/m")
+
+        def evaluate(urls):
+            return [EvaluationResult(urls[0].rsplit("/", 1)[1], 0.5, 1, ("license",), (1.0,), (2,))]
+
+        stdout = io.StringIO()
+        original = ModelEvaluator.evaluate_from_file
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                patch.object(ModelEvaluator, "evaluate_urls", side_effect=evaluate), \
+                patch.object(ModelEvaluator, "evaluate_from_file", autospec=True, side_effect=original) as spy, \
+                patch.object(ModelEvaluator, "setup_logging"), patch('sys.stdout', stdout):
+            path = os.path.join(temp_dir, "urls.txt")
+            with open(path, "w") as f:
+                f.write("https://huggingface.co/org/m1\nhttps://huggingface.co/org/m2\n")
+            with patch('sys.argv', ["model_evaluator.py", path, "--metrics", "license"]):
+                model_evaluator.main()
+
+        self.assertIsNotNone(spy.call_args.kwargs.get("sink"))
+        self.assertEqual([json.loads(line)["name"] for line in stdout.getvalue().splitlines()], ["m1", "m2"])
+
+class TestJSONBackend(unittest.TestCase):
+    """Test the pluggable JSON backend and buffered NDJSON output"""
+
+    def test_backends_agree_and_output_is_batched(self):
+        """Test 62: Backends encode typical records alike; NDJSON lines are written in batches"""
+        record = {"name": "bert-é", "net_score": 0.9175000000000001, "size_score": {"pc": 1.0}, "latency": 12}
+        encoded = json_backend.dumps(record)
+        self.assertEqual(encoded, json_backend._stdlib_dumps(record))
+        self.assertEqual(json_backend.loads(encoded), record)
+        with self.assertRaises(ValueError):
+            json_backend.loads(b"{not json")
+
+        stream = io.BytesIO()
+        writer = NDJSONWriter(stream, buffer_lines=2)
+        for index in range(3):
+            writer.write(dict(record, latency=index))
+        self.assertEqual(stream.getvalue().count(b"\n"), 2)
+        writer.close()
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual([json.loads(line)["latency"] for line in lines], [0, 1, 2])
+        self.assertEqual(writer.rows_written, 3)
+
+
+    def test_backends_agree_on_floats_and_non_finite_values(self):
+        """Test 71: Every installed backend decodes to the same floats and writes NaN/Infinity as null"""
+        record = {"small": 1e-7, "large": 1e16, "score": 0.1 + 0.2, "nan": float("nan"),
+                  "sizes": [float("inf"), -float("inf"), 2.5]}
+        expected = {"small": 1e-7, "large": 1e16, "score": 0.1 + 0.2, "nan": None, "sizes": [None, None, 2.5]}
+
+        for name in json_backend.JSON_BACKENDS:
+            backend, dumps, loads = json_backend._select_backend(name)
+            if backend != name:
+                continue  # not installed
+            with self.subTest(backend=name):
+                encoded = dumps(record)
+                self.assertEqual(json.loads(encoded), expected)
+                self.assertEqual(loads(encoded), expected)
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    """Test the per-host AIMD concurrency limiter"""
+
+    def setUp(self):
+        INSTRUMENTATION.reset()
+
+    def test_limit_grows_while_fast_and_is_cut_on_overload(self):
+        """Test 63: Limits rise on steady latency, halve on 429/5xx/spikes, and show in the metrics"""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1, max_limit=4)
+        host = "huggingface.co"
+
+        for _ in range(10):
+            slots = limiter.limit(host)
+            for _ in range(slots):
+                limiter.acquire(host)
+            for _ in range(slots):
+                limiter.release(host, 0.01, 200)
+        self.assertEqual(limiter.limit(host), 4)
+
+        limiter.acquire(host)
+        limiter.release(host, 0.01, 429)
+        self.assertEqual(limiter.limit(host), 2)
+        # Failures arriving within the same round trip cut only once
+        limiter.acquire(host)
+        limiter.release(host, 0.01, 503)
+        self.assertEqual(limiter.limit(host), 2)
+
+        other = "api.github.com"
+        limiter.acquire(other)
+        limiter.release(other, 0.01, 200)
+        for _ in range(10):
+            limiter.acquire(other)
+            limiter.release(other, 1.0, 200)
+        self.assertEqual(limiter.limit(other), 1)
+        self.assertEqual(limiter.snapshot()[other]["decreases"], 1)
+
+        snapshot = INSTRUMENTATION.snapshot()["concurrency"]
+        self.assertEqual(snapshot[host], {"limit": 2, "in_flight": 0})
+        self.assertIn('http_client_concurrency_limit{host="huggingface.co"} 2', INSTRUMENTATION.to_prometheus())
+
+    def test_acquire_blocks_at_the_limit(self):
+        """Test 64: Requests beyond the limit wait for a slot and handler GETs are bounded"""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1, max_limit=1)
+        limiter.acquire("example.com")
+        acquired = threading.Event()
+        waiter = threading.Thread(target=lambda: (limiter.acquire("example.com"), acquired.set()))
+        waiter.start()
+        self.assertFalse(acquired.wait(0.1))
+        limiter.release("example.com", 0.01, 200)
+        self.assertTrue(acquired.wait(2))
+        waiter.join()
+
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+        real_get = requests.get
+
+        def tracking_get(*args, **kwargs):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            try:
+                return real_get(*args, **kwargs)
+            finally:
+                with lock:
+                    in_flight[0] -= 1
+
+        with MockHubServer(latency_ms=20) as server, \
+                patch.dict(os.environ, {"HF_ENDPOINT": server.url, "HTTP_ADAPTIVE_CONCURRENCY": "1",
+                                        "HTTP_CONCURRENCY_INITIAL": "1", "HTTP_CONCURRENCY_MAX": "1"}), \
+                patch('handlers.base_resource_handler.requests.get', side_effect=tracking_get):
+            handlers = [ModelHandler(f"https://huggingface.co/org/model-{index}") for index in range(4)]
+            threads = [threading.Thread(target=handler.get_huggingface_api_data) for handler in handlers]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            total = server.total_requests()
+
+        self.assertEqual(total, 4)
+        self.assertEqual(peak[0], 1)
+
+    def test_mixed_endpoint_latencies_do_not_shrink_the_limit(self):
+        """Test 65: Endpoints with different but steady latencies are not mistaken for overload"""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=1, max_limit=8)
+        host = "huggingface.co"
+
+        for _ in range(30):
+            for endpoint, latency in (("/api/models/{id}", 0.05), ("/api/models/{id}/tree/{rev}", 0.2)):
+                slots = limiter.limit(host)
+                for _ in range(slots):
+                    limiter.acquire(host)
+                for _ in range(slots):
+                    limiter.release(host, latency, 200, endpoint)
+
+        stats = limiter.snapshot()[host]
+        self.assertEqual(stats["decreases"], 0)
+        self.assertEqual(limiter.limit(host), 8)
+        self.assertEqual(stats["endpoints"]["/api/models/{id}/tree/{rev}"]["baseline_seconds"], 0.2)
+
+
+class TestColumnarResultWriter(unittest.TestCase):
+    """Test Parquet export of evaluation results"""
+
+    def test_parquet_round_trip(self):
+        """Test 42: Results are written as typed, flattened Parquet row groups"""
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+
+        result = {
+            "name": "bert-base-uncased", "category": "MODEL",
+            "net_score": 0.8, "net_score_latency": 10,
+            "size_score": {"raspberry_pi": 0.0, "desktop_pc": 1.0}, "size_score_latency": 5
+        }
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "results.parquet")
+            with ColumnarResultWriter(path, "parquet", row_group_size=1) as writer:
+                writer.write(result)
+                writer.write(dict(result, name="gpt2"))
+
+            parquet_file = pq.ParquetFile(path)
+            table = parquet_file.read()
+
+        self.assertEqual(parquet_file.num_row_groups, 2)
+        self.assertEqual(table.column("name").to_pylist(), ["bert-base-uncased", "gpt2"])
+        self.assertEqual(table.column("size_score_desktop_pc").to_pylist(), [1.0, 1.0])
+        self.assertEqual(str(table.schema.field("net_score_latency").type), "int64")
+        self.assertEqual(str(table.schema.field("net_score").type), "double")
+
+
+    def test_schema_follows_the_selected_metrics(self):
+        """Test 69: The Parquet schema comes from the metrics' declared fields, not the first row"""
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+
+        score_fields = {"size_score": SizeScoreMetric().score_fields(), "license": None}
+        fallback = {
+            "name": "no-files", "category": "MODEL", "net_score": 0.1, "net_score_latency": 3,
+            "size_score": 0.0, "size_score_latency": 1, "license": "MIT", "license_latency": 2
+        }
+        full = dict(fallback, name="bert", size_score={"raspberry_pi": 0.5, "jetson_nano": 1.0,
+                                                       "desktop_pc": 1.0, "aws_server": 1.0},
+                    license=1.0, plugin_score=0.3)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "results.parquet")
+            with self.assertLogs("ColumnarResultWriter", level="WARNING") as logs:
+                with ColumnarResultWriter(path, "parquet", score_fields=score_fields) as writer:
+                    writer.write(fallback)
+                    writer.write(full)
+            table = pq.read_table(path)
+
+        self.assertEqual(table.column("size_score_raspberry_pi").to_pylist(), [0.0, 0.5])
+        self.assertEqual(table.column("license").to_pylist(), [None, 1.0])
+        self.assertIn("aws_server", " ".join(table.column_names))
+        self.assertTrue(any("plugin_score" in line for line in logs.output))
+
+class TestRepoCache(unittest.TestCase):
+    """Test the shallow clone cache used by the evaluation backend"""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.origin = os.path.join(self.work_dir, "origin")
+        os.makedirs(self.origin)
+        self._git("init", "-q")
+        self.repo_url = f"file://{self.origin}"
+        self.cache = RepoCache(os.path.join(self.work_dir, "cache"), max_bytes=10 * 1024 ** 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _git(self, *args):
+        subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"] + list(args),
+            cwd=self.origin, check=True, capture_output=True
+        )
+
+    def _commit(self, content):
+        with open(os.path.join(self.origin, "evaluate.py"), "w") as f:
+            f.write(content)
+        self._git("add", "evaluate.py")
+        self._git("commit", "-q", "-m", content)
+
+    def test_checkout_reuses_cached_clone(self):
+        """Test 25: Repeated checkouts of the same commit share one cache entry"""
+        self._commit("v1")
+        first = self.cache.checkout(self.repo_url, os.path.join(self.work_dir, "job1"))
+        second = self.cache.checkout(self.repo_url, os.path.join(self.work_dir, "job2"))
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.cache._entries()), 1)
+        with open(os.path.join(self.work_dir, "job2", "evaluate.py")) as f:
+            self.assertEqual(f.read(), "v1")
+        self.assertFalse(os.path.exists(os.path.join(self.work_dir, "job2", ".git")))
+
+    def test_new_commit_refreshes_and_evicts(self):
+        """Test 26: A new commit is fetched into a new entry and the quota evicts the old one"""
+        self._commit("v1")
+        first = self.cache.checkout(self.repo_url, os.path.join(self.work_dir, "job1"))
+        self._commit("v2")
+
+        self.cache.max_bytes = 0
+        second = self.cache.checkout(self.repo_url, os.path.join(self.work_dir, "job2"))
+
+        self.assertNotEqual(first, second)
+        entries = self.cache._entries()
+        self.assertEqual([e["commit"] for e in entries], [second])
+        with open(os.path.join(self.work_dir, "job2", "evaluate.py")) as f:
+            self.assertEqual(f.read(), "v2")
+
+    def test_key_locks_are_dropped_after_checkout(self):
+        """Test 77: Per-entry locks only exist while checkouts of the entry are running"""
+        self._commit("v1")
+        jobs = [threading.Thread(target=self.cache.checkout, args=(self.repo_url, os.path.join(self.work_dir, f"job{i}")))
+                for i in range(3)]
+        for job in jobs:
+            job.start()
+        for job in jobs:
+            job.join()
+        self._commit("v2")
+        self.cache.checkout(self.repo_url, os.path.join(self.work_dir, "job3"))
+
+        self.assertEqual(len(self.cache._entries()), 2)
+        self.assertEqual((self.cache._key_locks, self.cache._in_use), ({}, {}))
+
+    def test_option_like_urls_are_not_git_options(self):
+        """Test 83: A repository URL starting with "-" reaches git as a URL, never as an option"""
+        marker = os.path.join(self.work_dir, "marker")
+        url = f"--upload-pack=touch {marker}"
+        with self.assertRaises(RepoCacheError):
+            self.cache.resolve_commit(url)
+        with self.assertRaises(RepoCacheError):
+            self.cache.checkout(url, os.path.join(self.work_dir, "job1"), commit="0" * 40)
+        self.assertFalse(os.path.exists(marker))
+
+
+class TestResultCache(unittest.TestCase):
+    """Test result memoization in the evaluation backend"""
+
+    def test_concurrent_requests_share_one_computation(self):
+        """Test 27: Identical in-flight requests are coalesced"""
+        cache = ResultCache()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"accuracy": 0.9}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([value for value, _ in results], [{"accuracy": 0.9}] * 4)
+        self.assertEqual(cache.get_or_compute("key", compute), ({"accuracy": 0.9}, True))
+
+    def test_failures_are_not_cached(self):
+        """Test 28: A failed computation is retried on the next request"""
+        cache = ResultCache()
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute("key", Mock(side_effect=RuntimeError("boom")))
+
+        self.assertEqual(cache.get_or_compute("key", lambda: 1), (1, False))
+
+
+class TestEvaluateScript(unittest.TestCase):
+    """Test evaluate.py, the script the evaluation backend runs in model repositories"""
+
+    WORDS = ["good", "bad", "great", "awful", "fine", "movie", "plot", "acting"]
+    LABELS = ["neg", "pos"]
+    METRICS = ("accuracy", "precision", "recall", "f1_score")
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import evaluate
+            import torch
+            from tokenizers import Tokenizer, models, pre_tokenizers
+            from transformers import PreTrainedTokenizerFast, BertConfig, BertForSequenceClassification
+        except ImportError as e:
+            raise unittest.SkipTest(f"evaluate.py dependencies are not installed: {e}")
+        cls.evaluate = evaluate
+
+        # A tiny randomly initialised classifier saved the way evaluate.py loads it
+        cls.model_dir = tempfile.mkdtemp()
+        vocab = {"[PAD]": 0, "[UNK]": 1, **{word: i + 2 for i, word in enumerate(cls.WORDS)}}
+        backend = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+        backend.pre_tokenizer = pre_tokenizers.Whitespace()
+        cls.tokenizer = PreTrainedTokenizerFast(tokenizer_object=backend, pad_token="[PAD]", unk_token="[UNK]",
+                                                model_max_length=32)
+        torch.manual_seed(0)
+        config = BertConfig(vocab_size=len(vocab), hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+                            intermediate_size=32, id2label={0: "neg", 1: "pos"}, label2id={"neg": 0, "pos": 1})
+        BertForSequenceClassification(config).save_pretrained(cls.model_dir)
+        cls.tokenizer.save_pretrained(cls.model_dir)
+
+        rng = random.Random(0)
+        cls.rows = [(" ".join(rng.choice(cls.WORDS) for _ in range(rng.randint(1, 9))), rng.choice(cls.LABELS))
+                    for _ in range(40)]
+        pd.DataFrame(cls.rows, columns=["text", "label"]).to_csv(os.path.join(cls.model_dir, "test.csv"), index=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.model_dir, ignore_errors=True)
+
+    def _run(self, *options):
+        """Run evaluate.py in the model directory and return results.json"""
+        argv = ["evaluate.py", "--chunk-size", "16", "--batch-size", "4"] + list(options)
+        cwd = os.getcwd()
+        os.chdir(self.model_dir)
+        try:
+            with patch('sys.argv', argv):
+                self.evaluate.evaluate(self.evaluate.parse_args())
+            with open("results.json") as f:
+                return json.load(f)
+        finally:
+            os.chdir(cwd)
+
+    def _metrics(self, results):
+        return {name: results[name] for name in self.METRICS}
+
+    def test_length_bucketed_batches_keep_input_order(self):
+        """Test 29: Length-sorted batches restore input order and match one-at-a-time inference"""
+        # The fake model predicts each row's unpadded length, so order mistakes show up directly
+        texts = [" ".join(["good"] * length) for length in (5, 1, 3, 2, 4, 1)]
+        encodings = self.tokenizer(texts, truncation=True)
+        forward = lambda inputs: np.eye(8)[inputs["attention_mask"].sum(axis=1)]
+        preds = self.evaluate.predict(encodings, self.tokenizer, forward, batch_size=2)
+        self.assertEqual(preds.tolist(), [5, 1, 3, 2, 4, 1])
+
+        self.assertEqual(self._metrics(self._run("--batch-size", "1")), self._metrics(self._run()))
+
+    def test_streamed_confusion_counts_match_sklearn(self):
+        """Test 30: Confusion counts merged across chunks give sklearn's weighted metrics"""
+        from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+
+        labels = [0, 0, 1, 1, 2, 2, 2, 3]
+        preds = [0, 1, 1, 1, 2, 0, 2, 1]
+        counts = self.evaluate.ConfusionCounts()
+        counts.update(labels[:3], preds[:3])
+        other = self.evaluate.ConfusionCounts()
+        other.update(labels[3:], preds[3:])
+        counts.merge(other)
+
+        precision, recall, f1, _ = precision_recall_fscore_support(labels, preds, average="weighted", zero_division=0)
+        metrics = counts.metrics()
+        self.assertAlmostEqual(metrics["accuracy"], accuracy_score(labels, preds))
+        self.assertAlmostEqual(metrics["precision"], precision)
+        self.assertAlmostEqual(metrics["recall"], recall)
+        self.assertAlmostEqual(metrics["f1_score"], f1)
+
+        self.assertEqual(self._metrics(self._run("--chunk-size", "7")), self._metrics(self._run("--chunk-size", "1000")))
+
+    def test_worker_processes_match_single_process(self):
+        """Test 31: Chunks sharded across worker processes give the single-process metrics"""
+        self.assertEqual(self._metrics(self._run("--workers", "2")), self._metrics(self._run()))
+
+    def test_int8_and_onnx_backends(self):
+        """Test 32: The int8 run reports its accuracy delta to the eager reference; ONNX matches eager"""
+        eager = self._run()
+
+        quantized = self._run("--backend", "int8", "--compare-backend", "eager")
+        self.assertEqual(quantized["backend"], "int8")
+        self.assertEqual(quantized["reference"]["accuracy"], eager["accuracy"])
+        self.assertEqual(quantized["accuracy_delta"], round(quantized["accuracy"] - eager["accuracy"], 4))
+
+        # The ONNX export needs the optional onnxruntime and onnxscript packages
+        try:
+            import onnxruntime  # noqa: F401
+            import onnxscript  # noqa: F401
+        except ImportError:
+            return
+        onnx = self._run("--backend", "onnx", "--onnx-path", os.path.join(self.model_dir, "model.onnx"))
+        self.assertAlmostEqual(onnx["accuracy"], eager["accuracy"], places=2)
+
+    def test_token_cache_round_trip(self):
+        """Test 33: The memory-mapped token cache yields the tokenizer's encodings and mapped labels"""
+        texts = [text for text, _ in self.rows]
+        label2id = {"neg": 0, "pos": 1}
+        args = argparse.Namespace(data=os.path.join(self.model_dir, "test.csv"), chunk_size=16)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = os.path.join(cache_dir, "cache")
+            self.evaluate.build_token_cache(args, self.tokenizer, cache_path, label2id)
+            # A second build of the same cache (a concurrent run) reuses the published one
+            self.evaluate.build_token_cache(args, self.tokenizer, cache_path, label2id)
+            self.assertEqual(os.listdir(cache_dir), ["cache"])
+            chunks = list(self.evaluate.iter_cached_chunks(cache_path, 16))
+            cached = self._run("--token-cache", cache_dir)
+
+        self.assertEqual([len(labels) for _, labels in chunks], [16, 16, 8])
+        cached_ids = [ids for encodings, _ in chunks for ids in encodings["input_ids"]]
+        self.assertEqual(cached_ids, self.tokenizer(texts, truncation=True)["input_ids"])
+        self.assertEqual([label for _, labels in chunks for label in labels],
+                         [label2id[label] for _, label in self.rows])
+        self.assertEqual(self._metrics(cached), self._metrics(self._run()))
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
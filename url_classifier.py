@@ -30,7 +30,7 @@ class URLClassifier:
         domain = parsed.netloc.lower()
         path = parsed.path.lower()
 
-        if "huggingface.co" in domain:
+        if "huggingface.co" in domain or domain.removeprefix("www.") == "hf.co":
             if "/datasets/" in path:
                 return URLType.DATASET
             else:
@@ -57,5 +57,3 @@ class URLClassifier:
             grouped[url_type].append(url)
 
         return grouped
-    
-    
\ No newline at end of file
@@ -0,0 +1,115 @@
+from contextlib import contextmanager
+from typing import IO, Iterator, List, Optional, Tuple
+import gzip
+import io
+import logging
+import sys
+from urllib.parse import urlsplit, urlunsplit
+
+try:
+    import zstandard
+except ImportError:  # Optional: only needed for .zst inputs
+    zstandard = None
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def open_url_source(source: str) -> Iterator[IO[str]]:
+    """
+    Open a URL file for streaming as text
+
+    ``-`` reads standard input. Gzip and zstd inputs are recognised by their
+    magic bytes (whatever the file name) and decompressed on the fly, so a
+    multi-GB dump never has to be unpacked to disk.
+
+    Args:
+        source: Path to the URL file, or "-" for stdin
+
+    Yields:
+        Text stream over the (decompressed) lines
+    """
+    raw = sys.stdin.buffer if source == "-" else open(source, "rb")
+    try:
+        stream = raw if hasattr(raw, "peek") else io.BufferedReader(raw)
+        magic = stream.peek(4)[:4]
+
+        if magic.startswith(GZIP_MAGIC):
+            stream = gzip.GzipFile(fileobj=stream, mode="rb")
+        elif magic == ZSTD_MAGIC:
+            if zstandard is None:
+                raise ValueError(f"'{source}' is zstd-compressed; install the zstandard package to read it")
+            stream = zstandard.ZstdDecompressor().stream_reader(stream, closefd=False)
+
+        text = io.TextIOWrapper(stream, encoding="utf-8", errors="replace")
+        yield text
+        # Leave stdin open for the rest of the process
+        text.detach()
+    finally:
+        if raw is not sys.stdin.buffer:
+            raw.close()
+
+
+def canonicalize_url(url: str) -> Optional[str]:
+    """
+    Validate a URL and bring it into canonical form
+
+    The scheme and host are lowercased, and the fragment and trailing slashes
+    are dropped. Repository paths, userinfo and IPv6 brackets are kept.
+
+    Args:
+        url: URL as written in the input file
+
+    Returns:
+        Canonical URL, or None if it is not an absolute http(s) URL
+    """
+    url = url.strip()
+    if not url:
+        return None
+    try:
+        parts = urlsplit(url)
+        host = parts.hostname
+        port = parts.port
+    except ValueError:
+        return None
+
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not host or any(ch.isspace() for ch in url):
+        return None
+
+    userinfo, _, _ = parts.netloc.rpartition("@")
+    netloc = f"[{host}]" if ":" in host else host
+    if port is not None:
+        netloc = f"{netloc}:{port}"
+    if userinfo:
+        netloc = f"{userinfo}@{netloc}"
+    return urlunsplit((scheme, netloc, parts.path.rstrip("/"), parts.query, ""))
+
+
+def read_url_groups(source: str) -> Iterator[Tuple[int, List[str]]]:
+    """
+    Stream (line number, canonical URLs) for each line of comma-separated URLs
+
+    Lines are read one at a time, so memory does not grow with the input size.
+    Invalid URLs are logged and dropped; lines left without URLs are skipped.
+
+    Args:
+        source: Path to a plain, gzip or zstd URL file, or "-" for stdin
+    """
+    with open_url_source(source) as f:
+        for line_num, line in enumerate(f, 1):
+            line_urls = []
+            for url in line.split(","):
+                if not url.strip():
+                    continue
+                canonical = canonicalize_url(url)
+                if canonical is None:
+                    logger.warning(f"Skipping invalid URL on line {line_num}: {url.strip()[:200]}")
+                else:
+                    line_urls.append(canonical)
+            if line_urls:
+                yield line_num, line_urls
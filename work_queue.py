@@ -0,0 +1,238 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+import json_backend
+from sqlite_util import LocalConnections
+
+
+class WorkQueue:
+    """
+    SQLite-backed queue of URL groups for workers on many processes or nodes.
+
+    Each task is one line of a URL file. A worker leases a task for
+    ``visibility_timeout`` seconds; if the lease runs out before the task is
+    completed (the worker died or hung) the task becomes visible to other
+    workers again. Failed tasks are re-enqueued until they have been attempted
+    ``max_attempts`` times. Results are written to the same database, which
+    acts as the shared result sink. Workers on several nodes need the
+    database on storage with working SQLite file locking.
+    """
+
+    def __init__(self, db_path: str, visibility_timeout: float = 300, max_attempts: int = 3):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._connections = LocalConnections(self.db_path, timeout=60, pragmas=("journal_mode=WAL",))
+
+        conn = self._connections.get()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id INTEGER PRIMARY KEY, line INTEGER, urls TEXT, status TEXT DEFAULT 'queued', "
+            "attempts INTEGER DEFAULT 0, lease_owner TEXT, lease_expires REAL, error TEXT, source TEXT)"
+        )
+        if "source" not in {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}:
+            conn.execute("ALTER TABLE tasks ADD COLUMN source TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires)")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS tasks_source_line ON tasks (source, line)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (id INTEGER PRIMARY KEY, task_id INTEGER, line INTEGER, result TEXT)"
+        )
+
+    def enqueue(self, url_groups: Iterable[Tuple[int, List[str]]], source: Optional[str] = None) -> int:
+        """
+        Add (line number, URLs) groups as tasks
+
+        Args:
+            url_groups: (line number, URLs) per input line
+            source: Input file the lines come from; lines of a source that are
+                already queued are skipped, so enqueueing a file again is a no-op
+
+        Returns:
+            Number of tasks added
+        """
+        with self._transaction() as conn:
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO tasks (source, line, urls) VALUES (?, ?, ?)",
+                ((source, line, json_backend.dumps_str(urls)) for line, urls in url_groups)
+            )
+            return cursor.rowcount
+
+    def lease(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Lease the next visible task
+
+        Args:
+            worker_id: Identifier of the leasing worker
+
+        Returns:
+            Task dictionary with id, line, urls and attempts, or None if nothing is visible
+        """
+        with self._transaction() as conn:
+            now = time.time()
+            # Expired leases that used up their attempts are given up on
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', error = COALESCE(error, 'lease expired') "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )
+            row = conn.execute(
+                "SELECT id, line, urls, attempts FROM tasks "
+                "WHERE status = 'queued' OR (status = 'leased' AND lease_expires < ?) ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            task_id, line, urls, attempts = row
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = ? WHERE id = ?",
+                (worker_id, now + self.visibility_timeout, attempts + 1, task_id)
+            )
+            return {"id": task_id, "line": line, "urls": json_backend.loads(urls), "attempts": attempts + 1}
+
+    def extend_lease(self, task_id: int, worker_id: str) -> bool:
+        """Push the lease deadline out again; False if the lease was lost"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (time.time() + self.visibility_timeout, task_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, task_id: int, worker_id: str, results: List[Dict[str, Any]]) -> bool:
+        """Store a task's results and mark it done; False if the lease was lost to another worker"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', lease_expires = NULL "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (task_id, worker_id)
+            )
+            if cursor.rowcount != 1:
+                return False
+            line = conn.execute("SELECT line FROM tasks WHERE id = ?", (task_id,)).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO results (task_id, line, result) VALUES (?, ?, ?)",
+                ((task_id, line, json_backend.dumps_str(result)) for result in results)
+            )
+            return True
+
+    def fail(self, task_id: int, worker_id: str, error: str) -> None:
+        """Release a failed task: re-enqueue it, or mark it failed after max_attempts"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "lease_owner = NULL, lease_expires = NULL, error = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (self.max_attempts, error, task_id, worker_id)
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """Number of tasks per status"""
+        rows = self._connections.get().execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        counts = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(dict(rows))
+        return counts
+
+    def iter_results(self) -> Iterator[Dict[str, Any]]:
+        """Stored results in input line order"""
+        cursor = self._connections.get().execute("SELECT result FROM results ORDER BY line, id")
+        for (result,) in cursor:
+            yield json_backend.loads(result)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block inside BEGIN IMMEDIATE, so concurrent workers never lease the same task"""
+        conn = self._connections.get()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+@contextmanager
+def lease_heartbeat(queue: WorkQueue, task_id: int, worker_id: str) -> Iterator[None]:
+    """Keep extending a task's lease from a background thread while the block runs"""
+    interval = queue.visibility_timeout / 3
+    if interval <= 0:
+        yield
+        return
+
+    stop = threading.Event()
+
+    def extend() -> None:
+        while not stop.wait(interval):
+            if not queue.extend_lease(task_id, worker_id):
+                logging.getLogger(__name__).warning(f"Lost the lease on task {task_id}")
+                return
+
+    thread = threading.Thread(target=extend, name=f"lease-{task_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def run_worker(evaluator: Any, queue: WorkQueue, worker_id: Optional[str] = None,
+               poll_interval: float = 2.0, exit_when_idle: bool = True) -> int:
+    """
+    Lease URL groups from the queue and evaluate them until the queue is drained
+
+    The lease is extended in the background while a group is evaluated. A
+    group with a model that fails to evaluate is released for a retry.
+
+    Args:
+        evaluator: ModelEvaluator used for each group via evaluate_urls
+        queue: Shared work queue
+        worker_id: Lease owner name (defaults to host-pid-random)
+        poll_interval: Seconds to wait when no task is visible
+        exit_when_idle: Stop once no tasks are queued or leased; otherwise keep polling
+
+    Returns:
+        Number of tasks completed by this worker
+    """
+    worker_id = worker_id or default_worker_id()
+    logger = logging.getLogger(__name__)
+    completed = 0
+
+    while True:
+        task = queue.lease(worker_id)
+        if task is None:
+            counts = queue.stats()
+            if exit_when_idle and not counts["queued"] and not counts["leased"]:
+                return completed
+            time.sleep(poll_interval)
+            continue
+
+        try:
+            # Long groups keep their lease; a model that fails makes the whole group retry
+            with lease_heartbeat(queue, task["id"], worker_id):
+                results = evaluator.evaluate_urls(task["urls"], strict=True)
+        except Exception as e:
+            logger.error(f"Task {task['id']} (line {task['line']}) failed on attempt {task['attempts']}: {e}")
+            queue.fail(task["id"], worker_id, str(e))
+            continue
+
+        if queue.complete(task["id"], worker_id, [result.to_dict() for result in results]):
+            completed += 1
+        else:
+            logger.warning(f"Lease on task {task['id']} expired before completion; result discarded")